@@ -1,16 +1,49 @@
 import os
+import time
+import uuid
+import secrets
+import functools
+from contextlib import nullcontext
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import json
 from dotenv import load_dotenv
 from src.bot.chat_bot import Chatbot
+from src.bot.fused_turn import FusedTurnBot
 from src.analysis.sentiment_analysis import SentimentAnalysis
-from src.utils.main_utils import get_last_assistant_message, get_last_user_message, read_yaml
+from src.utils.main_utils import (
+    get_last_assistant_message, get_last_assistant_record, get_user_answer_for_stage, get_experience_level, validate_required_fields,
+    first_question_prompt, next_question_prompt, interview_profile
+)
+from src.utils.timing import RerunTimer
+from src.utils.profiling import get_profiler
+from src.prompts.registry import PromptRegistry
 from src.Optimize.scroe_optimizer import ScoreOptimizer
 from src.answer_bot.bot import AnswerBot
+from src.bot.test_case_bot import TestCaseBot, start_test_generation
+from src.llm.circuit_breaker import DegradedResult
+from src.llm.token_budget import preflight_answer
+from src.llm.key_pool import get_key_pool, NoAvailableKeyError
+from src.llm.warmup import Warmup, default_ready_file
+from src.llm.speculative import SpeculativeTasks, get_speculation_executor
+from src.llm.degraded_refill import DeferredWork, apply_refilled_answer
+from src.Optimize.adaptive_length import AdaptiveInterviewPolicy, CONTINUE
+from src.Optimize.score_parser import parse_score
+from src.Optimize.pre_scorer import LocalPreScorer, is_local_score
+from src.Optimize.code_grader import ExecutionGrader, is_execution_score
+from src.Optimize.mcq_grader import MCQItem, split_answer_key, grade_mcq, is_mcq_score
+from src.Optimize.sandbox import get_sandbox_pool
+from src.analytics.score_store import ScoreStore
+from src.analytics.answer_index import AnswerIndex, default_answer_index_path
+from src.analytics.interview_archive import InterviewArchive, default_archive_path, COMPRESSION_LEVEL
+from src.jobs.score_jobs import ScoreJobQueue, DONE, FAILED
+from src.jobs.bulk_onboarding import InviteStore, default_invite_store_path
+from src.utils.logging_setup import configure_logging, set_log_context
+from src.utils.message_records import make_message, to_records, memory_report
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Set up logging: one queue-backed configuration for the whole app, see src/utils/logging_setup.py
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # --- Configuration and Initialization ---
@@ -25,12 +58,58 @@ st.set_page_config(
 # Load environment variables
 load_dotenv()
 
+# Interview length: fixed 3 questions, or adaptive with early stopping
+FIXED_QUESTIONS = 3
+ADAPTIVE_INTERVIEW = os.getenv("TALENTSCOUT_ADAPTIVE_INTERVIEW", "").lower() in ("1", "true", "yes")
+INTERVIEW_POLICY = AdaptiveInterviewPolicy(
+    max_questions=int(os.getenv("TALENTSCOUT_MAX_QUESTIONS", AdaptiveInterviewPolicy.max_questions))
+)
+
+# Settle blank, copied and off-topic answers locally instead of with the LLM judge
+PRE_SCORE = os.getenv("TALENTSCOUT_PRESCORE", "1").lower() not in ("0", "false", "no")
+
+# Grade coding answers by running hidden test cases in a sandbox instead of with the LLM judge
+CODE_GRADER = os.getenv("TALENTSCOUT_CODE_GRADER", "1").lower() not in ("0", "false", "no")
+
+# Flag answers that are near-duplicates of other candidates' answers to the same question
+DUPLICATE_CHECK = os.getenv("TALENTSCOUT_DUPLICATE_CHECK", "1").lower() not in ("0", "false", "no")
+
+# Generate each question's reference answer in the background while the candidate answers it
+SPECULATIVE_ANSWERS = os.getenv("TALENTSCOUT_SPECULATIVE_ANSWERS", "1").lower() not in ("0", "false", "no")
+
+# Append completed interviews to the compressed interview archive
+ARCHIVE = os.getenv("TALENTSCOUT_ARCHIVE", "1").lower() not in ("0", "false", "no")
+
+# Score each answer in worker processes as soon as it is submitted (fixed-length interviews)
+BACKGROUND_SCORING = os.getenv("TALENTSCOUT_BACKGROUND_SCORING", "1").lower() not in ("0", "false", "no")
+
+# Hours a resumable interview snapshot and its scoring jobs are kept after the last update
+SNAPSHOT_RETENTION_HOURS = float(os.getenv("TALENTSCOUT_SNAPSHOT_RETENTION_HOURS", "24"))
+
+# The score page polls the job store this often at first, backing off to the maximum
+SCORE_POLL_SECONDS = 1.0
+SCORE_POLL_MAX_SECONDS = 8.0
+
+# An answer is scored at most this long after submit without the hidden tests still being written
+TEST_GENERATION_WAIT_SECONDS = 30.0
+
+# One LLM call per turn for analysis, reference answer and next question
+FUSED_TURN = os.getenv("TALENTSCOUT_FUSED_TURN", "").lower() in ("1", "true", "yes")
+
+# Sampling profiler for every session, or for sessions opened with ?profile=<TALENTSCOUT_PROFILE_TOKEN>
+PROFILE = os.getenv("TALENTSCOUT_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_TOKEN = os.getenv("TALENTSCOUT_PROFILE_TOKEN")
+
 # Load prompts
-@st.cache_data
+@st.cache_resource
+def get_prompt_registry():
+    """Process-wide prompt registry; it reloads prompt.yaml when the file changes"""
+    return PromptRegistry(file_path="src/prompts/prompt.yaml")
+
 def load_prompts():
-    """Load prompts from YAML file with caching"""
+    """Return the current validated prompt version"""
     try:
-        return read_yaml(file_path="src/prompts/prompt.yaml")
+        return get_prompt_registry().current()
     except FileNotFoundError:
         st.error("Error: prompt.yaml not found. Please ensure it's in the 'src/prompts' directory.")
         st.stop()
@@ -40,6 +119,66 @@ def load_prompts():
 
 PROMPTS = load_prompts()
 
+@st.cache_resource
+def get_rerun_timer():
+    """Process-wide rerun timings for the app and each fragment"""
+    return RerunTimer()
+
+rerun_timer = get_rerun_timer()
+
+@st.cache_resource
+def get_warmup():
+    """Process-wide connection warm-up; started by the first script run, e.g. the script health check"""
+    warmup = Warmup(
+        get_key_pool(),
+        interval=float(os.getenv("TALENTSCOUT_WARMUP_INTERVAL", "0")),
+        ready_file=default_ready_file()
+    )
+    warmup.start()
+    return warmup
+
+get_warmup()
+
+@st.cache_resource
+def get_score_store():
+    """Columnar score store shared with the recruiter analytics page"""
+    return ScoreStore(os.path.join(os.getenv("TALENTSCOUT_DATA_DIR", "data"), "scores"))
+
+@st.cache_resource
+def get_score_queue():
+    """Process-wide scoring job queue; jobs and interview snapshots survive page reloads"""
+    if not BACKGROUND_SCORING:
+        return None
+    return ScoreJobQueue(
+        os.path.join(os.getenv("TALENTSCOUT_DATA_DIR", "data"), "score_jobs.sqlite3"),
+        prompt_path="src/prompts/prompt.yaml",
+        workers=int(os.getenv("TALENTSCOUT_SCORE_WORKERS", "2")),
+        pre_score=PRE_SCORE,
+        code_grader=CODE_GRADER,
+        retention=SNAPSHOT_RETENTION_HOURS * 3600
+    )
+
+@st.cache_resource
+def get_answer_index():
+    """MinHash LSH index of past answers, shared with the recruiter analytics page"""
+    if not DUPLICATE_CHECK:
+        return None
+    return AnswerIndex(default_answer_index_path(),
+                       threshold=float(os.getenv("TALENTSCOUT_DUPLICATE_THRESHOLD", "0.8")))
+
+@st.cache_resource
+def get_interview_archive():
+    """Compressed archive of completed interviews, shared with the recruiter analytics page"""
+    if not ARCHIVE:
+        return None
+    return InterviewArchive(default_archive_path(),
+                            level=int(os.getenv("TALENTSCOUT_ARCHIVE_LEVEL", COMPRESSION_LEVEL)))
+
+@st.cache_resource
+def get_invite_store():
+    """Interviews pre-generated by bulk onboarding, opened with ``?invite=<token>``"""
+    return InviteStore(default_invite_store_path())
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -125,14 +264,32 @@ def initialize_session_state():
         'form_submitted': False,
         'chat_started': False,
         'current_question': 0,
-        'max_questions': 3,
+        'max_questions': INTERVIEW_POLICY.max_questions if ADAPTIVE_INTERVIEW else FIXED_QUESTIONS,
         'interview_completed': False,
         'show_score': False,
         'waiting_for_answer': False,
         'messages': [],
         'processing_answer': False,
         'error_occurred': False,
-        'last_error': None
+        'last_error': None,
+        # Reference answers and scores waiting for a circuit to close
+        'deferred_work': None,
+        'speculation': None,
+        # Hidden-test generation threads, by question number
+        'test_generation': {},
+        'prompt_version': None,
+        'answer_scores': {},
+        'running_scores': [],
+        'interview_id': None,
+        # Secret of the ?resume= link; the interview id alone does not reopen an interview
+        'resume_token': None,
+        # Keeps the session on one API key of the pool
+        'session_id': uuid.uuid4().hex,
+        'scores_recorded': False,
+        # Seconds until the score page polls the background workers again
+        'score_poll_interval': SCORE_POLL_SECONDS,
+        # Questions and reference answers from a bulk-onboarding invite
+        'pregenerated': None
     }
     
     for key, value in default_values.items():
@@ -141,59 +298,200 @@ def initialize_session_state():
 
 initialize_session_state()
 
+# Session state the interview can be restored from after a page reload
+SNAPSHOT_KEYS = [
+    'candidate_data', 'form_submitted', 'chat_started', 'current_question', 'max_questions',
+    'interview_completed', 'show_score', 'waiting_for_answer', 'messages', 'prompt_version',
+    'answer_scores', 'running_scores', 'interview_id', 'scores_recorded', 'pregenerated'
+]
+
+def get_deferred_work(answer_bot, score_optimizer):
+    """The interview's reference answers and scores waiting for a circuit to close"""
+    if st.session_state.deferred_work is None:
+        queue = get_score_queue()
+        persist = None
+        if queue is not None and st.session_state.interview_id:
+            persist = functools.partial(persist_deferred_results, queue.store, st.session_state.interview_id,
+                                        st.session_state.resume_token, PROMPTS.version)
+        st.session_state.deferred_work = DeferredWork(answer_bot, score_optimizer, persist=persist)
+    return st.session_state.deferred_work
+
+def defer_score(deferred_work, index, score_item):
+    """Have the deferred work score an answer the score page could not, re-filling a degraded reference answer first"""
+    question_record, correct_record, user_answer = score_item
+    deferred_work.submit(
+        index, question_record["content"], user_answer,
+        correct_answer=None if correct_record.get("degraded") else correct_record["content"],
+        tests=question_record.get("tests"), mcq=question_record.get("mcq")
+    )
+
+def persist_deferred_results(store, interview_id, resume_token, prompt_version, answers, scores):
+    """Save deferred answers and scores from the background thread, without touching the session"""
+    for index, score in scores.items():
+        store.complete(interview_id, index, score, prompt_version=prompt_version)
+    if not resume_token:
+        return
+
+    def update(state):
+        for question_number, answer in answers.items():
+            apply_refilled_answer(state['messages'], question_number, answer)
+        for index, score in scores.items():
+            # JSON object keys are strings
+            state['answer_scores'][str(index)] = score
+    store.update_snapshot(resume_token, update)
+
+def take_deferred_results():
+    """Move answers and scores the deferred work finished into the session; True if there were any"""
+    work = st.session_state.deferred_work
+    if work is None:
+        return False
+    answers, scores = work.drain()
+    for question_number, answer in answers.items():
+        apply_refilled_answer(st.session_state.messages, question_number, answer)
+    for index, score in scores.items():
+        st.session_state.answer_scores[index] = score
+        parsed = parse_score(score)
+        if parsed.overall is not None:
+            st.session_state.running_scores.append(parsed.overall)
+    return bool(answers or scores)
+
+def save_interview_snapshot():
+    """Persist the interview so a reloaded page (``?resume=<token>``) can continue it"""
+    queue = get_score_queue()
+    if queue is None or not st.session_state.interview_id or not st.session_state.resume_token:
+        return
+    # Results the background thread saved already must not be overwritten by older state
+    take_deferred_results()
+    try:
+        state = {key: st.session_state[key] for key in SNAPSHOT_KEYS}
+        state['messages'] = [message.to_dict() for message in state['messages']]
+        queue.store.save_snapshot(st.session_state.interview_id, st.session_state.resume_token, state)
+    except Exception as e:
+        logger.error(f"Error saving interview snapshot: {str(e)}")
+
+def restore_interview_snapshot():
+    """Restore the interview of the URL's resume token into a fresh session, e.g. after a reload"""
+    resume_token = st.query_params.get("resume")
+    queue = get_score_queue()
+    if not resume_token or st.session_state.interview_id or queue is None:
+        return
+    snapshot = queue.store.load_snapshot(resume_token)
+    if not snapshot:
+        return
+    for key, value in snapshot.items():
+        if key == 'answer_scores':
+            # JSON object keys are strings
+            value = {int(index): score for index, score in value.items()}
+        elif key == 'messages':
+            value = to_records(value)
+        st.session_state[key] = value
+    st.session_state.resume_token = resume_token
+    # An answer cut off by the reload has to be submitted again
+    if st.session_state.chat_started and not st.session_state.interview_completed:
+        st.session_state.waiting_for_answer = True
+    logger.info("Restored interview from snapshot")
+
+def open_invite():
+    """Start an interview from a bulk-onboarding link with the profile filled in"""
+    token = st.query_params.get("invite")
+    if not token or st.session_state.form_submitted:
+        return
+    invite = get_invite_store().consume(token)
+    if invite is None:
+        st.warning("⚠️ This interview link is not valid or was already used. Please fill in the form instead.")
+        return
+    # Interview state is still at its defaults before the form is submitted
+    st.session_state.candidate_data = invite['candidate']
+    st.session_state.form_submitted = True
+    # The recruiter chose the number of questions; adaptive length does not apply to invites
+    st.session_state.max_questions = len(invite['questions'])
+    if invite['prompt_version'] == PROMPTS.version:
+        st.session_state.pregenerated = {"questions": invite['questions'], "answers": invite['answers']}
+    else:
+        # Generated with prompts that have changed since; every item is generated live
+        logger.info(f"Invite prompt version {invite['prompt_version']} is not current, generating live")
+        st.session_state.pregenerated = {"questions": [], "answers": []}
+    logger.info(f"Opened pre-generated interview ({invite['status']}, {len(invite['questions'])} questions)")
+
+def interview_is_adaptive():
+    """Adaptive length applies to interviews started from the form, not to invites"""
+    return ADAPTIVE_INTERVIEW and st.session_state.pregenerated is None
+
+def pregenerated_item(kind, index):
+    """Pre-generated question or reference answer ``index`` (0-based), or None to generate it live"""
+    items = (st.session_state.pregenerated or {}).get(kind) or []
+    return items[index] if index < len(items) else None
+
+restore_interview_snapshot()
+open_invite()
+set_log_context(interview_id=st.session_state.interview_id)
+
 # --- Helper Functions ---
 
 def reset_interview_state():
     """Resets all session state variables related to the interview."""
     logger.info("Resetting interview state")
+    # Reference answers still being generated belong to the old interview or profile
+    if st.session_state.speculation is not None:
+        cancelled = st.session_state.speculation.cancel_all()
+        if cancelled:
+            logger.info(f"Cancelled {cancelled} speculative reference answer(s)")
     interview_keys = [
         'chat_started', 'current_question', 'interview_completed', 
         'show_score', 'waiting_for_answer', 'messages', 
-        'processing_answer', 'error_occurred', 'last_error'
+        'processing_answer', 'error_occurred', 'last_error',
+        'max_questions', 'answer_scores', 'running_scores', 'scores_recorded', 'pregenerated',
+        'deferred_work', 'test_generation'
     ]
     
     for key in interview_keys:
-        if key == 'messages':
+        if key in ['messages', 'running_scores']:
             st.session_state[key] = []
+        elif key in ['answer_scores', 'test_generation']:
+            st.session_state[key] = {}
+        elif key in ['pregenerated', 'deferred_work']:
+            # An invite's questions are used for its first interview only; deferred
+            # work still running saves its results to the old interview
+            st.session_state[key] = None
         elif key in ['current_question']:
             st.session_state[key] = 0
+        elif key == 'max_questions':
+            # An adaptive interview may have stopped early and shortened it
+            st.session_state[key] = INTERVIEW_POLICY.max_questions if ADAPTIVE_INTERVIEW else FIXED_QUESTIONS
         else:
             st.session_state[key] = False
 
-def get_experience_level(years_of_experience):
-    """Maps years of experience to a general experience level."""
-    exp_mapping = {
-        "0-1 years": "Junior",
-        "1-2 years": "Junior", 
-        "2-3 years": "Junior",
-        "3-5 years": "Mid",
-        "5-7 years": "Mid",
-        "7-10 years": "Senior",
-        "10+ years": "Senior"
-    }
-    return exp_mapping.get(years_of_experience, "Mid")
+def prime_session_connection():
+    """Open this session's provider connection in the background before its first question"""
+    key_pool = get_key_pool()
+    if key_pool is None:
+        return
+    try:
+        get_warmup().prime(key_pool.choose(st.session_state.session_id))
+    except NoAvailableKeyError:
+        # render_main tells the candidate
+        pass
 
-def validate_required_fields(candidate_data):
-    """Validate that all required fields are filled"""
-    required_fields = ['full_name', 'email', 'phone', 'location']
-    missing_fields = [field for field in required_fields if not candidate_data.get(field)]
-    
-    if missing_fields:
-        return False, f"Missing required fields: {', '.join(missing_fields)}"
-    
-    if candidate_data.get('experience_years') == "Select...":
-        return False, "Please select years of experience"
-    
-    if not candidate_data.get('desired_positions'):
-        return False, "Please select at least one desired position"
-        
-    if not candidate_data.get('tech_stack'):
-        return False, "Please select your technology stack"
-        
-    if not candidate_data.get('key_technologies'):
-        return False, "Please select your key technologies"
-    
-    return True, ""
+def profiling_enabled():
+    """Profile this session: on for all sessions, or opted in with the admin query parameter"""
+    return PROFILE or bool(PROFILE_TOKEN and st.query_params.get("profile") == PROFILE_TOKEN)
+
+def profiled(section):
+    """Sample ``section`` into this session's flame graphs when profiling is enabled"""
+    if not profiling_enabled():
+        return nullcontext()
+    return get_profiler().section(section, st.session_state.session_id)
+
+# Start the profiler, and its sampler calibration, before the first profiled section
+if PROFILE or PROFILE_TOKEN:
+    get_profiler()
+
+def rerun_fragment():
+    """Rerun only the calling fragment; during a full app run Streamlit only allows a full rerun"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
 
 def display_error(error_message, show_retry=False):
     """Display error message with optional retry button"""
@@ -210,49 +508,228 @@ def display_error(error_message, show_retry=False):
             st.session_state.last_error = None
             st.rerun()
 
-def process_user_answer(user_input, system_template, model, answer_bot, analysis):
+def record_interview_scores(score_results):
+    """Append a finished interview's scores to the cohort analytics store, once per interview"""
+    if st.session_state.scores_recorded or not st.session_state.interview_id:
+        return
+    try:
+        candidate = st.session_state.candidate_data
+        get_score_store().append_interview(
+            interview_id=st.session_state.interview_id,
+            experience_level=get_experience_level(candidate['experience_years']),
+            tech_stack=candidate['tech_stack'],
+            scores=[parse_score(score) for score in score_results]
+        )
+        st.session_state.scores_recorded = True
+        archive_interview(score_results)
+    except Exception as e:
+        # Analytics must never break the candidate's score page
+        logger.error(f"Error recording interview scores: {str(e)}")
+
+def archive_interview(score_results):
+    """Append the completed interview with its transcript and scores to the interview archive"""
+    archive = get_interview_archive()
+    if archive is None:
+        return
+    try:
+        archive.append(
+            interview_id=st.session_state.interview_id,
+            candidate_data=st.session_state.candidate_data,
+            messages=[message.to_dict() for message in st.session_state.messages],
+            scores=score_results
+        )
+    except Exception as e:
+        logger.error(f"Error archiving interview: {str(e)}")
+
+def append_assistant_message(content, **fields):
+    """Append an assistant message; its record knows the parts it is rendered as"""
+    record = make_message("assistant", content, **fields)
+    st.session_state.messages.append(record)
+    return record
+
+def append_question_message(question, prefix="", **fields):
+    """Append a generated question; an MCQ's answer key is kept on the record, not in the text"""
+    shown, mcq = split_answer_key(question)
+    if mcq is not None:
+        fields["mcq"] = mcq.to_dict()
+    return append_assistant_message(f"{prefix}{shown}", **fields), shown
+
+def generate_tests(record, test_bot, question):
+    """Write the question's hidden tests in the background while the candidate answers"""
+    thread = start_test_generation(record, test_bot, question)
+    if thread is not None:
+        st.session_state.test_generation[record["question_number"]] = thread
+
+def wait_for_tests(question_record):
+    """The hidden tests of the question being answered, once their generation has finished"""
+    thread = st.session_state.test_generation.pop(question_record.get("question_number"), None)
+    if thread is not None and thread.is_alive():
+        # Scored without them, the answer would go to the LLM judge instead of being run
+        with st.status("Preparing hidden tests...", expanded=False) as status:
+            thread.join(TEST_GENERATION_WAIT_SECONDS)
+            if thread.is_alive():
+                logger.warning(f"Hidden tests for question {question_record.get('question_number')} not ready, "
+                               f"scoring without them")
+                status.update(label="⚠️ Hidden tests not ready", state="error")
+            else:
+                status.update(label="✅ Hidden tests ready", state="complete")
+    return question_record.get("tests")
+
+def get_speculation():
+    """This session's speculative work, run on the process-wide pool"""
+    if st.session_state.speculation is None:
+        st.session_state.speculation = SpeculativeTasks(
+            get_speculation_executor(int(os.getenv("TALENTSCOUT_SPECULATION_WORKERS", "8")))
+        )
+    return st.session_state.speculation
+
+def speculate_reference_answer(record, answer_bot, turn_bot=None):
+    """Start the question's reference answer now; it only depends on the question"""
+    # MCQs have their key, pre-generated interviews their answers, and the fused turn writes its own
+    if (not SPECULATIVE_ANSWERS or record.get("mcq") or turn_bot is not None
+            or pregenerated_item("answers", record.get("question_number", 1) - 1)):
+        return
+    get_speculation().start(record["content"], answer_bot.answer, Question=record["content"])
+
+def store_answer_score(score):
+    """Keep the current answer's score for the score page and the adaptive interview policy"""
+    st.session_state.answer_scores[st.session_state.current_question] = score
+    parsed = parse_score(score)
+    if parsed.overall is not None:
+        st.session_state.running_scores.append(parsed.overall)
+
+def flag_duplicate_answer(user_record, question):
+    """Index the answer; likely copies from other interviews are kept on its record for recruiters"""
+    answer_index = get_answer_index()
+    if answer_index is None:
+        return
+    try:
+        matches = answer_index.add(st.session_state.interview_id or st.session_state.session_id,
+                                   st.session_state.current_question + 1, question, user_record["content"])
+    except Exception as e:
+        # Duplicate detection must never block the interview
+        logger.error(f"Error checking answer for near-duplicates: {str(e)}")
+        return
+    if matches:
+        user_record["near_duplicates"] = [match.to_dict() for match in matches]
+        logger.warning(f"Answer to question {st.session_state.current_question + 1} is a near-duplicate",
+                       extra={"similarity": matches[0].similarity, "matches_interview": matches[0].interview_id})
+
+def score_answer_incrementally(score_optimizer, question, correct_answer, user_input, tests=None):
+    """Score the current answer right away so an adaptive interview can stop early; False if deferred"""
+    with st.status("Scoring your answer...", expanded=False) as status:
+        try:
+            score = score_optimizer.score_answer(question, correct_answer, user_input, tests=tests)
+            store_answer_score(score)
+            status.update(label="✅ Answer scored", state="complete")
+            return True
+        except Exception as e:
+            # Scored in the background once the circuit closes; until then this
+            # question doesn't count towards stopping
+            logger.error(f"Error scoring answer incrementally: {str(e)}")
+            status.update(label="⚠️ Answer scoring deferred", state="error")
+            return False
+
+def run_fused_turn(turn_bot, turn_template, question, answer):
+    """One call for analysis, reference answer and next question; None if it fails"""
+    number = st.session_state.current_question + 2
+    wants_next_question = number <= st.session_state.max_questions
+    # An adaptive interview decides whether to stop once this answer is scored; the next
+    # question is only part of the turn if no score of this answer can stop it
+    if wants_next_question and interview_is_adaptive():
+        wants_next_question = not INTERVIEW_POLICY.may_stop(
+            st.session_state.running_scores, answered=st.session_state.current_question
+        )
+    with st.status("Evaluating your answer...", expanded=False) as status:
+        try:
+            turn = turn_bot.take_turn(
+                system_template=turn_template,
+                question=question,
+                answer=answer,
+                next_question_instruction=(
+                    next_question_prompt(number, st.session_state.max_questions) if wants_next_question else None
+                )
+            )
+            status.update(label="✅ Answer evaluated", state="complete")
+            return turn
+        except Exception as e:
+            # Every part falls back to its own bot
+            logger.error(f"Error in fused turn: {str(e)}")
+            status.update(label="⚠️ Evaluating step by step", state="error")
+            return None
+
+def process_user_answer(user_input, system_template, model, answer_bot, analysis, score_optimizer=None,
+                        turn_bot=None, turn_template=None, test_bot=None):
     """Process user answer and generate next question or complete interview"""
     try:
         logger.info(f"Processing user answer for question {st.session_state.current_question + 1}")
         
-        # Add user message
-        st.session_state.messages.append({"role": "user", "content": user_input})
+        # Add user message; oversized answers are compacted per stage before any request goes out
+        user_record = make_message("user", user_input)
+        compactions = preflight_answer(user_input)
+        if compactions:
+            user_record["compacted"] = {stage: result.text for stage, result in compactions.items()}
+            user_record["trimmed"] = {stage: result.describe() for stage, result in compactions.items()}
+            logger.info(f"Compacted answer for {', '.join(compactions)}",
+                        extra={"original_tokens": next(iter(compactions.values())).original_tokens})
+        st.session_state.messages.append(user_record)
         
-        # Get the last assistant question
+        # Get the last assistant question and its MCQ answer key
         last_question = get_last_assistant_message(st.session_state.messages)
         if not last_question:
             raise ValueError("Could not retrieve the last question")
+        question_record = get_last_assistant_record(st.session_state.messages)
+        flag_duplicate_answer(user_record, last_question)
+        mcq = MCQItem.from_dict(question_record.get("mcq"))
         
-        logger.info(f"Last question retrieved: {last_question[:100]}...")
+        logger.debug(f"Last question retrieved ({len(last_question)} chars)")
+
+        fused = None
+        # A pre-generated interview already has its reference answers and questions
+        if turn_bot is not None and turn_template and not st.session_state.pregenerated:
+            fused = run_fused_turn(turn_bot, turn_template, last_question,
+                                   get_user_answer_for_stage(user_record, "analysis"))
         
         # Generate correct answer using answer_bot
         with st.status("Generating correct answer...", expanded=False) as status:
             try:
-                correct_answer = answer_bot.answer(Question=last_question)
+                correct_answer = (
+                    (mcq and mcq.reference_answer())
+                    or (fused and fused.reference_answer)
+                    or pregenerated_item("answers", st.session_state.current_question)
+                    or (SPECULATIVE_ANSWERS and get_speculation().take(last_question))
+                    or answer_bot.answer(Question=last_question)
+                )
                 if not correct_answer:
                     raise ValueError("Answer bot returned empty response")
                 
-                logger.info(f"Correct answer generated: {correct_answer[:100]}...")
+                logger.info(f"Correct answer generated ({len(correct_answer)} chars)")
                 
                 # Store correct answer in messages for scoring
-                st.session_state.messages.append({
-                    "role": "correct_answer", 
-                    "content": correct_answer,
-                    "question_number": st.session_state.current_question + 1
-                })
+                st.session_state.messages.append(make_message(
+                    "correct_answer", correct_answer,
+                    question_number=st.session_state.current_question + 1
+                ))
                 status.update(label="✅ Correct answer generated", state="complete")
                 
             except Exception as e:
                 logger.error(f"Error generating correct answer: {str(e)}")
-                status.update(label="❌ Error generating correct answer", state="error")
-                # Continue without correct answer - we can still proceed with analysis
-                correct_answer = "Could not generate correct answer"
+                status.update(label="⚠️ Correct answer deferred", state="error")
+                # Continue with a degraded placeholder; it is re-filled and scored in the
+                # background once the circuit closes, and skipped by scoring until then
+                correct_answer = DegradedResult(stage="answer", reason=str(e))
+                st.session_state.messages.append(make_message(
+                    "correct_answer",
+                    **correct_answer.to_message_fields(),
+                    question=last_question,
+                    question_number=st.session_state.current_question + 1
+                ))
         
         # Perform sentiment analysis
         with st.status("Analyzing your response...", expanded=False) as status:
             try:
-                human_message = get_last_user_message(st.session_state.messages)
-                analysis_result = analysis.analysis(
+                human_message = get_user_answer_for_stage(user_record, "analysis")
+                analysis_result = (fused and fused.analysis) or analysis.analysis(
                     human_message=human_message, 
                     ai_message=last_question
                 )
@@ -260,44 +737,90 @@ def process_user_answer(user_input, system_template, model, answer_bot, analysis
                 if not analysis_result:
                     analysis_result = "Analysis completed successfully"
                 
-                logger.info(f"Analysis completed: {analysis_result[:100]}...")
+                logger.info(f"Analysis completed ({len(analysis_result)} chars)")
                 status.update(label="✅ Response analyzed", state="complete")
                 
             except Exception as e:
                 logger.error(f"Error in sentiment analysis: {str(e)}")
-                analysis_result = f"Analysis error: {str(e)}"
-                status.update(label="⚠️ Analysis completed with issues", state="error")
+                analysis_result = DegradedResult(
+                    stage="analysis",
+                    reason=str(e),
+                    content="Response analysis is temporarily unavailable."
+                )
+                status.update(label="⚠️ Analysis skipped", state="error")
+        analysis_degraded = isinstance(analysis_result, DegradedResult)
+
+        # Hidden tests were being written while the candidate answered; the answer is only
+        # scored, or its job submitted, once they are attached
+        tests = wait_for_tests(question_record)
+
+        # A clear choice of an MCQ option is graded against the answer key, without a scoring call
+        mcq_score = grade_mcq(mcq, get_user_answer_for_stage(user_record, "score")) if mcq else None
+        score_deferred = False
+        if mcq_score is not None:
+            store_answer_score(mcq_score)
+        elif isinstance(correct_answer, DegradedResult):
+            score_deferred = True
+        elif interview_is_adaptive() and score_optimizer is not None:
+            score_deferred = not score_answer_incrementally(score_optimizer, last_question, correct_answer,
+                                                            get_user_answer_for_stage(user_record, "score"), tests)
+        elif get_score_queue() is not None:
+            # Scored in a worker process while the interview goes on
+            get_score_queue().submit(
+                st.session_state.interview_id, st.session_state.current_question, last_question,
+                correct_answer, get_user_answer_for_stage(user_record, "score"), tests=tests
+            )
+        if score_deferred and score_optimizer is not None:
+            get_deferred_work(answer_bot, score_optimizer).submit(
+                st.session_state.current_question, last_question, get_user_answer_for_stage(user_record, "score"),
+                correct_answer=None if isinstance(correct_answer, DegradedResult) else correct_answer,
+                tests=tests, mcq=question_record.get("mcq")
+            )
         
         # Increment question counter
         st.session_state.current_question += 1
         
         # Determine next action
-        if st.session_state.current_question < st.session_state.max_questions:
+        if interview_is_adaptive():
+            decision = INTERVIEW_POLICY.decide(
+                st.session_state.running_scores,
+                answered=st.session_state.current_question
+            )
+            has_next_question = decision == CONTINUE
+            if not has_next_question:
+                logger.info(f"Adaptive interview finished after {st.session_state.current_question} questions: {decision}")
+                st.session_state.max_questions = st.session_state.current_question
+        else:
+            has_next_question = st.session_state.current_question < st.session_state.max_questions
+
+        if has_next_question:
             # Generate next question
             with st.status("Preparing next question...", expanded=False) as status:
                 try:
-                    question_prompt = (
-                        f"Generate question {st.session_state.current_question + 1} of "
-                        f"{st.session_state.max_questions}. Make it different from previous "
-                        f"questions and relevant to the candidate's profile and previous answers."
+                    question_prompt = next_question_prompt(
+                        st.session_state.current_question + 1, st.session_state.max_questions
                     )
                     
-                    next_question = model.get_question(
-                        system_template=system_template, 
-                        Answer=question_prompt
+                    next_question = (
+                        (fused and fused.next_question)
+                        or pregenerated_item("questions", st.session_state.current_question)
+                        or model.get_question(system_template=system_template, Answer=question_prompt)
                     )
                     
                     if not next_question:
                         raise ValueError("Model returned empty question")
                     
-                    logger.info(f"Next question generated: {next_question[:100]}...")
+                    logger.info(f"Next question generated ({len(next_question)} chars)")
                     
                     # Add analysis and next question to messages
-                    st.session_state.messages.append({
-                        "role": "assistant", 
-                        "content": f"**Analysis:** {analysis_result}\n\n**Next Question:** {next_question}",
-                        "question_number": st.session_state.current_question + 1
-                    })
+                    record, next_question = append_question_message(
+                        next_question,
+                        prefix=f"**Analysis:** {analysis_result}\n\n**Next Question:** ",
+                        question_number=st.session_state.current_question + 1,
+                        analysis_degraded=analysis_degraded
+                    )
+                    generate_tests(record, test_bot, next_question)
+                    speculate_reference_answer(record, answer_bot, turn_bot if turn_template else None)
                     
                     st.session_state.waiting_for_answer = True
                     status.update(label="✅ Next question ready", state="complete")
@@ -314,15 +837,16 @@ def process_user_answer(user_input, system_template, model, answer_bot, analysis
                 f"{st.session_state.max_questions} questions. Your interview is now complete."
             )
             
-            st.session_state.messages.append({
-                "role": "assistant", 
-                "content": f"**Final Analysis:** {analysis_result}\n\n**Status:** {completion_message}",
-                "is_completion": True
-            })
+            append_assistant_message(
+                f"**Final Analysis:** {analysis_result}\n\n**Status:** {completion_message}",
+                is_completion=True,
+                analysis_degraded=analysis_degraded
+            )
             
             st.session_state.interview_completed = True
             st.session_state.waiting_for_answer = False
-        
+
+        save_interview_snapshot()
         return True, "Success"
         
     except Exception as e:
@@ -334,13 +858,33 @@ def process_user_answer(user_input, system_template, model, answer_bot, analysis
 
 # --- Main Application Logic ---
 
-st.markdown('<h1 class="main-header">🎯 TalentScout Hiring Assistant</h1>', unsafe_allow_html=True)
+def get_execution_grader():
+    """Sandboxed test runner for coding answers; None where it is disabled or unsupported"""
+    pool = get_sandbox_pool() if CODE_GRADER else None
+    return ExecutionGrader(pool) if pool is not None else None
 
-# Sidebar for candidate information form
-with st.sidebar:
+@st.cache_resource
+def get_models(api_key, prompt_version, _prompts):
+    """Build the AI models once per API key and prompt version instead of on every rerun"""
+    logger.info(f"Building models for prompt version {prompt_version}")
+    return {
+        "model": Chatbot(api_key=api_key),
+        "answer_bot": AnswerBot(api_key=api_key, prompt=_prompts['answer_bot']),
+        "analysis": SentimentAnalysis(api_key=api_key, prompt=_prompts['prompt_analysis']),
+        "score_optimizer": ScoreOptimizer(api_key=api_key, prompt=_prompts,
+                                          pre_scorer=LocalPreScorer() if PRE_SCORE else None,
+                                          execution_grader=get_execution_grader()),
+        "turn_bot": FusedTurnBot(api_key=api_key) if FUSED_TURN else None,
+        "test_bot": TestCaseBot(api_key=api_key, prompt=_prompts) if CODE_GRADER else None
+    }
+
+
+@st.fragment
+def render_sidebar():
+    """Candidate information form; submitting it only reruns this fragment until the data is valid"""
     st.markdown('<h2 class="section-header">📋 Candidate Information</h2>', unsafe_allow_html=True)
 
-    with st.form("candidate_form"):
+    with rerun_timer.measure("sidebar"), st.form("candidate_form"):
         # Personal Information
         st.subheader("Personal Details")
         full_name = st.text_input("Full Name *", placeholder="Enter your full name")
@@ -396,6 +940,8 @@ with st.sidebar:
         submitted = st.form_submit_button("Start Interview Process", use_container_width=True)
 
         if submitted:
+            prime_session_connection()
+
             # Prepare candidate data
             candidate_data = {
                 "full_name": full_name,
@@ -407,10 +953,10 @@ with st.sidebar:
                 "tech_stack": tech_stack + ([other_tech] if "Other" in tech_stack and other_tech else []),
                 "key_technologies": key_technologies + ([other_key_tech] if "Other" in key_technologies and other_key_tech else [])
             }
-            
+
             # Validation
             is_valid, error_message = validate_required_fields(candidate_data)
-            
+
             if not is_valid:
                 st.error(error_message)
             else:
@@ -418,30 +964,36 @@ with st.sidebar:
                 st.session_state.candidate_data = candidate_data
                 st.session_state.form_submitted = True
                 reset_interview_state()
-                st.success("✅Your Data is not stored and shared. All interaction are process localy and delete when you close the browser. Start Inteview")
-                st.rerun()
+                st.success("✅ Profile saved. Your profile, answers and scores are stored for the hiring team's "
+                           f"review; the copy kept to resume an unfinished interview is deleted after "
+                           f"{SNAPSHOT_RETENTION_HOURS:g} hours.")
+                # The profile changes the whole page, so rerun the full app
+                st.rerun(scope="app")
 
-    # Show interview progress in sidebar if started
-    if st.session_state.chat_started and not st.session_state.interview_completed:
-        st.markdown("---")
-        st.markdown("### 📊 Interview Progress")
-        progress = st.session_state.current_question / st.session_state.max_questions
-        st.progress(progress)
-        st.markdown(f"**Questions Completed:** {st.session_state.current_question}/{st.session_state.max_questions}")
-        
-        # Show current status
-        if st.session_state.waiting_for_answer:
-            st.info("⏳ Waiting for your answer...")
-        elif st.session_state.processing_answer:
-            st.info("🔄 Processing your response...")
-
-# Main content area
-if not st.session_state.form_submitted:
-    st.markdown("""
+
+def render_welcome():
+    """Landing page shown until the candidate form is submitted"""
+    if ADAPTIVE_INTERVIEW:
+        question_count = f"{INTERVIEW_POLICY.min_questions} to {INTERVIEW_POLICY.max_questions} technical questions"
+        offer = (f"**{INTERVIEW_POLICY.min_questions} to {INTERVIEW_POLICY.max_questions} Questions**: "
+                 f"Ends as soon as your answers make the result clear")
+        steps = ["**Answer the Questions**: One technical question at a time",
+                 f"**Interview Ends**: After {INTERVIEW_POLICY.min_questions} to "
+                 f"{INTERVIEW_POLICY.max_questions} questions, depending on your answers"]
+    else:
+        question_count = f"exactly {FIXED_QUESTIONS} technical questions"
+        offer = f"**Exactly {FIXED_QUESTIONS} Questions**: Focused technical assessment"
+        steps = [f"**Answer Question {number}**: "
+                 + ("Final" if number == FIXED_QUESTIONS else "First" if number == 1 else "Next")
+                 + " technical question"
+                 for number in range(1, FIXED_QUESTIONS + 1)]
+    steps = ["**Fill Information**: Complete the form in the sidebar", *steps,
+             "**Get Your Score**: Detailed performance analysis"]
+    st.markdown(f"""
     <div class="info-box">
         <h3>Welcome to TalentScout! 👋</h3>
         <p>Please fill out the candidate information form in the sidebar to get started with your technical interview process.</p>
-        <p>We'll ask you exactly <strong>3 technical questions</strong> and then provide your performance score.</p>
+        <p>We'll ask you <strong>{question_count}</strong> and then provide your performance score.</p>
     </div>
     """, unsafe_allow_html=True)
 
@@ -450,8 +1002,8 @@ if not st.session_state.form_submitted:
 
     with col1:
         st.markdown("### 🎯 What We Offer")
-        st.markdown("""
-        - **Exactly 3 Questions**: Focused technical assessment
+        st.markdown(f"""
+        - {offer}
         - Experience-level appropriate difficulty
         - Real-time interview simulation
         - Comprehensive performance scoring
@@ -460,19 +1012,13 @@ if not st.session_state.form_submitted:
 
     with col2:
         st.markdown("### 🚀 Interview Process")
-        st.markdown("""
-        1. **Fill Information**: Complete the form in the sidebar
-        2. **Answer Question 1**: First technical question
-        3. **Answer Question 2**: Second technical question
-        4. **Answer Question 3**: Final technical question
-        5. **Get Your Score**: Detailed performance analysis
-        """)
+        st.markdown("\n".join(f"{number}. {step}" for number, step in enumerate(steps, 1)))
+
 
-else:
-    # Display candidate summary
+def render_candidate_profile(candidate):
+    """Display candidate summary"""
     st.markdown('<h2 class="section-header">👤 Candidate Profile</h2>', unsafe_allow_html=True)
 
-    candidate = st.session_state.candidate_data
     col1, col2, col3 = st.columns(3)
 
     with col1:
@@ -504,312 +1050,481 @@ else:
         **Specializations:** {key_tech_display}
         """)
 
+
+def render_completion(candidate):
+    """Interview completed - show completion message and score option"""
+    st.markdown(f"""
+    <div class="completion-box">
+        <h3>🎉 Interview Completed Successfully!</h3>
+        <p><strong>Congratulations, {candidate['full_name']}!</strong></p>
+        <p>You have successfully answered all <strong>{st.session_state.max_questions} technical questions</strong>.</p>
+        <p>Click below to see your detailed performance analysis and score.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    if st.button("📊 Check My Interview Score", use_container_width=True):
+        st.session_state.show_score = True
+        st.rerun()
+
+
+def render_question_score(number, score_data):
+    """One question's score panel; returns its overall score out of 10 for the average, if any"""
+    st.markdown(f"#### Question {number} Performance:")
+
+    if isinstance(score_data, DegradedResult):
+        # Deferred items are kept out of the average
+        st.info(f"⏳ {score_data.content}")
+        st.markdown("---")
+        return None
+
+    try:
+        # Try to parse JSON if it's a string
+        if isinstance(score_data, str):
+            # Extract JSON from the response if it contains other text
+            start_idx = score_data.find('{')
+            end_idx = score_data.rfind('}') + 1
+            if start_idx != -1 and end_idx != 0:
+                json_str = score_data[start_idx:end_idx]
+                parsed_score = json.loads(json_str)
+            else:
+                # If no JSON found, display raw text
+                st.markdown(score_data)
+                return parse_score(score_data).overall
+        else:
+            parsed_score = score_data
+
+        # Display scores in a structured format
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric("Relevance", f"{parsed_score.get('relevance_score', 0)}/10")
+            st.metric("Accuracy", f"{parsed_score.get('accuracy_score', 0)}/10")
+
+        with col2:
+            st.metric("Completeness", f"{parsed_score.get('completeness_score', 0)}/10")
+            st.metric("Clarity", f"{parsed_score.get('clarity_score', 0)}/10")
+
+        with col3:
+            st.metric("Depth", f"{parsed_score.get('depth_score', 0)}/10")
+            overall_score = parsed_score.get('overall_score', 0)
+            st.metric("Overall Score", f"{overall_score:.1f}/10", delta=None)
+
+        st.markdown("---")
+        return overall_score
+
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        # If parsing fails, display as raw text
+        st.markdown(f"**Raw Analysis:** {score_data}")
+        logger.warning(f"Could not parse score JSON for question {number}: {e}")
+        st.markdown("---")
+        return None
+
+def render_average_score(average_score, scored, total):
+    """Overall interview performance; marked as provisional while answers are still being scored"""
+    st.markdown("### 🏆 Overall Interview Performance")
+
+    # Color code the overall score
+    if average_score >= 8:
+        score_color = "#27AE60"  # Green
+        performance_level = "Excellent"
+    elif average_score >= 6:
+        score_color = "#F39C12"  # Orange
+        performance_level = "Good"
+    elif average_score >= 4:
+        score_color = "#E67E22"  # Dark Orange
+        performance_level = "Fair"
+    else:
+        score_color = "#E74C3C"  # Red
+        performance_level = "Needs Improvement"
+
+    st.markdown(f"""
+    <div style="text-align: center; padding: 20px; border-radius: 10px; background-color: {score_color}20; border: 2px solid {score_color};">
+        <h2 style="color: {score_color}; margin: 0;">Average Score: {average_score:.1f}/10</h2>
+        <h3 style="color: {score_color}; margin: 10px 0;">Performance Level: {performance_level}</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    st.caption(f"🔄 Based on {scored} of {total} answers so far" if scored < total
+               else f"Based on all {total} answers")
+
+@st.fragment
+def render_score(score_optimizer, answer_bot):
+    """Score analysis; retrying deferred scores only reruns this fragment"""
+    with rerun_timer.measure("score"):
+        st.markdown(f"""
+        <div class="score-box">
+            <h3>📊 Your Interview Performance Analysis</h3>
+            <p>Based on your answers to all {st.session_state.max_questions} questions</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        try:
+            # Generate comprehensive score analysis
+            with st.spinner("🔄 Analyzing your interview performance..."):
+                # Filter messages for scoring (only user and assistant messages)
+                conversation_history = [
+                    msg for msg in st.session_state.messages
+                    if msg["role"] in ["user", "assistant", "correct_answer"]
+                ]
+
+                if conversation_history:
+                    # Answers already scored during an adaptive interview, by the background
+                    # workers, by the deferred work or by an earlier run of this page are reused
+                    if take_deferred_results():
+                        save_interview_snapshot()
+                    known_scores = dict(st.session_state.answer_scores)
+                    deferred_work = get_deferred_work(answer_bot, score_optimizer)
+                    for index in range(score_optimizer.count_scores(conversation_history)):
+                        if index not in known_scores and deferred_work.is_pending(index):
+                            known_scores[index] = DegradedResult(
+                                stage="score", reason="in progress",
+                                content="Scoring deferred until the service is available again, "
+                                        "this updates automatically."
+                            )
+                    scoring_in_progress = 0
+                    jobs = {}
+                    score_queue = get_score_queue()
+                    if score_queue is not None and st.session_state.interview_id:
+                        jobs = score_queue.store.statuses(st.session_state.interview_id)
+                        for index, job in jobs.items():
+                            if job["status"] == DONE:
+                                known_scores[index] = job["result"]
+                            elif job["status"] != FAILED and not job["stalled"] and index not in known_scores:
+                                scoring_in_progress += 1
+                    if scoring_in_progress:
+                        # Answers the workers gave up on are scored here once the rest are done,
+                        # not again on every poll
+                        for index in range(score_optimizer.count_scores(conversation_history)):
+                            known_scores.setdefault(index, DegradedResult(
+                                stage="score", reason="in progress",
+                                content="Scoring in progress, this updates automatically."
+                            ))
+
+                    st.markdown("### 🎯 Detailed Score Analysis:")
+
+                    # One panel per question, filled in as soon as its score arrives
+                    question_count = score_optimizer.count_scores(conversation_history)
+                    panels = [st.empty() for _ in range(question_count)]
+                    for i, panel in enumerate(panels, 1):
+                        with panel.container():
+                            st.markdown(f"#### Question {i} Performance:")
+                            st.caption("🔄 Scoring this answer...")
+                    average_panel = st.empty()
+
+                    results = {}
+                    overall_scores = []
+                    score_items = score_optimizer.score_items(conversation_history)
+                    with profiled("generate_score"):
+                        for index, score_data in score_optimizer.iter_scores(
+                                conversation_history, known_scores=known_scores):
+                            results[index] = score_data
+                            if index not in known_scores and not isinstance(score_data, DegradedResult):
+                                # Scored here: keep it, so later reruns and reloads do not pay for it again
+                                st.session_state.answer_scores[index] = score_data
+                                if index in jobs:
+                                    score_queue.store.complete(st.session_state.interview_id, index, score_data,
+                                                               prompt_version=PROMPTS.version)
+                            elif index not in known_scores and not deferred_work.given_up(index):
+                                defer_score(deferred_work, index, score_items[index])
+                            with panels[index].container():
+                                overall_score = render_question_score(index + 1, score_data)
+                            if overall_score is not None:
+                                overall_scores.append(overall_score)
+                                # Running average over the answers scored so far; pending and
+                                # deferred answers are not part of it and are not counted
+                                with average_panel.container():
+                                    render_average_score(sum(overall_scores) / len(overall_scores),
+                                                         len(overall_scores), question_count)
+                    score_results = [results[i] for i in range(question_count)]
+
+                    if score_results:
+                        deferred_scores = sum(1 for score_data in score_results
+                                              if isinstance(score_data, DegradedResult))
+
+                        local_scores = sum(1 for score_data in score_results if is_local_score(score_data))
+                        if local_scores:
+                            st.caption(f"⚡ {local_scores} of {len(score_results)} answers were clear-cut and "
+                                       f"scored locally, saving {local_scores} LLM call(s).")
+                        mcq_scores = sum(1 for score_data in score_results if is_mcq_score(score_data))
+                        if mcq_scores:
+                            st.caption(f"✅ {mcq_scores} multiple choice answer(s) were graded against the "
+                                       f"answer key, saving {2 * mcq_scores} LLM call(s).")
+                        executed_scores = sum(1 for score_data in score_results if is_execution_score(score_data))
+                        if executed_scores:
+                            st.caption(f"🧪 {executed_scores} coding answer(s) were graded by running hidden test cases.")
+
+                        if not deferred_scores:
+                            record_interview_scores(score_results)
+
+                        # Deferred scores are shown once they are drained, or given up on
+                        deferring = any(isinstance(score_data, DegradedResult) and not deferred_work.given_up(index)
+                                        for index, score_data in results.items())
+                        if scoring_in_progress or deferring:
+                            # Poll until the workers and the deferred work are done, less often the longer they take
+                            interval = st.session_state.score_poll_interval
+                            st.session_state.score_poll_interval = min(interval * 1.5, SCORE_POLL_MAX_SECONDS)
+                            time.sleep(interval)
+                            rerun_fragment()
+                        st.session_state.score_poll_interval = SCORE_POLL_SECONDS
+                        if deferred_scores:
+                            st.warning(f"⚠️ {deferred_scores} question(s) could not be scored right now "
+                                       f"and are excluded from the average.")
+                            if st.button("🔄 Retry Deferred Scores", key="retry_deferred_scores"):
+                                for index, score_data in results.items():
+                                    if isinstance(score_data, DegradedResult) and deferred_work.given_up(index):
+                                        defer_score(deferred_work, index, score_items[index])
+                                rerun_fragment()
+                else:
+                    st.warning("⚠️ No conversation history found for scoring.")
+
+            # Show correct answers if available
+            correct_answers = [
+                msg for msg in st.session_state.messages
+                if msg["role"] == "correct_answer" and not msg.get("degraded")
+            ]
+
+            if correct_answers:
+                with st.expander("🔍 View Correct Answers", expanded=False):
+                    for i, answer_msg in enumerate(correct_answers, 1):
+                        st.markdown(f"""
+                        <div class="answer-box">
+                            <h4>Question {answer_msg.get('question_number', i)} - Correct Answer:</h4>
+                            <p>{answer_msg['content']}</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+
+            # Option to restart interview
+            st.markdown("---")
+            col1, col2 = st.columns(2)
+
+            with col1:
+                if st.button("🔄 Take Another Interview", use_container_width=True):
+                    reset_interview_state()
+                    st.rerun(scope="app")
+
+            with col2:
+                if st.button("👤 Update Profile", use_container_width=True):
+                    st.session_state.form_submitted = False
+                    reset_interview_state()
+                    st.rerun(scope="app")
+
+        except Exception as e:
+            error_msg = f"Error generating score: {str(e)}"
+            logger.error(error_msg)
+            display_error(error_msg, show_retry=True)
+
+
+@st.fragment
+def render_interview(candidate, system_template, model, answer_bot, analysis, score_optimizer,
+                     turn_bot=None, turn_template=None, test_bot=None):
+    """Active interview flow; answering a question only reruns this fragment"""
+    with rerun_timer.measure("interview"):
+        # Show current question number and progress
+        st.markdown(f"""
+        <div class="question-counter">
+            Question {st.session_state.current_question + 1} of {st.session_state.max_questions}
+        </div>
+        """, unsafe_allow_html=True)
+        st.progress(st.session_state.current_question / st.session_state.max_questions)
+
+        st.markdown(f"""
+        <div class="success-box">
+            <strong>Interview in Progress</strong> -
+            Good luck, {candidate['full_name']}! Answer each question thoughtfully.
+        </div>
+        """, unsafe_allow_html=True)
+
+        # Display all messages; assistant messages are split into parts when they are appended
+        for message in st.session_state.messages:
+            if message["role"] == "user":
+                with st.chat_message("user"):
+                    st.markdown(message["content"])
+                    for stage, description in (message.get("trimmed") or {}).items():
+                        st.caption(f"✂️ Trimmed for {stage}: {description}")
+            elif message["role"] == "assistant":
+                for part in message.get("parts") or [message["content"]]:
+                    st.chat_message("assistant").markdown(part)
+
+        # Generate first question if no messages exist
+        if not st.session_state.messages and not st.session_state.waiting_for_answer:
+            with st.spinner("🤖 Generating your first question..."):
+                try:
+                    question_prompt = first_question_prompt(st.session_state.max_questions)
+                    first_question = pregenerated_item("questions", 0) or model.get_question(
+                        system_template=system_template, Answer=question_prompt
+                    )
+
+                    if not first_question:
+                        raise ValueError("Model returned empty first question")
+
+                    record, first_question = append_question_message(first_question, question_number=1)
+                    generate_tests(record, test_bot, first_question)
+                    speculate_reference_answer(record, answer_bot, turn_bot if turn_template else None)
+                    st.session_state.waiting_for_answer = True
+                    save_interview_snapshot()
+                    logger.info("First question generated successfully")
+                    rerun_fragment()
+
+                except Exception as e:
+                    error_msg = f"Error generating first question: {str(e)}"
+                    logger.error(error_msg)
+                    st.session_state.error_occurred = True
+                    st.session_state.last_error = error_msg
+                    st.rerun(scope="app")
+
+        # Chat input - only show if not completed and waiting for an answer
+        if (st.session_state.current_question < st.session_state.max_questions and
+            st.session_state.waiting_for_answer and
+            not st.session_state.processing_answer):
+
+            user_input = st.chat_input(f"Your answer to Question {st.session_state.current_question + 1}...")
+
+            if user_input:
+                st.session_state.processing_answer = True
+                st.session_state.waiting_for_answer = False
+
+                # Process the answer in a separate function
+                with profiled("process_user_answer"):
+                    success, message = process_user_answer(
+                        user_input, system_template, model, answer_bot, analysis, score_optimizer,
+                        turn_bot=turn_bot, turn_template=turn_template, test_bot=test_bot
+                    )
+
+                st.session_state.processing_answer = False
+
+                if not success:
+                    st.session_state.error_occurred = True
+                    st.session_state.last_error = message
+
+                # Errors and the end of the interview change the whole page
+                if not success or st.session_state.interview_completed:
+                    st.rerun(scope="app")
+                rerun_fragment()
+
+
+def render_main():
+    """Candidate profile plus the current interview stage"""
+    candidate = st.session_state.candidate_data
+    render_candidate_profile(candidate)
+
     # Interview Section
     st.markdown('<h2 class="section-header">💬 Technical Interview</h2>', unsafe_allow_html=True)
 
-    # Check for API key
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
+    # Check for API keys; the session sticks to one key of the pool
+    key_pool = get_key_pool()
+    if key_pool is None:
         st.error("🔑 GROQ_API_KEY not found in environment variables. Please check your .env file.")
         st.info("💡 You can get your API key from [Groq Console](https://console.groq.com/keys).")
         st.stop()
+    try:
+        api_key = key_pool.choose(st.session_state.session_id)
+    except NoAvailableKeyError as e:
+        if e.retry_in == float("inf"):
+            st.error("🔑 None of the configured API keys are valid. Please check your GROQ keys.")
+        else:
+            st.warning(f"⏳ The interview service is at capacity. Please try again in about {e.retry_in:.0f} seconds.")
+        st.stop()
 
     # Initialize AI models
     try:
-        # Initialize models with error handling
-        model = Chatbot(api_key=api_key)
-        
-        if 'answer_bot' not in PROMPTS:
-            st.error("❌ 'answer_bot' prompt not found in PROMPTS configuration")
-            st.stop()
-            
-        answer_bot = AnswerBot(api_key=api_key, prompt=PROMPTS['answer_bot'])
-        
-        if 'prompt_analysis' not in PROMPTS:
-            st.error("❌ 'prompt_analysis' prompt not found in PROMPTS configuration")
-            st.stop()
-            
-        analysis = SentimentAnalysis(api_key=api_key, prompt=PROMPTS['prompt_analysis'])
-        score_optimizer = ScoreOptimizer(api_key=api_key, prompt=PROMPTS)
+        # Models are cached per API key and prompt version; required prompts are
+        # validated by the prompt registry
+        models = get_models(api_key, PROMPTS.version, PROMPTS)
+        model = models["model"]
+        answer_bot = models["answer_bot"]
+        analysis = models["analysis"]
+        score_optimizer = models["score_optimizer"]
 
-        # Create system template based on candidate data
-        experience_level = get_experience_level(candidate['experience_years'])
-        
-        if 'prompt_bot' not in PROMPTS:
-            st.error("❌ 'prompt_bot' prompt not found in PROMPTS configuration")
-            st.stop()
-            
-        system_template = PROMPTS['prompt_bot'].format(
-            experience_level=experience_level,
-            experience_years=candidate['experience_years'],
-            desired_positions=candidate['desired_positions'],
-            tech_stack=candidate['tech_stack'],
-            key_technologies=candidate['key_technologies']
-        )
+        # System template from the candidate data, rendered from the precompiled
+        # template; identical profiles hit the per-version cache
+        profile = interview_profile(candidate)
+        system_template = PROMPTS.render('prompt_bot', **profile)
+        turn_bot = models["turn_bot"]
+        turn_template = PROMPTS.render('prompt_turn', **profile) if turn_bot is not None else None
+    except Exception as e:
+        error_msg = f"Error initializing AI models: {str(e)}"
+        logger.error(error_msg)
+        display_error(error_msg)
+        return
 
-        # Handle error states
-        if st.session_state.error_occurred:
-            display_error(st.session_state.last_error, show_retry=True)
-
-        # Interview States Management
-        elif not st.session_state.chat_started and not st.session_state.interview_completed:
-            # Start interview button
-            if st.button("🚀 Start 3-Question Technical Interview", use_container_width=True):
-                logger.info("Starting new interview")
-                st.session_state.chat_started = True
-                st.session_state.current_question = 0
-                st.session_state.messages = []
-                st.session_state.interview_completed = False
-                st.session_state.show_score = False
-                st.session_state.waiting_for_answer = False
-                st.session_state.processing_answer = False
-                st.session_state.error_occurred = False
-                st.rerun()
-
-        elif st.session_state.interview_completed and not st.session_state.show_score:
-            # Interview completed - show completion message and score option
-            st.markdown(f"""
-            <div class="completion-box">
-                <h3>🎉 Interview Completed Successfully!</h3>
-                <p><strong>Congratulations, {candidate['full_name']}!</strong></p>
-                <p>You have successfully answered all <strong>{st.session_state.max_questions} technical questions</strong>.</p>
-                <p>Click below to see your detailed performance analysis and score.</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-            if st.button("📊 Check My Interview Score", use_container_width=True):
-                st.session_state.show_score = True
-                st.rerun()
-
-        elif st.session_state.show_score:
-            # Show score analysis
-            st.markdown(f"""
-            <div class="score-box">
-                <h3>📊 Your Interview Performance Analysis</h3>
-                <p>Based on your answers to all {st.session_state.max_questions} questions</p>
-            </div>
-            """, unsafe_allow_html=True)
+    # Answers and scores the deferred work finished since the last rerun
+    if take_deferred_results():
+        save_interview_snapshot()
 
-            try:
-                # Generate comprehensive score analysis
-                with st.spinner("🔄 Analyzing your interview performance..."):
-                    # Filter messages for scoring (only user and assistant messages)
-                    conversation_history = [
-                        msg for msg in st.session_state.messages
-                        if msg["role"] in ["user", "assistant", "correct_answer"]
-                    ]
-                    
-                    if conversation_history:
-                        score_results = score_optimizer.generate_score(conversation_history)
-                        
-                        st.markdown("### 🎯 Detailed Score Analysis:")
-                        
-                        if isinstance(score_results, list):
-                            total_overall_score = 0
-                            valid_scores = 0
-                            
-                            for i, score_data in enumerate(score_results, 1):
-                                st.markdown(f"#### Question {i} Performance:")
-                                
-                                try:
-                                    # Try to parse JSON if it's a string
-                                    if isinstance(score_data, str):
-                                        import json
-                                        # Extract JSON from the response if it contains other text
-                                        start_idx = score_data.find('{')
-                                        end_idx = score_data.rfind('}') + 1
-                                        if start_idx != -1 and end_idx != 0:
-                                            json_str = score_data[start_idx:end_idx]
-                                            parsed_score = json.loads(json_str)
-                                        else:
-                                            # If no JSON found, display raw text
-                                            st.markdown(score_data)
-                                            continue
-                                    else:
-                                        parsed_score = score_data
-                                    
-                                    # Display scores in a structured format
-                                    col1, col2, col3 = st.columns(3)
-                                    
-                                    with col1:
-                                        st.metric("Relevance", f"{parsed_score.get('relevance_score', 0)}/10")
-                                        st.metric("Accuracy", f"{parsed_score.get('accuracy_score', 0)}/10")
-                                    
-                                    with col2:
-                                        st.metric("Completeness", f"{parsed_score.get('completeness_score', 0)}/10")
-                                        st.metric("Clarity", f"{parsed_score.get('clarity_score', 0)}/10")
-                                    
-                                    with col3:
-                                        st.metric("Depth", f"{parsed_score.get('depth_score', 0)}/10")
-                                        overall_score = parsed_score.get('overall_score', 0)
-                                        st.metric("Overall Score", f"{overall_score:.1f}/10", delta=None)
-                                    
-                                    total_overall_score += overall_score
-                                    valid_scores += 1
-                                    
-                                except (json.JSONDecodeError, KeyError, TypeError) as e:
-                                    # If parsing fails, display as raw text
-                                    st.markdown(f"**Raw Analysis:** {score_data}")
-                                    logger.warning(f"Could not parse score JSON for question {i}: {e}")
-                                
-                                st.markdown("---")
-                            
-                            # Display overall interview performance
-                            if valid_scores > 0:
-                                average_score = total_overall_score / valid_scores
-                                st.markdown("### 🏆 Overall Interview Performance")
-                                
-                                # Color code the overall score
-                                if average_score >= 8:
-                                    score_color = "#27AE60"  # Green
-                                    performance_level = "Excellent"
-                                elif average_score >= 6:
-                                    score_color = "#F39C12"  # Orange
-                                    performance_level = "Good"
-                                elif average_score >= 4:
-                                    score_color = "#E67E22"  # Dark Orange
-                                    performance_level = "Fair"
-                                else:
-                                    score_color = "#E74C3C"  # Red
-                                    performance_level = "Needs Improvement"
-                                
-                                st.markdown(f"""
-                                <div style="text-align: center; padding: 20px; border-radius: 10px; background-color: {score_color}20; border: 2px solid {score_color};">
-                                    <h2 style="color: {score_color}; margin: 0;">Average Score: {average_score:.1f}/10</h2>
-                                    <h3 style="color: {score_color}; margin: 10px 0;">Performance Level: {performance_level}</h3>
-                                </div>
-                                """, unsafe_allow_html=True)
-                        else:
-                            st.markdown(score_results)
-                    else:
-                        st.warning("⚠️ No conversation history found for scoring.")
-
-                # Show correct answers if available
-                correct_answers = [
-                    msg for msg in st.session_state.messages 
-                    if msg["role"] == "correct_answer"
-                ]
-                
-                if correct_answers:
-                    with st.expander("🔍 View Correct Answers", expanded=False):
-                        for i, answer_msg in enumerate(correct_answers, 1):
-                            st.markdown(f"""
-                            <div class="answer-box">
-                                <h4>Question {answer_msg.get('question_number', i)} - Correct Answer:</h4>
-                                <p>{answer_msg['content']}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-
-                # Option to restart interview
-                st.markdown("---")
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    if st.button("🔄 Take Another Interview", use_container_width=True):
-                        reset_interview_state()
-                        st.rerun()
-                
-                with col2:
-                    if st.button("👤 Update Profile", use_container_width=True):
-                        st.session_state.form_submitted = False
-                        reset_interview_state()
-                        st.rerun()
-                        
-            except Exception as e:
-                error_msg = f"Error generating score: {str(e)}"
-                logger.error(error_msg)
-                display_error(error_msg, show_retry=True)
-
-        # Active Interview Flow
-        elif st.session_state.chat_started and not st.session_state.interview_completed:
-
-            # Show current question number
-            st.markdown(f"""
-            <div class="question-counter">
-                Question {st.session_state.current_question + 1} of {st.session_state.max_questions}
-            </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown(f"""
-            <div class="success-box">
-                <strong>Interview in Progress</strong> - 
-                Good luck, {candidate['full_name']}! Answer each question thoughtfully.
-            </div>
-            """, unsafe_allow_html=True)
-
-            # Display all messages
-            for message in st.session_state.messages:
-                if message["role"] == "user":
-                    st.chat_message("user").markdown(message["content"])
-                elif message["role"] == "assistant":
-                    # Handle different types of assistant messages
-                    content = message["content"]
-                    if "**Analysis:**" in content and "**Next Question:**" in content:
-                        # Split analysis and question
-                        parts = content.split("**Next Question:**")
-                        if len(parts) == 2:
-                            st.chat_message("assistant").markdown(parts[0])  # Analysis
-                            st.chat_message("assistant").markdown(f"**Next Question:**{parts[1]}")  # Question
-                        else:
-                            st.chat_message("assistant").markdown(content)
-                    elif "**Final Analysis:**" in content and "**Status:**" in content:
-                        # Split final analysis and completion status
-                        parts = content.split("**Status:**")
-                        if len(parts) == 2:
-                            st.chat_message("assistant").markdown(parts[0])  # Final Analysis
-                            st.chat_message("assistant").markdown(f"**Status:**{parts[1]}")  # Status
-                        else:
-                            st.chat_message("assistant").markdown(content)
-                    else:
-                        st.chat_message("assistant").markdown(content)
-
-            # Generate first question if no messages exist
-            if not st.session_state.messages and not st.session_state.waiting_for_answer:
-                with st.spinner("🤖 Generating your first question..."):
-                    try:
-                        question_prompt = f"Generate question 1 of {st.session_state.max_questions} technical interview questions."
-                        first_question = model.get_question(system_template=system_template, Answer=question_prompt)
-                        
-                        if not first_question:
-                            raise ValueError("Model returned empty first question")
-                        
-                        st.session_state.messages.append({
-                            "role": "assistant", 
-                            "content": first_question,
-                            "question_number": 1
-                        })
-                        st.session_state.waiting_for_answer = True
-                        logger.info("First question generated successfully")
-                        st.rerun()
-                        
-                    except Exception as e:
-                        error_msg = f"Error generating first question: {str(e)}"
-                        logger.error(error_msg)
-                        st.session_state.error_occurred = True
-                        st.session_state.last_error = error_msg
-                        st.rerun()
-
-            # Chat input - only show if not completed and waiting for an answer
-            if (st.session_state.current_question < st.session_state.max_questions and 
-                st.session_state.waiting_for_answer and 
-                not st.session_state.processing_answer):
-                
-                user_input = st.chat_input(f"Your answer to Question {st.session_state.current_question + 1}...")
-                
-                if user_input:
-                    st.session_state.processing_answer = True
-                    st.session_state.waiting_for_answer = False
-                    
-                    # Process the answer in a separate function
-                    success, message = process_user_answer(user_input, system_template, model, answer_bot, analysis)
-                    
-                    st.session_state.processing_answer = False
-                    
-                    if not success:
-                        st.session_state.error_occurred = True
-                        st.session_state.last_error = message
-                    
-                    st.rerun()
+    # Handle error states
+    if st.session_state.error_occurred:
+        display_error(st.session_state.last_error, show_retry=True)
 
-    except Exception as e:
-        error_msg = f"Error initializing AI models: {str(e)}"
\ No newline at end of file
+    # Interview States Management
+    elif not st.session_state.chat_started and not st.session_state.interview_completed:
+        # Start interview button
+        start_label = ("🚀 Start Technical Interview" if interview_is_adaptive()
+                       else f"🚀 Start {st.session_state.max_questions}-Question Technical Interview")
+        if st.button(start_label, use_container_width=True):
+            logger.info("Starting new interview")
+            st.session_state.chat_started = True
+            st.session_state.current_question = 0
+            st.session_state.messages = []
+            st.session_state.interview_completed = False
+            st.session_state.show_score = False
+            st.session_state.waiting_for_answer = False
+            st.session_state.processing_answer = False
+            st.session_state.error_occurred = False
+            # Score records are keyed by the prompt version the interview ran with
+            st.session_state.prompt_version = PROMPTS.version
+            st.session_state.interview_id = uuid.uuid4().hex
+            st.session_state.resume_token = secrets.token_urlsafe(24)
+            # Lets a reloaded page find the interview and its background scores again
+            st.query_params["resume"] = st.session_state.resume_token
+            st.rerun()
+
+    elif st.session_state.interview_completed and not st.session_state.show_score:
+        render_completion(candidate)
+
+    elif st.session_state.show_score:
+        render_score(score_optimizer, answer_bot)
+
+    # Active Interview Flow
+    elif st.session_state.chat_started and not st.session_state.interview_completed:
+        render_interview(candidate, system_template, model, answer_bot, analysis, score_optimizer,
+                         turn_bot, turn_template, models["test_bot"])
+
+
+with rerun_timer.measure("app"), profiled("rerun"):
+    st.markdown('<h1 class="main-header">🎯 TalentScout Hiring Assistant</h1>', unsafe_allow_html=True)
+
+    # Sidebar for candidate information form
+    with st.sidebar:
+        render_sidebar()
+
+    # Main content area
+    if not st.session_state.form_submitted:
+        render_welcome()
+    else:
+        render_main()
+
+if os.getenv("TALENTSCOUT_SHOW_TIMINGS") or st.query_params.get("timings"):
+    with st.sidebar.expander("⏱️ Rerun timings", expanded=False):
+        st.table(rerun_timer.summary())
+        if get_key_pool() is not None:
+            st.table(get_key_pool().status())
+        st.caption(f"Warm-up: {'ready' if get_warmup().ready else 'warming'}")
+        if st.session_state.speculation is not None:
+            speculation = st.session_state.speculation
+            st.caption(f"Speculative reference answers: {speculation.hits} used, "
+                       f"{speculation.misses} missed, {speculation.cancelled} cancelled")
+        if get_warmup().status():
+            st.table(get_warmup().status())
+        if st.session_state.messages:
+            st.caption("Session messages memory")
+            st.table([memory_report(st.session_state.messages)])
+
+if profiling_enabled():
+    with st.sidebar.expander("🔥 Profiles", expanded=False):
+        profiles = get_profiler().recent(st.session_state.session_id)
+        if profiles:
+            st.caption(f"Flame graphs and tables in {os.path.dirname(profiles[-1].files.get('svg', '')) or 'memory only'}")
+            st.table([profile.summary() for profile in reversed(profiles)])
+            st.caption(f"Hottest functions of the last {profiles[-1].section}")
+            st.table(profiles[-1].function_table(limit=15))
+        else:
+            st.caption("No profiled reruns yet")
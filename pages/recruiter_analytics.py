@@ -0,0 +1,215 @@
+import os
+import hmac
+import json
+import time
+import streamlit as st
+from dotenv import load_dotenv
+from src.analytics.score_store import (
+    ScoreStore, EXPERIENCE_LEVELS, interview_means, cohort_filter, cohort_summary, tech_stack_comparison
+)
+from src.Optimize.score_parser import CRITERIA
+from src.jobs.bulk_onboarding import (
+    BatchPregenerator, InviteStore, default_invite_store_path, read_candidates, write_links, READY
+)
+from src.analytics.answer_index import AnswerIndex, default_answer_index_path, rebuild
+from src.analytics.interview_archive import InterviewArchive, default_archive_path
+from src.prompts.registry import PromptRegistry
+from src.utils.logging_setup import configure_logging
+
+st.set_page_config(
+    page_title="TalentScout Recruiter Analytics",
+    page_icon="📈",
+    layout="wide"
+)
+
+load_dotenv()
+configure_logging()
+
+# Every uploaded candidate costs a question and an answer call per question
+MAX_UPLOAD_CANDIDATES = int(os.getenv("TALENTSCOUT_BULK_MAX_CANDIDATES", "200"))
+
+
+@st.cache_resource
+def get_score_store():
+    """Columnar score store written by the interview app"""
+    return ScoreStore(os.path.join(os.getenv("TALENTSCOUT_DATA_DIR", "data"), "scores"))
+
+
+@st.cache_resource
+def get_invite_store():
+    """Pre-generated interviews opened by the interview app's invite links"""
+    return InviteStore(default_invite_store_path())
+
+
+@st.cache_resource
+def get_answer_index():
+    """Near-duplicate answer index written by the interview app"""
+    return AnswerIndex(default_answer_index_path(),
+                       threshold=float(os.getenv("TALENTSCOUT_DUPLICATE_THRESHOLD", "0.8")))
+
+
+@st.cache_resource
+def get_interview_archive():
+    """Compressed interview archive written by the interview app"""
+    return InterviewArchive(default_archive_path())
+
+
+@st.cache_data(max_entries=4)
+def load_interviews(store_version):
+    """Per-interview means; recomputed only when the store version changes"""
+    store = get_score_store()
+    return interview_means(store.load()), store.tech_vocabulary
+
+
+@st.cache_data(max_entries=256)
+def query_cohort(store_version, experience_level, tech, since):
+    per_interview, vocabulary = load_interviews(store_version)
+    mask = cohort_filter(per_interview, vocabulary, experience_level=experience_level, tech=tech, since=since)
+    return cohort_summary(per_interview, mask)
+
+
+@st.cache_data(max_entries=4)
+def query_tech_comparison(store_version):
+    per_interview, vocabulary = load_interviews(store_version)
+    return tech_stack_comparison(per_interview, vocabulary)
+
+
+st.markdown("# 📈 Recruiter Analytics")
+
+# Streamlit lists this page in every candidate's sidebar, so it stays closed unless a token is set
+recruiter_token = os.getenv("TALENTSCOUT_RECRUITER_TOKEN")
+if not recruiter_token:
+    st.warning("Recruiter Analytics is disabled. Set TALENTSCOUT_RECRUITER_TOKEN to enable it.")
+    st.stop()
+entered_token = st.sidebar.text_input("Recruiter token", type="password")
+if not hmac.compare_digest(entered_token.encode("utf-8"), recruiter_token.encode("utf-8")):
+    st.info("Enter the recruiter token in the sidebar to view cohort analytics.")
+    st.stop()
+
+with st.expander("📨 Bulk Candidate Onboarding", expanded=False):
+    st.caption("Upload a CSV (header row with the candidate form fields; list fields separated by ';') "
+               "or JSONL file. Every valid candidate gets an interview link with the questions and "
+               f"reference answers already generated. At most {MAX_UPLOAD_CANDIDATES} candidates per upload.")
+    upload = st.file_uploader("Candidates", type=["csv", "jsonl"])
+    col1, col2, col3 = st.columns(3)
+    base_url = col1.text_input("Interview app URL", value=os.getenv("TALENTSCOUT_PUBLIC_URL", "http://localhost:8501"))
+    questions = col2.number_input("Questions", min_value=1, max_value=10, value=3)
+    concurrency = col3.number_input("Concurrency", min_value=1, max_value=16, value=4)
+    if upload is not None and st.button("Generate Interviews"):
+        try:
+            candidates = read_candidates(upload.getvalue().decode("utf-8-sig"), upload.name,
+                                         limit=MAX_UPLOAD_CANDIDATES)
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
+        progress = st.progress(0.0, text=f"Generating {len(candidates)} interviews...")
+        pregenerator = BatchPregenerator(
+            get_invite_store(),
+            PromptRegistry(file_path="src/prompts/prompt.yaml").current(),
+            questions=int(questions),
+            concurrency=int(concurrency)
+        )
+        results = pregenerator.run(
+            candidates, base_url,
+            progress=lambda done, total: progress.progress(done / total, text=f"{done}/{total} candidates")
+        )
+        ready = sum(1 for result in results if result.status == READY)
+        st.success(f"{ready} of {len(results)} interviews fully pre-generated.")
+        st.dataframe([result.to_row() for result in results], use_container_width=True)
+        st.download_button("Download Links (CSV)", write_links(results), file_name="interview_links.csv",
+                           mime="text/csv")
+
+with st.expander("🪞 Near-Duplicate Answers", expanded=False):
+    answer_index = get_answer_index()
+    index_stats = answer_index.stats()
+    st.caption(f"{index_stats['answers']} answers indexed · {index_stats['flagged']} flagged at "
+               f"≥ {answer_index.threshold:.0%} estimated similarity to another candidate's answer")
+    flagged = answer_index.flagged()
+    if flagged:
+        st.dataframe(flagged, use_container_width=True)
+    if st.button("Rebuild From Interview Archive"):
+        archive = get_interview_archive()
+        if len(archive):
+            with st.spinner("Rebuilding the answer index..."):
+                index_stats = rebuild(answer_index, archive)
+            st.success(f"Indexed {index_stats['answers']} answers, {index_stats['flagged']} flagged.")
+        else:
+            st.info("No interviews have been archived yet.")
+
+with st.expander("🗄️ Interview Archive", expanded=False):
+    archive = get_interview_archive()
+    archive_stats = archive.stats()
+    st.caption(f"{archive_stats['interviews']} completed interviews archived in {archive_stats['segments']} "
+               f"segment(s) · {archive_stats['compressed_bytes'] / 1e6:.1f} MB, "
+               f"{archive_stats['compression_ratio'] or 0:.1f}x compression")
+    col1, col2 = st.columns(2)
+    archive_email = col1.text_input("Candidate email", key="archive_email")
+    archive_tech = col2.selectbox("Tech stack", ["All", *sorted(archive.tech_vocabulary)], key="archive_tech")
+    if archive_email or archive_tech != "All":
+        rows = archive.find(email=archive_email or None, tech=None if archive_tech == "All" else archive_tech)
+        records = list(archive.scan(rows[-50:]))
+        st.caption(f"{len(rows)} interviews found" + (", showing the latest 50" if len(rows) > 50 else ""))
+        st.dataframe([{
+            "completed": time.strftime("%Y-%m-%d %H:%M", time.localtime(record["completed_at"])),
+            "candidate": record["candidate"].get("full_name"),
+            "email": record["candidate"].get("email"),
+            "tech stack": ", ".join(record["candidate"].get("tech_stack", [])),
+            "questions": len(record["scores"]),
+        } for record in reversed(records)], use_container_width=True)
+        if records:
+            st.download_button("Download Transcripts (JSONL)",
+                               "\n".join(json.dumps(record, ensure_ascii=False) for record in records),
+                               file_name="interviews.jsonl", mime="application/jsonl")
+
+store = get_score_store()
+store_version = store.version()
+per_interview, vocabulary = load_interviews(store_version)
+
+if len(per_interview["overall"]) == 0:
+    st.info("No completed interviews have been recorded yet.")
+    st.stop()
+
+# Cohort filters
+col1, col2, col3 = st.columns(3)
+with col1:
+    experience_level = st.selectbox("Experience Level", ["All", *EXPERIENCE_LEVELS])
+with col2:
+    tech = st.selectbox("Technology", ["All", *sorted(vocabulary)])
+with col3:
+    window = st.selectbox("Completed", ["Any time", "Last 7 days", "Last 30 days", "Last 90 days"])
+
+since = None
+if window != "Any time":
+    # Rounded to the hour so the cached query is reused within the hour
+    days = int(window.split()[1])
+    since = (int(time.time()) // 3600 - days * 24) * 3600
+
+started = time.perf_counter()
+summary = query_cohort(
+    store_version,
+    None if experience_level == "All" else experience_level,
+    None if tech == "All" else tech,
+    since
+)
+elapsed_ms = (time.perf_counter() - started) * 1000
+
+st.caption(f"{summary['candidates']} candidates in cohort · query took {elapsed_ms:.1f} ms")
+
+if summary["candidates"]:
+    st.markdown("### Overall Score Percentiles")
+    columns = st.columns(len(summary["percentiles"]) + 1)
+    columns[0].metric("Mean", f"{summary['mean']:.1f}/10")
+    for column, (percentile, value) in zip(columns[1:], summary["percentiles"].items()):
+        column.metric(f"P{percentile}", f"{value:.1f}/10")
+
+    st.markdown("### Per-Criterion Distributions")
+    criterion_columns = st.columns(len(CRITERIA))
+    for column, name in zip(criterion_columns, CRITERIA):
+        criterion = summary["criteria"][name]
+        with column:
+            mean = criterion["mean"]
+            st.metric(name.title(), f"{mean:.1f}/10" if mean is not None else "n/a")
+            st.bar_chart({"candidates": criterion["histogram"]}, height=160)
+
+st.markdown("### Tech Stack Comparison")
+st.dataframe(query_tech_comparison(store_version), use_container_width=True)
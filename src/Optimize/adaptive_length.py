@@ -0,0 +1,96 @@
+import math
+from dataclasses import dataclass
+from typing import List
+
+
+CONTINUE = "continue"
+STOP_HIGH = "stop_high"
+STOP_LOW = "stop_low"
+STOP_MAX = "stop_max"
+
+
+@dataclass
+class AdaptiveInterviewPolicy:
+    """
+    Decides after each scored answer whether the interview needs another question.
+
+    The running estimate is the mean answer score (out of 10). Its uncertainty uses
+    the sample spread, shrunk towards ``prior_sd`` because two or three answers say
+    little about spread. The interview stops early once the confidence interval lies
+    entirely above ``high_threshold`` or below ``low_threshold``, and otherwise
+    continues up to ``max_questions``.
+
+    The defaults put the uncertain band around the hiring bar (roughly the top 20%
+    of candidates), where extra questions change rankings; see
+    ``src/experiment/adaptive_simulation.py``.
+
+    Attributes:
+        min_questions (int): Never stop before this many answers.
+        max_questions (int): Hard upper bound on questions.
+        high_threshold (float): Clearly strong candidates score above this.
+        low_threshold (float): Clearly weak candidates score below this.
+        z (float): Width of the confidence interval in standard errors.
+        prior_sd (float): Assumed per-answer score spread.
+        prior_weight (float): How many answers the prior spread is worth.
+    """
+
+    min_questions: int = 2
+    max_questions: int = 4
+    high_threshold: float = 7.25
+    low_threshold: float = 6.0
+    z: float = 0.8
+    prior_sd: float = 1.8
+    prior_weight: float = 3.0
+
+    def estimate(self, scores: List[float]):
+        """Return ``(mean, standard_error)`` of the running score estimate."""
+        n = len(scores)
+        if n == 0:
+            return None, math.inf
+        mean = sum(scores) / n
+        sum_sq = sum((score - mean) ** 2 for score in scores)
+        pooled_var = (self.prior_weight * self.prior_sd ** 2 + sum_sq) / (self.prior_weight + n - 1)
+        return mean, math.sqrt(pooled_var / n)
+
+    def decide(self, scores: List[float], answered: int = None) -> str:
+        """Decide what to do after the answers scored so far.
+
+        Args:
+            scores (list): Numeric scores of the answers so far, unparseable ones left out.
+            answered (int): Questions answered so far, defaults to ``len(scores)``.
+
+        Returns:
+            str: ``continue``, ``stop_high``, ``stop_low`` or ``stop_max``.
+        """
+        if answered is None:
+            answered = len(scores)
+        if answered >= self.max_questions:
+            return STOP_MAX
+        if len(scores) < self.min_questions:
+            return CONTINUE
+
+        mean, standard_error = self.estimate(scores)
+        if mean - self.z * standard_error >= self.high_threshold:
+            return STOP_HIGH
+        if mean + self.z * standard_error <= self.low_threshold:
+            return STOP_LOW
+        return CONTINUE
+
+    def may_stop(self, scores: List[float], answered: int = None) -> bool:
+        """Whether the next answer can end the interview, depending on its score.
+
+        A caller that generates the next question together with the current turn
+        asks for it only when this is False, so a question that may never be asked
+        is not paid for.
+
+        Args:
+            scores (list): Numeric scores of the answers so far, without the next one.
+            answered (int): Questions answered so far, defaults to ``len(scores)``.
+
+        Returns:
+            bool: True if some score of the next answer stops the interview.
+        """
+        if answered is None:
+            answered = len(scores)
+        # The interval is not monotone in the new score, so try the whole range
+        return any(self.decide(scores + [step / 4], answered + 1) != CONTINUE for step in range(41))
@@ -0,0 +1,218 @@
+import re
+import json
+import threading
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.Optimize.score_parser import CRITERIA
+from src.Optimize.sandbox import SandboxPool
+
+logger = logging.getLogger(__name__)
+
+
+# Marker appended to scores produced by running hidden tests instead of the LLM judge
+EXECUTION_SCORE_MARKER = "_Graded by running hidden test cases"
+
+_CODING_TASK = re.compile(
+    r"coding task|write (?:a|an|the)?\s*(?:python\s+)?(?:function|method|program|script|code)|"
+    r"implement (?:a|an|the)?\s*(?:python\s+)?(?:function|method|algorithm)|\bdef\s+\w+\s*\(",
+    re.IGNORECASE
+)
+_FENCE = re.compile(r"```[ \t]*([\w+#-]*)[ \t]*\n(.*?)```", re.DOTALL)
+_PYTHON_DEF = re.compile(r"^\s*def\s+\w+\s*\(", re.MULTILINE)
+
+
+def _normalize(value):
+    """JSON round trip, so tuples compare equal to the lists in the expected values."""
+    return json.loads(json.dumps(value, default=repr))
+
+
+def looks_like_coding_task(question: str) -> bool:
+    """Cheap check before asking the LLM for test cases."""
+    return bool(_CODING_TASK.search(question or ""))
+
+
+def extract_code(answer: str) -> Optional[str]:
+    """The Python code of an answer: its fenced blocks, or the whole answer if it is code."""
+    blocks = [code for language, code in _FENCE.findall(answer or "")
+              if language.lower() in ("", "python", "py", "python3")]
+    if blocks:
+        return "\n\n".join(blocks)
+    if _PYTHON_DEF.search(answer or ""):
+        return answer
+    return None
+
+
+@dataclass
+class TestSuite:
+    """Hidden test cases for one coding question."""
+    # Not a pytest test class, despite the name
+    __test__ = False
+
+    function_name: str
+    tests: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"function_name": self.function_name, "tests": self.tests}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["TestSuite"]:
+        if not isinstance(data, dict):
+            return None
+        return parse_test_suite(json.dumps(data))
+
+
+def parse_test_suite(text: str, max_tests: int = 12) -> Optional[TestSuite]:
+    """Parse the test-case response; None if the question is not testable or the response is invalid.
+
+    Expected: ``{"testable": true, "function_name": "...", "tests": [{"args": [...], "expected": ...}]}``
+    """
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict) or data.get("testable") is False:
+        return None
+    function_name = data.get("function_name")
+    if not isinstance(function_name, str) or not function_name.isidentifier():
+        return None
+    tests = [
+        {"args": case["args"], "expected": case["expected"]}
+        for case in data.get("tests") or []
+        if isinstance(case, dict) and isinstance(case.get("args"), list) and "expected" in case
+    ][:max_tests]
+    # Too few cases would make a pass rate meaningless
+    if len(tests) < 2:
+        return None
+    return TestSuite(function_name=function_name, tests=tests)
+
+
+@dataclass
+class ExecutionResult:
+    """Outcome of running a candidate's code against a test suite."""
+    passed: int
+    total: int
+    runtime_ms: float
+    compiled: bool = True
+    timed_out: bool = False
+    error: Optional[str] = None
+    score_text: Optional[str] = None
+
+    @property
+    def pass_rate(self) -> float:
+        return self.passed / self.total if self.total else 0.0
+
+
+class ExecutionGrader:
+    """
+    Grades coding answers by running them against hidden test cases.
+
+    The candidate's Python code runs in a ``SandboxPool`` sandbox; the pass rate
+    and runtime become a score in the ``prompt_score`` format, so coding answers
+    with a test suite never reach the LLM judge. Answers without Python code
+    (prose, another language) are left to the judge.
+    """
+
+    def __init__(self, pool: SandboxPool, slow_ms: float = 1000.0):
+        """Initialize the ExecutionGrader.
+
+        Args:
+            pool (SandboxPool): Sandboxes the code runs in.
+            slow_ms (float): Total test runtime above which depth is marked down.
+        """
+        self.pool = pool
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def grade(self, suite: TestSuite, answer: str) -> Optional[ExecutionResult]:
+        """Run ``answer``'s code against ``suite``; None if the answer contains no Python code or
+        the sandbox could not be confined, so the answer is scored without running it."""
+        code = extract_code(answer)
+        if code is None:
+            return None
+        outcome = self.pool.run(code, suite.function_name, suite.tests)
+        if outcome.get("unavailable"):
+            logger.error(f"Sandbox could not be confined, not running the answer: {outcome.get('detail')}")
+            return None
+        # Everything the sandbox reports is candidate-controlled data
+        results = [case for case in outcome.get("results") or [] if isinstance(case, dict)]
+        # The sandbox only reports return values; the verdict is reached here, out of the candidate's reach
+        passed = [
+            case.get("error") is None and "value" in case and case["value"] == _normalize(test["expected"])
+            for case, test in zip(results, suite.tests)
+        ]
+        details = [case["detail"] for case in [outcome, *results] if case.get("detail")]
+        if details:
+            logger.warning(f"Candidate code raised: {details[0]}")
+        result = ExecutionResult(
+            passed=sum(passed),
+            total=len(suite.tests),
+            runtime_ms=round(sum(case.get("ms", 0.0) for case in results), 2),
+            compiled=outcome.get("compiled", False),
+            timed_out=bool(outcome.get("timed_out")),
+            error=outcome.get("error") or next((case["error"] for case in results if case.get("error")), None)
+        )
+        result.score_text = format_execution_score(result, self.slow_ms)
+        with self._lock:
+            self.stats["graded"] += 1
+        logger.info(f"Executed answer: {result.passed}/{result.total} tests passed in {result.runtime_ms} ms")
+        return result
+
+
+def _level(pass_rate: float) -> str:
+    if pass_rate >= 1.0:
+        return "Excellent"
+    if pass_rate >= 0.5:
+        return "Good"
+    return "Bad" if pass_rate > 0 else "Very Bad"
+
+
+def _describe_error(error: str) -> str:
+    """What the candidate sees of an error: the exception type only, never its message."""
+    if error == "TimeoutError":
+        return "time limit exceeded"
+    if error == "ResourceLimitExceeded":
+        return "resource limit exceeded"
+    if error.startswith("Function '") and error.endswith("' is not defined"):
+        return error
+    return f"raised {error if error.isidentifier() and len(error) <= 60 else 'an exception'}"
+
+
+def format_execution_score(result: ExecutionResult, slow_ms: float = 1000.0) -> str:
+    """Render an execution result in the natural-language format of ``prompt_score``."""
+    level = _level(result.pass_rate)
+    tests = f"{result.passed} of {result.total} hidden tests passed"
+    if not result.compiled:
+        reasons = {name: ("Very Bad", f"The code does not run: {_describe_error(result.error)}.")
+                   for name in CRITERIA}
+    else:
+        slow = result.timed_out or result.runtime_ms > slow_ms
+        reasons = {
+            "relevance": ("Excellent" if result.passed else "Bad",
+                          "Implements the requested function." if result.passed
+                          else f"The function does not produce any expected result"
+                               f"{f' ({_describe_error(result.error)})' if result.error else ''}."),
+            "accuracy": (level, f"{tests}."),
+            "completeness": (level, "Handles all tested cases, including edge cases." if result.pass_rate >= 1.0
+                             else "Some tested cases fail."),
+            "clarity": (level, "Judged by test results."),
+            "depth": ("Bad" if slow else level,
+                      "Exceeds the time limit." if result.timed_out
+                      else f"Tests ran in {result.runtime_ms:.1f} ms{' (slow)' if slow else ''}."),
+        }
+    overall = "Bad" if level == "Very Bad" else level
+    lines = [f"**Overall Performance: {overall}**", "", "**Detailed Analysis:**"]
+    lines += [f"- {name.title()}: {reasons[name][0]} - {reasons[name][1]}" for name in CRITERIA]
+    lines += ["", f"**Summary:** {tests}" + (f"; total runtime {result.runtime_ms:.1f} ms." if result.compiled else "."), ""]
+    lines.append(f"{EXECUTION_SCORE_MARKER}._")
+    return "\n".join(lines)
+
+
+def is_execution_score(score_text) -> bool:
+    return isinstance(score_text, str) and EXECUTION_SCORE_MARKER in score_text
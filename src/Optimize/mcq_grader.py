@@ -0,0 +1,97 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from src.Optimize.score_parser import CRITERIA
+
+
+# Marker appended to multiple choice scores graded against the answer key
+MCQ_SCORE_MARKER = "_Graded locally against the answer key"
+
+# "Answer Key: B" as the last line of a generated MCQ; never shown to the candidate
+_KEY_LINE = re.compile(r"^[ \t*_]*answer[ \t]*key[ \t*_]*[:\-][ \t*_]*\(?([A-Fa-f])\)?[ \t*_.]*$",
+                       re.IGNORECASE | re.MULTILINE)
+_OPTION = re.compile(r"^[ \t]*(?:[-*][ \t]*)?\**\(?([A-F])[).:]\**[ \t]+(.+?)[ \t]*$", re.MULTILINE)
+# "B", "b)", "(B)", "Option B", "Answer: B", "The answer is B." with an optional explanation after it
+# A bare letter followed by a space ("A list is ...") is prose, not a choice
+_CHOICE = re.compile(
+    r"^\W*(?:(?:(?:my|the|final)\s+)?(?:answer|option|choice)\s*(?:is\s*|:\s*|-\s*)?\(?([A-F])\)?(?:[).:,\s-]|$)|"
+    r"\(?([A-F])(?:\)|[.:,]|\s+-|\s*$))",
+    re.IGNORECASE
+)
+
+
+@dataclass
+class MCQItem:
+    """Options and answer key of one multiple choice question."""
+    options: Dict[str, str] = field(default_factory=dict)
+    key: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"options": self.options, "key": self.key}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["MCQItem"]:
+        if not isinstance(data, dict) or data.get("key") not in (data.get("options") or {}):
+            return None
+        return cls(options=dict(data["options"]), key=data["key"])
+
+    def reference_answer(self) -> str:
+        """The correct option, used as the reference answer instead of asking the answer bot."""
+        return f"**{self.key})** {self.options[self.key]}"
+
+
+def split_answer_key(question: str) -> Tuple[str, Optional[MCQItem]]:
+    """Remove the answer key line from a generated question.
+
+    Returns:
+        tuple: The question as shown to the candidate, and its ``MCQItem`` when the
+        question has options and a key naming one of them, else None.
+    """
+    matches = list(_KEY_LINE.finditer(question or ""))
+    if not matches:
+        return question, None
+    shown = _KEY_LINE.sub("", question).strip()
+    options = {letter: text for letter, text in _OPTION.findall(shown)}
+    key = matches[-1].group(1).upper()
+    if len(options) < 2 or key not in options:
+        return shown, None
+    return shown, MCQItem(options=options, key=key)
+
+
+def extract_choice(item: MCQItem, answer: str) -> Optional[str]:
+    """The option letter the candidate chose, or None if the answer does not name exactly one."""
+    text = (answer or "").strip()
+    match = _CHOICE.match(text)
+    letter = match and (match.group(1) or match.group(2)).upper()
+    if letter in item.options:
+        return letter
+    # The option's text typed out instead of its letter
+    typed = text.rstrip(".").strip().lower()
+    chosen = [letter for letter, option in item.options.items() if option.rstrip(".").strip().lower() == typed]
+    return chosen[0] if len(chosen) == 1 else None
+
+
+def grade_mcq(item: MCQItem, answer: str) -> Optional[str]:
+    """Score a multiple choice answer against the key; None leaves it to the LLM judge."""
+    choice = extract_choice(item, answer)
+    if choice is None:
+        return None
+    return format_mcq_score(item, choice)
+
+
+def format_mcq_score(item: MCQItem, choice: str) -> str:
+    """Render a graded choice in the natural-language format of ``prompt_score``."""
+    correct = choice == item.key
+    level = "Excellent" if correct else "Very Bad"
+    reason = (f"Chose the correct option {choice}." if correct
+              else f"Chose option {choice}; the correct option is {item.key}.")
+    lines = [f"**Overall Performance: {'Excellent' if correct else 'Bad'}**", "", "**Detailed Analysis:**"]
+    lines += [f"- {name.title()}: {level} - {reason}" for name in CRITERIA]
+    lines += ["", f"**Summary:** {reason} Correct answer: {item.options[item.key]}", ""]
+    lines.append(f"{MCQ_SCORE_MARKER}._")
+    return "\n".join(lines)
+
+
+def is_mcq_score(score_text) -> bool:
+    return isinstance(score_text, str) and MCQ_SCORE_MARKER in score_text
@@ -0,0 +1,181 @@
+import re
+import math
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.Optimize.score_parser import CRITERIA
+
+
+# Outcomes of the local first stage
+SETTLED_BLANK = "blank"
+SETTLED_COPY = "near_copy"
+SETTLED_OFF_TOPIC = "off_topic"
+AMBIGUOUS = "ambiguous"
+
+# Marker appended to scores produced without the LLM judge
+LOCAL_SCORE_MARKER = "_Scored locally without the LLM judge"
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9_+#.]*[a-z0-9+#]|[a-z0-9]")
+
+_NON_ANSWERS = re.compile(
+    r"^\W*(i\s*(do\s*n['o]?t|dont|don't)\s*know|idk|no\s*idea|not\s*sure|i'?m\s*not\s*sure|"
+    r"pass|skip|n/a|\?+|-+|\.+)\W*$",
+    re.IGNORECASE
+)
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can could do does for from has have how i if in into is it its
+itself just may me more most my no not of on or our so such than that the their them then there
+these they this those to too use used uses using very was we were what when where which while
+who why will with would you your also each other some any all both only own same about above
+after again against because been before being below between during further here once out over
+under until up down off should s t
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words and identifiers (``c++``, ``node.js``, ``__init__``), without stopwords."""
+    return [word for word in _WORD.findall((text or "").lower()) if word not in STOPWORDS]
+
+
+def _bm25_idf(term: str, documents: List[Counter]) -> float:
+    containing = sum(1 for document in documents if term in document)
+    return math.log(1 + (len(documents) - containing + 0.5) / (containing + 0.5))
+
+
+@dataclass
+class PreScore:
+    """
+    Result of the local first stage.
+
+    Attributes:
+        decision (str): ``blank``, ``near_copy``, ``off_topic`` or ``ambiguous``.
+        signals (dict): Similarity, keyword coverage and length ratio that led to it.
+        score_text (str): Score in the ``prompt_score`` output format, None when ambiguous.
+    """
+
+    decision: str
+    signals: Dict[str, float] = field(default_factory=dict)
+    score_text: Optional[str] = None
+
+    @property
+    def settled(self) -> bool:
+        return self.decision != AMBIGUOUS
+
+
+class LocalPreScorer:
+    """
+    Fast lexical first stage in front of the LLM judge.
+
+    Compares the candidate answer with the reference answer using BM25-weighted
+    term overlap (IDF over the reference's sentences and the answer), coverage of
+    the reference's keywords and the length ratio. Blank answers, non-answers,
+    near copies of the reference and clearly off-topic answers are scored right
+    away; everything in between goes to the LLM. Thresholds are deliberately
+    conservative: an ambiguous answer costs one LLM call, a wrong settlement costs
+    a wrong score.
+    """
+
+    def __init__(self, copy_similarity: float = 0.85, copy_coverage: float = 0.8,
+                 off_topic_coverage: float = 0.0, off_topic_words: int = 8, keywords: int = 15):
+        """Initialize the LocalPreScorer.
+
+        Args:
+            copy_similarity (float): BM25 similarity above which an answer counts as a copy.
+            copy_coverage (float): Keyword coverage also required for a copy.
+            off_topic_coverage (float): Keyword coverage below which a long enough answer is off topic.
+            off_topic_words (int): Content words an answer needs before it can be called off topic;
+                short answers (e.g. an MCQ letter) always go to the LLM.
+            keywords (int): Number of reference keywords used for coverage.
+        """
+        self.copy_similarity = copy_similarity
+        self.copy_coverage = copy_coverage
+        self.off_topic_coverage = off_topic_coverage
+        self.off_topic_words = off_topic_words
+        self.keywords = keywords
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def signals(self, reference: str, answer: str) -> Dict[str, float]:
+        """Similarity, keyword coverage and length ratio of ``answer`` against ``reference``."""
+        reference_terms = tokenize(reference)
+        answer_terms = tokenize(answer)
+        reference_counts, answer_counts = Counter(reference_terms), Counter(answer_terms)
+
+        # Sentences of the reference act as the corpus, so its recurring filler words weigh little
+        documents = [Counter(tokenize(sentence)) for sentence in re.split(r"(?<=[.!?])\s+|\n+", reference)]
+        documents = [document for document in documents if document] + [answer_counts]
+        idf = {term: _bm25_idf(term, documents) for term in set(reference_counts) | set(answer_counts)}
+
+        def weights(counts: Counter) -> Dict[str, float]:
+            # BM25 term-frequency saturation (k1 = 1.2) times IDF
+            return {term: idf[term] * (count * 2.2) / (count + 1.2) for term, count in counts.items()}
+
+        reference_weights, answer_weights = weights(reference_counts), weights(answer_counts)
+        dot = sum(weight * answer_weights.get(term, 0.0) for term, weight in reference_weights.items())
+        norm = (math.sqrt(sum(w * w for w in reference_weights.values()))
+                * math.sqrt(sum(w * w for w in answer_weights.values())))
+
+        keywords = sorted(reference_weights, key=reference_weights.get, reverse=True)[:self.keywords]
+        coverage = sum(1 for term in keywords if term in answer_counts) / len(keywords) if keywords else 0.0
+
+        return {
+            "similarity": dot / norm if norm else 0.0,
+            "coverage": coverage,
+            "length_ratio": len(answer_terms) / max(1, len(reference_terms)),
+            "answer_words": float(len(answer_terms)),
+        }
+
+    def score(self, reference: str, answer: str) -> PreScore:
+        """Settle clear-cut answers locally; return ``ambiguous`` for the LLM judge."""
+        if not (answer or "").strip() or _NON_ANSWERS.match(answer.strip()):
+            result = PreScore(SETTLED_BLANK, {"answer_words": float(len(tokenize(answer)))})
+        else:
+            signals = self.signals(reference, answer)
+            if (signals["similarity"] >= self.copy_similarity and signals["coverage"] >= self.copy_coverage
+                    and signals["length_ratio"] >= 0.6):
+                decision = SETTLED_COPY
+            elif (signals["coverage"] <= self.off_topic_coverage and signals["similarity"] < 0.05
+                    and signals["answer_words"] >= self.off_topic_words):
+                decision = SETTLED_OFF_TOPIC
+            else:
+                decision = AMBIGUOUS
+            result = PreScore(decision, signals)
+
+        if result.settled:
+            result.score_text = format_local_score(result)
+        with self._lock:
+            self.stats[result.decision] += 1
+        return result
+
+    def llm_calls_saved(self) -> int:
+        with self._lock:
+            return sum(count for decision, count in self.stats.items() if decision != AMBIGUOUS)
+
+
+_LOCAL_SCORES = {
+    SETTLED_BLANK: ("Bad", "Very Bad", "No substantive answer was given.",
+                    "The question was not answered. Review the topic and attempt an answer next time."),
+    SETTLED_OFF_TOPIC: ("Bad", "Very Bad", "The answer does not address the concepts the question asks about.",
+                        "The answer did not engage with the question's key concepts."),
+    SETTLED_COPY: ("Excellent", "Excellent", "Matches the reference answer closely.",
+                   "The answer covers the reference answer's key points almost completely."),
+}
+
+
+def format_local_score(result: PreScore) -> str:
+    """Render a settled pre-score in the natural-language format of ``prompt_score``."""
+    overall, level, reason, summary = _LOCAL_SCORES[result.decision]
+    lines = [f"**Overall Performance: {overall}**", "", "**Detailed Analysis:**"]
+    lines += [f"- {name.title()}: {level} - {reason}" for name in CRITERIA]
+    lines += ["", f"**Summary:** {summary}", ""]
+    details = ", ".join(f"{name.replace('_', ' ')} {value:.2f}" for name, value in result.signals.items()
+                        if name != "answer_words")
+    lines.append(f"{LOCAL_SCORE_MARKER}{f' ({details})' if details else ''}._")
+    return "\n".join(lines)
+
+
+def is_local_score(score_text) -> bool:
+    return isinstance(score_text, str) and LOCAL_SCORE_MARKER in score_text
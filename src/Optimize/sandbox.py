@@ -0,0 +1,148 @@
+import os
+import sys
+import json
+import queue
+import secrets
+import tempfile
+import threading
+import subprocess
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+CHILD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_child.py")
+
+
+def sandbox_supported() -> bool:
+    """Candidate code only runs where resource limits and the kernel confinement are available."""
+    try:
+        import resource  # noqa: F401
+    except ImportError:
+        return False
+    from src.Optimize.sandbox_child import confinement_available
+    return confinement_available()
+
+
+class SandboxPool:
+    """
+    Pre-started, single-use sandbox interpreters for running candidate code.
+
+    Each sandbox is a ``python -I`` process of ``sandbox_child.py`` in an empty
+    temporary directory with an empty environment, already past interpreter
+    start-up and waiting for its job. A job takes one idle sandbox and a
+    replacement is started in the background, so a run costs only the test
+    execution. Limits (CPU seconds, address space) and the kernel confinement
+    (Landlock and seccomp: no file writes, no processes, no network) are applied
+    inside the sandbox; the wall-clock limit is enforced here by killing it.
+    """
+
+    def __init__(self, size: int = 2, cpu_seconds: float = 2.0, memory_mb: int = 256, wall_seconds: float = 5.0):
+        """Initialize the SandboxPool and start ``size`` sandboxes.
+
+        Args:
+            size (int): Idle sandboxes kept ready.
+            cpu_seconds (float): CPU time per job.
+            memory_mb (int): Address space per job.
+            wall_seconds (float): Wall-clock time per job, including blocked time.
+        """
+        self.size = size
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self.wall_seconds = wall_seconds
+        self._idle: "queue.Queue[subprocess.Popen]" = queue.Queue()
+        self._workdir = tempfile.mkdtemp(prefix="talentscout-sandbox-")
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> subprocess.Popen:
+        return subprocess.Popen(
+            [sys.executable, "-I", CHILD_PATH],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            cwd=self._workdir, env={"PATH": "/usr/bin:/bin"}, text=True,
+            start_new_session=True
+        )
+
+    def _replenish(self) -> None:
+        if self._closed:
+            return
+        try:
+            self._idle.put(self._spawn())
+        except OSError as e:
+            logger.error(f"Could not start a sandbox: {e}")
+
+    def _take(self) -> subprocess.Popen:
+        while True:
+            try:
+                process = self._idle.get_nowait()
+            except queue.Empty:
+                return self._spawn()
+            if process.poll() is None:
+                return process
+
+    def run(self, code: str, function_name: str, calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Call ``function_name`` from ``code`` with each of ``calls``' ``args`` in a sandbox.
+
+        Only the arguments are sent; the caller compares the returned values with
+        the expected ones, so candidate code cannot see or forge the verdict.
+
+        Returns:
+            dict: ``compiled``, ``error`` (an exception type name) and per-call ``results``
+            (``value``, ``ms``, ``error``, ``detail``); ``timed_out`` when a limit killed
+            the sandbox, ``unavailable`` when the sandbox could not be confined and ran
+            nothing. ``detail`` holds exception messages for the server log only.
+        """
+        process = self._take()
+        threading.Thread(target=self._replenish, name="sandbox-spawn", daemon=True).start()
+        nonce = secrets.token_hex(8)
+        calls = [{"args": call.get("args", []), "kwargs": call.get("kwargs", {})} for call in calls]
+        job = {"code": code, "function_name": function_name, "calls": calls, "nonce": nonce,
+               "cpu_seconds": self.cpu_seconds, "memory_bytes": self.memory_bytes}
+        try:
+            output, _ = process.communicate(json.dumps(job) + "\n", timeout=self.wall_seconds)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            return {"compiled": True, "error": "TimeoutError", "results": [], "timed_out": True}
+
+        for line in reversed(output.splitlines()):
+            try:
+                outcome = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(outcome, dict) and outcome.get("nonce") == nonce:
+                outcome.pop("nonce")
+                return outcome
+        # Killed by a resource limit (SIGXCPU, SIGKILL) before reporting
+        logger.warning(f"Sandbox exited with {process.returncode} before reporting (resource limit)")
+        return {"compiled": True, "error": "ResourceLimitExceeded", "results": [], "timed_out": True}
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                process = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            process.kill()
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> Optional[SandboxPool]:
+    """The process-wide sandbox pool, or None where sandboxing is not supported."""
+    global _pool
+    if _pool is None and sandbox_supported():
+        with _pool_lock:
+            if _pool is None:
+                _pool = SandboxPool(
+                    size=int(os.getenv("TALENTSCOUT_SANDBOX_POOL", "2")),
+                    cpu_seconds=float(os.getenv("TALENTSCOUT_SANDBOX_CPU_SECONDS", "2")),
+                    memory_mb=int(os.getenv("TALENTSCOUT_SANDBOX_MEMORY_MB", "256")),
+                    wall_seconds=float(os.getenv("TALENTSCOUT_SANDBOX_WALL_SECONDS", "5"))
+                )
+    return _pool
@@ -0,0 +1,345 @@
+"""
+Single-use sandbox process for candidate code; started by ``SandboxPool``.
+
+Runs with ``python -I`` and only the standard library, so nothing of the app is
+importable. The interpreter starts ahead of time and waits for one job (a JSON
+line on stdin). It then applies the resource limits, drops network access and
+confines itself in the kernel, calls the candidate's function with each hidden
+test's arguments and writes one JSON line with the return values to stdout
+before exiting.
+
+The kernel confinement is the security boundary, as candidate code runs in this
+interpreter and can reach anything in it (``ctypes`` included):
+
+* Landlock allows reading the working directory and the standard library only,
+  no file writes anywhere, no TCP and no signals to processes outside the sandbox,
+* a seccomp filter refuses starting processes or threads, sockets, opening files
+  for writing, changes to the file system and privileged system calls,
+* all capabilities are dropped, so a sandbox started as root keeps no more
+  power than the file permissions give uid 0.
+
+Neither Landlock nor seccomp can be lifted once applied, and without them the
+job is refused. The audit hook on top refuses the same operations earlier, with
+a ``PermissionError`` the candidate's score can name.
+
+The expected values never reach the sandbox: candidate code runs in this
+interpreter and could rewrite anything in it, so comparing results is left to
+the parent (``ExecutionGrader``).
+"""
+import io
+import os
+import sys
+import json
+import time
+import struct
+import platform
+import sysconfig
+import contextlib
+
+# Keep the real stdout for the result; the candidate's prints are captured
+_RESULT_OUT = sys.stdout
+_OUTPUT_LIMIT = 10_000
+_VALUE_LIMIT = 100_000
+_DETAIL_LIMIT = 2_000
+
+_CLONE_NEWUSER = 0x10000000
+_CLONE_NEWNET = 0x40000000
+
+_DENIED_EVENTS = (
+    "socket.", "subprocess.", "os.system", "os.exec", "os.fork", "os.forkpty", "os.posix_spawn",
+    "os.spawn", "os.startfile", "os.kill", "os.killpg", "os.setns", "os.unshare", "os.memfd_create",
+    "_thread.start_new_thread", "mmap.", "os.remove", "os.rename", "os.rmdir", "os.mkdir", "os.chmod", "os.symlink",
+    "os.link", "os.truncate", "os.putenv", "os.unsetenv", "shutil.", "ctypes.", "urllib.", "ftplib.",
+    "http.", "smtplib.", "webbrowser.", "sys.settrace", "sys.setprofile", "sys.addaudithook",
+    # Object introspection; sys._getframe stays allowed, namedtuple and dataclasses need it
+    # and the frames hold nothing that decides the grade
+    "sys._current_frames", "gc.get_", "object.__getattr__",
+)
+# Already imported modules (posix) raise no import event; the kernel confinement covers them
+_DENIED_IMPORTS = (
+    "socket", "_socket", "ssl", "_ssl", "ctypes", "_ctypes", "subprocess", "_posixsubprocess", "posix",
+    "_posixshmem", "multiprocessing", "_multiprocessing", "pty", "fcntl", "termios", "resource", "mmap",
+    "_testcapi", "_testinternalcapi", "_testmultiphase", "_xxsubinterpreters", "_xxtestfuzz",
+)
+
+# x86-64 system calls the seccomp filter refuses with EPERM
+_SYSCALL_ARCH = 0xC000003E  # AUDIT_ARCH_X86_64
+_DENIED_SYSCALLS = (
+    # processes, threads, signals and other processes' memory
+    56, 57, 58, 59, 322, 101, 310, 311, 434, 438, 62, 200, 234, 424,
+    # socket, socketpair, connect, accept, accept4, bind, listen
+    41, 53, 42, 43, 288, 49, 50,
+    # creat, unlink(at), rename(at/at2), mkdir(at), rmdir, link(at), symlink(at), chmod, fchmod(at),
+    # chown, fchown(at), lchown, truncate, ftruncate, mknod(at), memfd_create, open_by_handle_at, name_to_handle_at
+    85, 87, 263, 82, 264, 316, 83, 258, 84, 86, 265, 88, 266, 90, 91, 268, 92, 93, 260, 94, 76, 77, 133, 259,
+    319, 304, 303,
+    # setrlimit, prlimit64, capset, setns, unshare, mount, umount2, pivot_root, chroot, bpf, perf_event_open,
+    # userfaultfd, keyctl, add_key, request_key, init/finit/delete_module, kexec_load, reboot, personality,
+    # io_uring_setup/enter/register
+    160, 302, 126, 308, 272, 165, 166, 155, 161, 321, 298, 323, 250, 248, 249, 175, 313, 176, 246, 169, 135,
+    425, 426, 427,
+)
+# clone3 and openat2 fail with ENOSYS, so libc falls back to the refused clone and the filtered openat
+_ENOSYS_SYSCALLS = (435, 437)
+# open and openat by the index of their flags argument; refused with any write flag
+_OPEN_SYSCALLS = {2: 1, 257: 2}
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_TRUNC | os.O_APPEND
+
+_LANDLOCK_CREATE_RULESET, _LANDLOCK_ADD_RULE, _LANDLOCK_RESTRICT_SELF = 444, 445, 446
+_LANDLOCK_READ = (1 << 2) | (1 << 3)  # LANDLOCK_ACCESS_FS_READ_FILE | LANDLOCK_ACCESS_FS_READ_DIR
+_CAPSET = 126
+
+
+def _apply_limits(cpu_seconds: float, memory_bytes: int) -> None:
+    import resource
+
+    cpu = max(1, int(cpu_seconds + 0.999))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    if hasattr(resource, "RLIMIT_NPROC"):
+        resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+
+
+def _drop_network() -> bool:
+    """Move into an empty network namespace where the kernel allows it."""
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        for flags in (_CLONE_NEWNET, _CLONE_NEWUSER | _CLONE_NEWNET):
+            if libc.unshare(flags) == 0:
+                return True
+    except Exception:
+        pass
+    return False
+
+
+def _libc():
+    import ctypes
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.syscall.restype = ctypes.c_long
+    return ctypes, libc
+
+
+def confinement_available() -> bool:
+    """Whether the kernel can confine the sandbox: Linux on x86-64 with seccomp and Landlock."""
+    if platform.system() != "Linux" or platform.machine() != "x86_64":
+        return False
+    try:
+        with open("/proc/self/status") as status:
+            if "Seccomp:" not in status.read():
+                return False
+        _, libc = _libc()
+        # LANDLOCK_CREATE_RULESET_VERSION returns the ABI version
+        return libc.syscall(_LANDLOCK_CREATE_RULESET, None, 0, 1) >= 1
+    except Exception:
+        return False
+
+
+def _seccomp_program() -> list:
+    """The seccomp filter as BPF ``(code, jt, jf, k)`` instructions."""
+    load, jeq, jge, jset, ret = 0x20, 0x15, 0x35, 0x45, 0x06
+    allow, kill, eperm, enosys = 0x7FFF0000, 0x80000000, 0x00050000 | 1, 0x00050000 | 38
+    program = [
+        # seccomp_data: nr at offset 0, arch at 4, arguments from 16
+        (load, 0, 0, 4), (jeq, 1, 0, _SYSCALL_ARCH), (ret, 0, 0, kill),
+        (load, 0, 0, 0), (jge, 0, 1, 0x40000000), (ret, 0, 0, eperm),  # x32 system calls
+    ]
+    for number in _DENIED_SYSCALLS:
+        program += [(jeq, 0, 1, number), (ret, 0, 0, eperm)]
+    for number in _ENOSYS_SYSCALLS:
+        program += [(jeq, 0, 1, number), (ret, 0, 0, enosys)]
+    for number, flags in _OPEN_SYSCALLS.items():
+        program += [(jeq, 0, 4, number), (load, 0, 0, 16 + 8 * flags), (jset, 0, 1, _WRITE_FLAGS),
+                    (ret, 0, 0, eperm), (ret, 0, 0, allow)]
+    return program + [(ret, 0, 0, allow)]
+
+
+def _confine(readable: tuple) -> None:
+    """Apply Landlock, drop all capabilities and install the seccomp filter; OSError if any step fails."""
+    ctypes, libc = _libc()
+
+    def check(result: int, step: str) -> int:
+        if result < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"{step}: {os.strerror(errno)}")
+        return result
+
+    # Every access right this kernel's Landlock knows is handled; only reading is granted
+    abi = check(libc.syscall(_LANDLOCK_CREATE_RULESET, None, 0, 1), "landlock")
+    handled = (1 << 13) - 1
+    for version, right in ((2, 1 << 13), (3, 1 << 14), (5, 1 << 15)):
+        if abi >= version:
+            handled |= right
+    # TCP bind and connect from ABI 4, abstract unix sockets and signals from ABI 6
+    attr = struct.pack("QQQ", handled, 0b11, 0b11)[:8 if abi < 4 else 16 if abi < 6 else 24]
+    ruleset = check(libc.syscall(_LANDLOCK_CREATE_RULESET, attr, len(attr), 0), "landlock ruleset")
+    try:
+        for root in readable:
+            try:
+                parent = os.open(root, os.O_PATH | os.O_CLOEXEC)
+            except FileNotFoundError:
+                continue
+            try:
+                rule = struct.pack("=Qi", _LANDLOCK_READ, parent)
+                check(libc.syscall(_LANDLOCK_ADD_RULE, ruleset, 1, rule, 0), "landlock rule")
+            finally:
+                os.close(parent)
+        # PR_SET_NO_NEW_PRIVS lets Landlock and seccomp apply without privileges
+        check(libc.prctl(38, 1, 0, 0, 0), "no_new_privs")
+        check(libc.syscall(_LANDLOCK_RESTRICT_SELF, ruleset, 0), "landlock restrict")
+    finally:
+        os.close(ruleset)
+
+    # _LINUX_CAPABILITY_VERSION_3 with empty effective, permitted and inheritable sets
+    check(libc.syscall(_CAPSET, struct.pack("Ii", 0x20080522, 0), bytes(24)), "capset")
+
+    class SockFilter(ctypes.Structure):
+        _fields_ = [("code", ctypes.c_ushort), ("jt", ctypes.c_ubyte), ("jf", ctypes.c_ubyte),
+                    ("k", ctypes.c_uint32)]
+
+    class SockFprog(ctypes.Structure):
+        _fields_ = [("len", ctypes.c_ushort), ("filter", ctypes.POINTER(SockFilter))]
+
+    program = _seccomp_program()
+    instructions = (SockFilter * len(program))(*[SockFilter(*instruction) for instruction in program])
+    # PR_SET_SECCOMP with SECCOMP_MODE_FILTER
+    check(libc.prctl(22, 2, ctypes.byref(SockFprog(len(program), instructions)), 0, 0), "seccomp")
+
+
+def _readable_roots() -> tuple:
+    """Directories files may be read from (working directory, standard library) and the
+    ones inside them that may not (site-packages)."""
+    paths = sysconfig.get_paths()
+    readable = {os.getcwd(), paths["stdlib"], paths["platstdlib"]}
+    unreadable = {paths["purelib"], paths["platlib"]}
+    return (tuple(os.path.realpath(root).rstrip(os.sep) + os.sep for root in readable),
+            tuple(os.path.realpath(root).rstrip(os.sep) + os.sep for root in unreadable))
+
+
+def _make_audit(cwd: str, readable: tuple, unreadable: tuple):
+    """The audit hook; everything it uses is bound here.
+
+    Candidate code runs in this interpreter and can rebind module globals, builtins
+    and pure-Python helpers such as ``os.path.realpath``, so the hook keeps its own
+    references and only uses operations of exact ``str`` objects.
+    """
+    denied_events, denied_imports = _DENIED_EVENTS, _DENIED_IMPORTS
+    write_flags = os.O_WRONLY | os.O_RDWR
+    str_type, bytes_type, int_type, type_, len_, error = str, bytes, int, type, len, PermissionError
+    decode = bytes.decode
+
+    def readable_path(path) -> bool:
+        if type_(path) is bytes_type:
+            path = decode(path, "utf-8", "surrogateescape")
+        # Integer paths are inherited file descriptors; path-like objects could change between checks
+        if type_(path) is not str_type:
+            return False
+        if not path.startswith("/"):
+            path = cwd + path
+        # Without ".." a path can only leave a root through a symlink, and none can be created here
+        if "/../" in path + "/" or "/./" in path:
+            return False
+        path = path.rstrip("/") + "/"
+        return path.startswith(readable) and not path.startswith(unreadable)
+
+    def audit(event: str, args: tuple) -> None:
+        if event.startswith(denied_events):
+            raise error(f"{event} is not allowed in the sandbox")
+        if event == "open":
+            mode = args[1] if len_(args) > 1 else None
+            flags = args[2] if len_(args) > 2 else 0
+            if (type_(mode) is str_type and ("w" in mode or "a" in mode or "x" in mode or "+" in mode)) or \
+                    (type_(flags) is int_type and flags & write_flags):
+                raise error("Writing files is not allowed in the sandbox")
+        if event in ("open", "os.listdir", "os.scandir") and args and args[0] is not None \
+                and not readable_path(args[0]):
+            raise error("Reading files outside the sandbox is not allowed")
+        if event == "import" and args and type_(args[0]) is str_type and args[0].split(".")[0] in denied_imports:
+            raise error(f"Importing {args[0]} is not allowed in the sandbox")
+
+    return audit
+
+
+def _error(e: BaseException) -> dict:
+    """The exception's type for the candidate's score and its message for the server log."""
+    name = type(e).__name__
+    try:
+        detail = f"{name}: {e}"
+    except BaseException:
+        detail = name
+    return {"error": name if name.isidentifier() else "Exception", "detail": detail[:_DETAIL_LIMIT]}
+
+
+def _serialize(value):
+    """The return value as JSON; anything JSON cannot hold is compared by its repr."""
+    text = json.dumps(value, default=repr)
+    if len(text) > _VALUE_LIMIT:
+        raise ValueError(f"return value larger than {_VALUE_LIMIT} characters")
+    return json.loads(text)
+
+
+def run_tests(code: str, function_name: str, calls: list) -> dict:
+    """Call the candidate's function once per hidden test; returns the raw values, not a verdict."""
+    namespace = {"__name__": "__candidate__"}
+    captured = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(captured), contextlib.redirect_stderr(captured):
+            exec(compile(code, "<candidate>", "exec"), namespace)
+    except BaseException as e:
+        return {"compiled": False, **_error(e), "results": []}
+
+    function = namespace.get(function_name)
+    if not callable(function):
+        return {"compiled": True, "error": f"Function '{function_name}' is not defined", "results": []}
+
+    results = []
+    for call in calls:
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(captured), contextlib.redirect_stderr(captured):
+                actual = function(*call.get("args", []), **call.get("kwargs", {}))
+            result = {"value": _serialize(actual), "error": None}
+        except BaseException as e:
+            result = _error(e)
+        result["ms"] = round((time.perf_counter() - start) * 1000, 3)
+        results.append(result)
+        captured.truncate(min(captured.tell(), _OUTPUT_LIMIT))
+    return {"compiled": True, "error": None, "results": results}
+
+
+def main() -> None:
+    line = sys.stdin.readline()
+    if not line:
+        return
+    job = json.loads(line)
+    _apply_limits(job.get("cpu_seconds", 2.0), job.get("memory_bytes", 256 * 1024 * 1024))
+    isolated = _drop_network()
+    readable, unreadable = _readable_roots()
+    try:
+        _confine(readable)
+    except OSError as e:
+        # Candidate code never runs unconfined; the parent scores the answer without running it
+        _RESULT_OUT.write(json.dumps({"unavailable": True, "detail": str(e), "nonce": job["nonce"]}) + "\n")
+        _RESULT_OUT.flush()
+        return
+    # ctypes was only needed for the confinement; importing it again is refused
+    for name in [name for name in sys.modules if name.split(".")[0] in ("ctypes", "_ctypes")]:
+        del sys.modules[name]
+    sys.addaudithook(_make_audit(os.getcwd().rstrip(os.sep) + os.sep, readable, unreadable))
+    try:
+        outcome = run_tests(job["code"], job["function_name"], job["calls"])
+    except MemoryError:
+        outcome = {"compiled": True, "error": "MemoryError", "results": []}
+    outcome["network_namespace"] = isolated
+    # Candidate code can write to stdout too; only the line with the nonce counts
+    outcome["nonce"] = job["nonce"]
+    _RESULT_OUT.write(json.dumps(outcome) + "\n")
+    _RESULT_OUT.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import re
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+CRITERIA = ["relevance", "accuracy", "completeness", "clarity", "depth"]
+
+# Numeric value (out of 10) of each performance level used by the scoring prompt
+LEVEL_VALUES = {
+    "very bad": 1.0,
+    "verry bad": 1.0,
+    "bad": 3.0,
+    "good": 6.5,
+    "excellent": 9.0,
+}
+
+_LEVEL_PATTERN = r"(very bad|verry bad|bad|good|excellent)"
+_OVERALL_RE = re.compile(r"overall performance\W*" + _LEVEL_PATTERN, re.IGNORECASE)
+_CRITERION_RES = {
+    name: re.compile(name + r"\W*" + _LEVEL_PATTERN, re.IGNORECASE) for name in CRITERIA
+}
+
+
+@dataclass
+class ParsedScore:
+    """
+    Numeric view of one scoring response.
+
+    Attributes:
+        overall (float): Score out of 10, or None if nothing could be parsed.
+        criteria (dict): Score out of 10 per criterion that was found.
+        level (str): Overall performance level as written by the model, if any.
+    """
+
+    overall: Optional[float] = None
+    criteria: Dict[str, float] = field(default_factory=dict)
+    level: Optional[str] = None
+
+
+def parse_score(score_text: str) -> ParsedScore:
+    """Parse a scoring response, either the natural-language format of ``prompt_score``
+    or a JSON object with ``*_score`` fields."""
+    if not isinstance(score_text, str) or not score_text.strip():
+        return ParsedScore()
+
+    start_idx = score_text.find('{')
+    end_idx = score_text.rfind('}') + 1
+    if start_idx != -1 and end_idx > start_idx:
+        try:
+            data = json.loads(score_text[start_idx:end_idx])
+            criteria = {name: float(data[f"{name}_score"]) for name in CRITERIA
+                        if isinstance(data.get(f"{name}_score"), (int, float))}
+            overall = data.get("overall_score")
+            if isinstance(overall, (int, float)):
+                return ParsedScore(overall=float(overall), criteria=criteria)
+            if criteria:
+                return ParsedScore(overall=sum(criteria.values()) / len(criteria), criteria=criteria)
+        except (json.JSONDecodeError, TypeError, ValueError):
+            pass
+
+    criteria = {}
+    for name, pattern in _CRITERION_RES.items():
+        match = pattern.search(score_text)
+        if match:
+            criteria[name] = LEVEL_VALUES[match.group(1).lower()]
+
+    level_match = _OVERALL_RE.search(score_text)
+    level = level_match.group(1).title() if level_match else None
+
+    # The criteria average is finer grained than the three overall levels
+    if criteria:
+        overall = sum(criteria.values()) / len(criteria)
+    elif level:
+        overall = LEVEL_VALUES[level.lower()]
+    else:
+        overall = None
+    return ParsedScore(overall=overall, criteria=criteria, level=level)
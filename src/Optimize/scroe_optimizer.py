@@ -1,28 +1,45 @@
-from src.utils.main_utils import get_all_user_message, get_all_ai_message, get_all_corect_message
-from langchain_groq import ChatGroq
+from src.utils.main_utils import get_all_user_message, get_all_ai_records, get_all_corect_records
+from src.llm.circuit_breaker import get_circuit_breaker, DegradedResult
+from src.llm.invoke import invoke_llm
+from src.llm.factory import build_chat_model
+from src.prompts.registry import PromptSet, escape_prompt_template
+from src.Optimize.pre_scorer import LocalPreScorer
+from src.Optimize.code_grader import ExecutionGrader, TestSuite
+from src.Optimize.mcq_grader import MCQItem, grade_mcq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextvars
 import logging
-import re
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Template variables that should NOT be escaped in the scoring prompt
+SCORE_TEMPLATE_VARIABLES = ['question', 'correct_answer', 'user_answer']
+
+
 class ScoreOptimizer:
     """
     A class to optimize and generate scores for user answers based on AI questions and correct answers.
     """
 
-    def __init__(self, api_key: str, prompt: Dict[str, Any]):
+    def __init__(self, api_key: str, prompt: Dict[str, Any], coalesce: bool = None,
+                 pre_scorer: Optional[LocalPreScorer] = None,
+                 execution_grader: Optional[ExecutionGrader] = None):
         """
         Initialize the ScoreOptimizer.
 
         Args:
             api_key (str): API key for ChatGroq
-            prompt (dict): Prompt configuration from YAML format
+            prompt (dict): Prompt configuration from YAML format, or a ``PromptSet``
+                from the prompt registry
+            coalesce (bool): Share identical in-flight requests, defaults to the stage setting
+            pre_scorer (LocalPreScorer): Local first stage; answers it settles are not sent
+                to the LLM. None sends every answer to the LLM.
+            execution_grader (ExecutionGrader): Grades code answers to questions with hidden
+                tests by running them. None sends them to the LLM.
         """
         if not api_key:
             raise ValueError("API key cannot be empty")
@@ -31,8 +48,15 @@ class ScoreOptimizer:
 
         self.api_key = api_key
         self.prompt = prompt
-        self.llm = ChatGroq(api_key=self.api_key, model="gemma2-9b-it")
+        self.model = "gemma2-9b-it"
+        self.llm = build_chat_model(api_key=self.api_key, model=self.model)
+        self.breaker = get_circuit_breaker(model=self.model, stage="score", api_key=self.api_key)
+        self.coalesce = coalesce
         self.output_parser = StrOutputParser()
+        self.pre_scorer = pre_scorer
+        self.execution_grader = execution_grader
+        self.prompt_version = prompt.hash('prompt_score') if isinstance(prompt, PromptSet) else None
+        self._scoring_prompt = None
 
     def _escape_prompt_template(self, prompt_template: str) -> str:
         """
@@ -44,32 +68,7 @@ class ScoreOptimizer:
         Returns:
             str: Escaped prompt template
         """
-        # Valid template variables that should NOT be escaped by LangChain's prompt
-        # These are the variables that will be dynamically filled
-        valid_template_variables = ['{question}', '{correct_answer}', '{user_answer}']
-
-        # Use a more robust regex to find all unescaped single curly braces
-        # that are not part of the `valid_template_variables`.
-
-        # First, temporarily replace valid variables with unique placeholders
-        # to prevent them from being escaped.
-        placeholders = {}
-        for i, var in enumerate(valid_template_variables):
-            placeholder = f"__TEMP_VAR_{i}__"
-            prompt_template = prompt_template.replace(var, placeholder)
-            placeholders[placeholder] = var
-
-        # Now, escape any remaining single curly braces by doubling them.
-        # This regex looks for a single '{' not preceded by another '{'
-        # and a single '}' not followed by another '}'.
-        prompt_template = re.sub(r'(?<!\{)\{(?!\{)', '{{', prompt_template)
-        prompt_template = re.sub(r'(?<!\})\}(?!\})', '}}', prompt_template)
-
-        # Finally, restore the valid template variables from their placeholders.
-        for placeholder, original_var in placeholders.items():
-            prompt_template = prompt_template.replace(placeholder, original_var)
-
-        return prompt_template
+        return escape_prompt_template(prompt_template, SCORE_TEMPLATE_VARIABLES)
 
     def _create_scoring_prompt(self, question: str, correct_answer: str) -> ChatPromptTemplate:
         """
@@ -82,17 +81,25 @@ class ScoreOptimizer:
         Returns:
             ChatPromptTemplate: Configured prompt template
         """
+        # The template does not depend on the question, so it is built once per instance
+        if self._scoring_prompt is not None:
+            return self._scoring_prompt
+
         try:
-            # Escape the prompt template first
-            escaped_prompt_template = self._escape_prompt_template(self.prompt['prompt_score'])
+            # Escape the prompt template first; registry prompts are escaped once per version
+            if isinstance(self.prompt, PromptSet):
+                escaped_prompt_template = self.prompt.compiled('prompt_score').escaped(SCORE_TEMPLATE_VARIABLES)
+            else:
+                escaped_prompt_template = self._escape_prompt_template(self.prompt['prompt_score'])
 
             # Create the chat prompt template
             # The system message will contain the fixed parts of the prompt
             # The user message will contain the user's answer
-            return ChatPromptTemplate.from_messages([
+            self._scoring_prompt = ChatPromptTemplate.from_messages([
                 ("system", escaped_prompt_template),
                 ("user", "user_answer: {user_answer}")
             ])
+            return self._scoring_prompt
 
         except KeyError as e:
             logger.error(f"Missing key in prompt template: {e}")
@@ -101,7 +108,9 @@ class ScoreOptimizer:
             logger.error(f"Error creating scoring prompt: {e}")
             raise
 
-    def _generate_single_score(self, question: str, correct_answer: str, user_answer: str) -> str:
+    def _generate_single_score(self, question: str, correct_answer: str, user_answer: str,
+                               tests: Optional[Dict[str, Any]] = None,
+                               mcq: Optional[Dict[str, Any]] = None) -> str:
         """
         Generate a score for a single question-answer pair.
 
@@ -109,18 +118,40 @@ class ScoreOptimizer:
             question: The question
             correct_answer: The correct answer
             user_answer: The user's answer
+            tests: Hidden test suite of a coding question, see ``TestSuite.to_dict``
+            mcq: Options and answer key of a multiple choice question, see ``MCQItem.to_dict``
 
         Returns:
             str: Generated score
         """
+        item = MCQItem.from_dict(mcq)
+        if item is not None:
+            score = grade_mcq(item, user_answer)
+            if score is not None:
+                return score
+
+        suite = TestSuite.from_dict(tests)
+        if suite is not None and self.execution_grader is not None:
+            result = self.execution_grader.grade(suite, user_answer)
+            if result is not None:
+                return result.score_text
+
+        if self.pre_scorer is not None:
+            pre_score = self.pre_scorer.score(correct_answer, user_answer)
+            if pre_score.settled:
+                logger.info(f"Scored locally ({pre_score.decision}) for question: {question[:50]}...")
+                return pre_score.score_text
+
         try:
             chat_prompt_template = self._create_scoring_prompt(question, correct_answer)
 
             # Bind the values for 'question' and 'correct_answer' to the prompt template
-            # and then invoke the chain with 'user_answer'.
+            # and then invoke the model with 'user_answer'.
             # The `partial` method allows you to "pre-fill" some of the template variables.
-            chain = chat_prompt_template.partial(question=question, correct_answer=correct_answer) | self.llm | self.output_parser
-            score = chain.invoke({"user_answer": user_answer})
+            prompt = chat_prompt_template.partial(question=question, correct_answer=correct_answer)
+            score = invoke_llm(prompt, self.llm, self.output_parser, {"user_answer": user_answer},
+                               model=self.model, stage="score",
+                               breaker=self.breaker, coalesce=self.coalesce)
 
             logger.info(f"Generated score for question: {question[:50]}...")
             logger.debug(f"Score: {score}")
@@ -131,44 +162,125 @@ class ScoreOptimizer:
             logger.error(f"Error generating score for question: {question[:50]}... - {str(e)}")
             raise
 
-    def generate_score(self, messages: Any) -> List[str]:
+    def score_answer(self, question: str, correct_answer: str, user_answer: str,
+                     tests: Optional[Dict[str, Any]] = None, mcq: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Score one answer as soon as it is submitted, e.g. for adaptive interview length.
+
+        Args:
+            question: The question
+            correct_answer: The correct answer
+            user_answer: The user's answer
+            tests: Hidden test suite of a coding question
+            mcq: Options and answer key of a multiple choice question
+
+        Returns:
+            str: Generated score
+        """
+        return self._generate_single_score(question, correct_answer, user_answer, tests, mcq)
+
+    def score_items(self, messages: Any) -> List[Tuple[Any, Any, str]]:
+        """(question record, correct answer record, user answer) per answered question."""
+        question_records = get_all_ai_records(messages)
+        correct_answers = get_all_corect_records(messages)
+        # Oversized answers were compacted to the score stage's token budget on submit
+        user_answers = get_all_user_message(messages, stage="score")
+
+        # Log extracted data for debugging
+        logger.info(f"Extracted {len(question_records)} questions, {len(correct_answers)} correct answers, "
+                    f"{len(user_answers)} user answers")
+        return list(zip(question_records, correct_answers, user_answers))
+
+    def count_scores(self, messages: Any) -> int:
+        """Number of scores ``iter_scores`` and ``generate_score`` produce for ``messages``."""
+        return len(self.score_items(messages))
+
+    def iter_scores(self, messages: Any, known_scores: Optional[Dict[int, str]] = None,
+                    concurrency: int = 2) -> Iterator[Tuple[int, Union[str, DegradedResult]]]:
+        """
+        Yield ``(index, score)`` for each question-answer pair as soon as its score is ready.
+
+        Known and deferred scores come first, in question order; the remaining pairs
+        are scored ``concurrency`` at a time and yielded in the order they finish, so
+        a caller can show the first score after one scoring call instead of all of them.
+        Deferral works as in ``generate_score``.
+
+        Args:
+            messages: Messages containing questions, correct answers, and user answers
+            known_scores: Scores already generated, by 0-based question index
+            concurrency: Scoring calls in flight at once
+
+        Yields:
+            Tuple[int, Union[str, DegradedResult]]: 0-based question index and its score
+        """
+        pending = {}
+        for i, (question_record, correct_record, user_ans) in enumerate(self.score_items(messages)):
+            if known_scores and i in known_scores:
+                yield i, known_scores[i]
+            # Degraded reference answers would be scored as if they were real
+            elif correct_record.get("degraded"):
+                logger.warning(f"Deferring score for question {i + 1}: reference answer is degraded")
+                yield i, DegradedResult(
+                    stage="score",
+                    reason=correct_record.get("degraded_reason", "reference answer unavailable"),
+                    content="Scoring deferred until the reference answer is available."
+                )
+            else:
+                pending[i] = (question_record['content'], correct_record['content'], user_ans,
+                              question_record.get('tests'), question_record.get('mcq'))
+        if not pending:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(pending))),
+                                      thread_name_prefix="score")
+        try:
+            # Each call runs in a copy of the caller's context, so its logs keep the interview fields
+            futures = {
+                executor.submit(contextvars.copy_context().run, self._generate_single_score, *arguments): i
+                for i, arguments in pending.items()
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    yield i, future.result()
+                except Exception as e:
+                    yield i, DegradedResult(
+                        stage="score",
+                        reason=str(e),
+                        content="Scoring deferred because the scoring service is unavailable."
+                    )
+        finally:
+            # A caller that stops early (e.g. a rerun closing the generator) must not wait
+            # for the calls still running; those not started yet are dropped
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def generate_score(self, messages: Any,
+                       known_scores: Optional[Dict[int, str]] = None) -> List[Union[str, DegradedResult]]:
         """
         Generate scores for all question-answer pairs in the messages.
 
+        Pairs whose correct answer is a degraded placeholder are not sent to the LLM,
+        and pairs whose scoring call fails come back as a ``DegradedResult`` instead
+        of failing the whole page, so they can be re-scored once the circuit closes.
+        Use ``iter_scores`` to get each score as soon as it is ready.
+
         Args:
             messages: Messages containing questions, correct answers, and user answers
+            known_scores: Scores already generated, by 0-based question index; these
+                questions are not sent to the LLM again
 
         Returns:
-            List[str]: List of generated scores
+            List[Union[str, DegradedResult]]: Generated scores, or deferred placeholders
 
         Raises:
             Exception: If there's an error in processing or validation
         """
         try:
-            # Extract messages using utility functions
-            questions = get_all_ai_message(messages)
-            correct_answers = get_all_corect_message(messages)
-            user_answers = get_all_user_message(messages)
-
-            # Log extracted data for debugging
-            logger.info(f"Extracted {len(questions)} questions, {len(correct_answers)} correct answers, "
-                        f"{len(user_answers)} user answers")
-
-            # Check if there are any messages to process
-            if not questions:
+            results = dict(self.iter_scores(messages, known_scores=known_scores))
+            if not results:
                 logger.warning("No questions found in messages")
                 return []
-
-            scores = []
-
-            # Process each question-answer pair
-            for i, (question, correct_ans, user_ans) in enumerate(zip(questions, correct_answers, user_answers)):
-                logger.info(f"Processing question {i + 1}/{len(questions)}")
-
-                # Generate score for current pair
-                score = self._generate_single_score(question, correct_ans, user_ans)
-                scores.append(score)
-                print(score)
+            scores = [results[i] for i in range(len(results))]
 
             logger.info(f"Successfully generated {len(scores)} scores")
             return scores
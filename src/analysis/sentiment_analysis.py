@@ -1,22 +1,23 @@
-from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from src.llm.circuit_breaker import get_circuit_breaker
+from src.llm.invoke import invoke_llm
+from src.llm.factory import build_chat_model
 import logging
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class SentimentAnalysis:
     """
     A class to analyze users' answers based on the Sentiment expressed in their responses to given questions.
     """
-    def __init__(self, api_key, prompt):
+    def __init__(self, api_key, prompt, coalesce=None):
         """Initialize the SentimentAnalysis
 
         Args:
             api_key (str): ChatGroq api key
             prompt (str): System prompt for llm
+            coalesce (bool): Share identical in-flight requests, defaults to the stage setting
         """
         
         self.api_key = api_key
@@ -26,7 +27,10 @@ class SentimentAnalysis:
                         ("user","Answer:{Answer}")
             ]
         )
-        self.llm = ChatGroq(api_key=api_key, model="gemma2-9b-it")
+        self.model = "gemma2-9b-it"
+        self.llm = build_chat_model(api_key=api_key, model=self.model)
+        self.breaker = get_circuit_breaker(model=self.model, stage="analysis", api_key=self.api_key)
+        self.coalesce = coalesce
         self.output_parser = StrOutputParser()
     
     def analysis(self,human_message, ai_message):
@@ -37,18 +41,18 @@ class SentimentAnalysis:
             ai_message (str): question generate by Chatbot
 
         Raises:
+            CircuitOpenError: If the analysis stage is degraded and no probe is due.
             e: If any error in this code raise e
 
         Returns:
             str: Retrun user more confident or some user confused.
         """
         try:
-            logging.info("Analysis bot chain creation done ")
-            chain = self.prompt | self.llm | self.output_parser
             message =        [ AIMessage(content=ai_message),
                                 HumanMessage(content=human_message)]
-            analysis = chain.invoke(message)
-            logger.info(f"Successfully analysis user sentiment {analysis} ")
+            analysis = invoke_llm(self.prompt, self.llm, self.output_parser, message,
+                                  model=self.model, stage="analysis",
+                                  breaker=self.breaker, coalesce=self.coalesce)
             
             return analysis
     
@@ -0,0 +1,307 @@
+"""
+Near-duplicate detection of candidate answers across interviews.
+
+Answers are reduced to MinHash signatures and indexed with locality-sensitive
+hashing (LSH) per question, so a new answer is compared with the few past answers
+sharing a band bucket instead of every past answer.
+
+Rebuild the index from the compressed interview archive:
+    python -m src.analytics.answer_index rebuild --archive data/archive
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.analytics.interview_archive import InterviewArchive, default_archive_path
+
+logger = logging.getLogger(__name__)
+
+
+NUM_PERM = 128
+BANDS = 32  # 4 rows per band: pairs above ~0.5 similarity almost always share a bucket
+
+# Answers shorter than this are too generic to call copied (e.g. an MCQ letter)
+MIN_WORDS = 8
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"[a-z0-9]+")
+_NEXT_QUESTION = "**Next Question:**"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    question_key TEXT NOT NULL,
+    interview_id TEXT NOT NULL,
+    question_number INTEGER NOT NULL,
+    signature BLOB NOT NULL,
+    duplicate_of INTEGER,
+    similarity REAL,
+    created_at REAL NOT NULL,
+    UNIQUE (interview_id, question_number)
+);
+CREATE INDEX IF NOT EXISTS answers_flagged ON answers (similarity);
+"""
+
+
+def _permutations(seed: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    generator = np.random.RandomState(seed)
+    a = generator.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+    b = generator.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+    return a, b
+
+
+_PERM_A, _PERM_B = _permutations()
+
+
+def question_key(question: str) -> str:
+    """Group key of a question: its normalized text, without the analysis shown before it."""
+    text = question.rsplit(_NEXT_QUESTION, 1)[-1] if question else ""
+    normalized = " ".join(_WORD.findall(text.lower()))
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def shingles(text: str, size: int = 3) -> List[str]:
+    """Word n-grams of the lower-cased answer; stopwords are kept, copied text keeps them too."""
+    words = _WORD.findall((text or "").lower())
+    if len(words) < size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of ``text``; None for answers below ``MIN_WORDS`` words."""
+    if len(_WORD.findall((text or "").lower())) < MIN_WORDS:
+        return None
+    values = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+         for shingle in set(shingles(text))),
+        dtype=np.uint64
+    )
+    # Universal hashing a*x + b mod p per permutation, on 32-bit values so it cannot overflow
+    permuted = (np.outer(values, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def estimate_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+def _band_keys(signature: np.ndarray) -> List[bytes]:
+    rows = NUM_PERM // BANDS
+    return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(BANDS)]
+
+
+@dataclass
+class DuplicateMatch:
+    """A past answer that is likely a near-duplicate of the queried one."""
+    answer_id: int
+    interview_id: str
+    question_number: int
+    similarity: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"answer_id": self.answer_id, "interview_id": self.interview_id,
+                "question_number": self.question_number, "similarity": round(self.similarity, 3)}
+
+
+class AnswerIndex:
+    """
+    Persistent MinHash LSH index of past candidate answers, grouped by question.
+
+    Signatures are stored in SQLite; the band buckets are rebuilt in memory when
+    the index is opened and kept up to date on every insert, including inserts
+    made by other processes, which are picked up before each query. No answer
+    text is stored.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.8):
+        """Initialize the AnswerIndex.
+
+        Args:
+            path (str): SQLite file, created if missing.
+            threshold (float): Estimated similarity from which answers count as duplicates.
+        """
+        self.path = path
+        self.threshold = threshold
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._buckets: Dict[Tuple[str, int, bytes], List[int]] = defaultdict(list)
+        self._entries: Dict[int, Tuple[str, int, np.ndarray]] = {}
+        self._last_id = 0
+        with self._lock:
+            self._load_new()
+
+    def _load_new(self) -> None:
+        rows = self._db.execute(
+            "SELECT id, question_key, interview_id, question_number, signature FROM answers "
+            "WHERE id > ? ORDER BY id", (self._last_id,)
+        ).fetchall()
+        for answer_id, key, interview_id, number, blob in rows:
+            self._index(answer_id, key, interview_id, number, np.frombuffer(blob, dtype=np.uint32))
+
+    def _index(self, answer_id: int, key: str, interview_id: str, number: int, signature: np.ndarray) -> None:
+        self._entries[answer_id] = (interview_id, number, signature)
+        for band, band_key in enumerate(_band_keys(signature)):
+            self._buckets[(key, band, band_key)].append(answer_id)
+        self._last_id = max(self._last_id, answer_id)
+
+    def _refresh(self) -> None:
+        latest = self._db.execute("SELECT MAX(id) FROM answers").fetchone()[0] or 0
+        if latest > self._last_id:
+            self._load_new()
+
+    def _candidates(self, key: str, signature: np.ndarray, exclude_interview: Optional[str]) -> List[DuplicateMatch]:
+        seen = set()
+        matches = []
+        for band, band_key in enumerate(_band_keys(signature)):
+            for answer_id in self._buckets.get((key, band, band_key), ()):
+                if answer_id in seen:
+                    continue
+                seen.add(answer_id)
+                entry = self._entries.get(answer_id)
+                # Replaced by a re-submitted answer
+                if entry is None:
+                    continue
+                interview_id, number, other = entry
+                if interview_id == exclude_interview:
+                    continue
+                similarity = estimate_similarity(signature, other)
+                if similarity >= self.threshold:
+                    matches.append(DuplicateMatch(answer_id, interview_id, number, similarity))
+        matches.sort(key=lambda match: match.similarity, reverse=True)
+        return matches
+
+    def query(self, question: str, answer: str, exclude_interview: Optional[str] = None,
+              limit: int = 5) -> List[DuplicateMatch]:
+        """Likely near-duplicates of ``answer`` among past answers to the same question."""
+        signature = minhash(answer)
+        if signature is None:
+            return []
+        with self._lock:
+            self._refresh()
+            return self._candidates(question_key(question), signature, exclude_interview)[:limit]
+
+    def add(self, interview_id: str, question_number: int, question: str, answer: str,
+            created_at: Optional[float] = None) -> List[DuplicateMatch]:
+        """Check ``answer`` against past answers, then index it.
+
+        Returns:
+            list: Its likely near-duplicates from other interviews, most similar first.
+        """
+        signature = minhash(answer)
+        if signature is None:
+            return []
+        key = question_key(question)
+        with self._lock:
+            self._refresh()
+            matches = self._candidates(key, signature, interview_id)
+            best = matches[0] if matches else None
+            replaced = self._db.execute(
+                "SELECT id FROM answers WHERE interview_id = ? AND question_number = ?",
+                (interview_id, question_number)
+            ).fetchone()
+            if replaced:
+                self._entries.pop(replaced[0], None)
+            cursor = self._db.execute(
+                "INSERT OR REPLACE INTO answers (question_key, interview_id, question_number, signature, "
+                "duplicate_of, similarity, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, interview_id, question_number, signature.tobytes(),
+                 best.answer_id if best else None, best.similarity if best else None,
+                 created_at or time.time())
+            )
+            self._index(cursor.lastrowid, key, interview_id, question_number, signature)
+        return matches
+
+    def flagged(self, limit: int = 200) -> List[Dict[str, Any]]:
+        """Indexed answers that were near-duplicates of an earlier answer when they were added."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT a.interview_id, a.question_number, a.similarity, b.interview_id, b.question_number, "
+                "a.created_at FROM answers a LEFT JOIN answers b ON b.id = a.duplicate_of "
+                "WHERE a.similarity IS NOT NULL ORDER BY a.created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [{"interview": interview, "question": number, "similarity": round(similarity, 3),
+                 "matches_interview": other_interview, "matches_question": other_number,
+                 "flagged_at": time.strftime("%Y-%m-%d %H:%M", time.localtime(created_at))}
+                for interview, number, similarity, other_interview, other_number, created_at in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._refresh()
+            flagged = self._db.execute("SELECT COUNT(*) FROM answers WHERE similarity IS NOT NULL").fetchone()[0]
+            return {"answers": len(self._entries), "buckets": len(self._buckets), "flagged": flagged}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM answers")
+            self._buckets.clear()
+            self._entries.clear()
+            self._last_id = 0
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def iter_archived_answers(archive: InterviewArchive) -> Iterable[Tuple[str, int, str, str, float]]:
+    """``(interview_id, question_number, question, answer, completed_at)`` from the interview archive."""
+    from src.utils.main_utils import get_all_ai_message, get_all_user_message
+
+    for record in archive.scan():
+        questions = get_all_ai_message(record["messages"])
+        answers = get_all_user_message(record["messages"])
+        for number, (question, answer) in enumerate(zip(questions, answers), 1):
+            yield record["interview_id"], number, question, answer, record["completed_at"]
+
+
+def rebuild(index: AnswerIndex, archive: InterviewArchive) -> Dict[str, int]:
+    """Rebuild ``index`` from the archive in interview order, so the earlier answer is the original."""
+    index.clear()
+    started = time.perf_counter()
+    answers = 0
+    for interview_id, number, question, answer, completed_at in iter_archived_answers(archive):
+        index.add(interview_id, number, question, answer, created_at=completed_at)
+        answers += 1
+    stats = index.stats()
+    logger.info(f"Rebuilt answer index from {answers} archived answers in {time.perf_counter() - started:.1f}s")
+    return stats
+
+
+def default_answer_index_path() -> str:
+    return os.path.join(os.getenv("TALENTSCOUT_DATA_DIR", "data"), "answer_index.sqlite3")
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.utils.logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Near-duplicate answer index")
+    parser.add_argument("command", choices=["rebuild", "stats"])
+    parser.add_argument("--index", default=default_answer_index_path())
+    parser.add_argument("--archive", default=default_archive_path(),
+                        help="Directory of the compressed interview archive")
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("TALENTSCOUT_DUPLICATE_THRESHOLD", "0.8")))
+    args = parser.parse_args()
+
+    configure_logging()
+    answer_index = AnswerIndex(args.index, threshold=args.threshold)
+    if args.command == "rebuild":
+        print(json.dumps(rebuild(answer_index, InterviewArchive(args.archive, auto_train_at=None))))
+    else:
+        print(json.dumps(answer_index.stats()))
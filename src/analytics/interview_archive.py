@@ -0,0 +1,477 @@
+"""
+Compressed, append-only archive of completed interviews.
+
+Each archived interview (candidate data, the ``messages`` records and the score
+texts) is one JSON document compressed as its own zstd frame, so any interview can
+be read back on its own. Transcripts are short and share most of their structure
+(prompt boilerplate, score formats, technology names), which a single frame cannot
+exploit; a zstd dictionary trained on past transcripts supplies that shared context.
+
+Layout of the archive directory:
+
+* ``segment-000001.zst``: records appended as a 4-byte little-endian length and the
+  frame; a new segment starts once the current one reaches ``segment_bytes``,
+* ``dictionaries/<dict id>.dict``: every dictionary ever trained; frames name the
+  dictionary they were compressed with, so retraining never rewrites old segments,
+* ``index.bin``: one fixed-width row per interview (email hash, completion time,
+  tech stack mask, segment and offset), searched with vectorized NumPy filters,
+* ``tech_vocabulary.json``: the bit assigned to each technology in the tech mask.
+
+Train or retrain the dictionary, and inspect or export the archive:
+    python -m src.analytics.interview_archive train
+    python -m src.analytics.interview_archive stats
+    python -m src.analytics.interview_archive export --email jane@example.com
+"""
+import os
+import re
+import json
+import time
+import struct
+import threading
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import zstandard as zstd
+
+from src.analytics.score_store import MAX_TECH_VOCABULARY, interview_key
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_DTYPE = np.dtype([
+    ("interview", "<u8"),     # hash of the interview id
+    ("email", "<u8"),         # hash of the normalized email
+    ("completed_at", "<f8"),  # unix time the interview was archived
+    ("tech_mask", "<u8"),     # bit i set if the candidate listed tech vocabulary[i]
+    ("offset", "<u8"),        # of the length prefix in the segment
+    ("segment", "<u4"),
+    ("length", "<u4"),        # compressed frame bytes
+    ("raw_length", "<u4"),    # JSON document bytes
+    ("dict_id", "<u4"),       # 0 if compressed without a dictionary
+])
+
+SEGMENT_BYTES = 64 * 1024 * 1024
+DICTIONARY_BYTES = 112 * 1024
+COMPRESSION_LEVEL = 9
+
+# Until the first dictionary is trained, records are compressed without one
+AUTO_TRAIN_AT = 200
+TRAIN_SAMPLES = 2000
+
+_LENGTH = struct.Struct("<I")
+_SEGMENT_NAME = re.compile(r"^segment-(\d{6})\.zst$")
+
+
+def email_key(email: str) -> int:
+    """Fixed-width hash of an email, matched case-insensitively."""
+    return interview_key((email or "").strip().lower())
+
+
+class InterviewArchive:
+    """
+    Append-only, dictionary-compressed archive of completed interviews.
+
+    Appends write the record to the current segment first and then its index row
+    in a single write, so a crash leaves at most a record without an index row;
+    ``rebuild_index`` recovers those by scanning the segments. One process writes
+    the archive; any number of threads can read it.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = SEGMENT_BYTES,
+                 level: int = COMPRESSION_LEVEL, auto_train_at: Optional[int] = AUTO_TRAIN_AT):
+        """Initialize the InterviewArchive.
+
+        Args:
+            directory (str): Directory holding the segments, index and dictionaries.
+            segment_bytes (int): Size after which appends start a new segment.
+            level (int): zstd compression level.
+            auto_train_at (int): Train the first dictionary in a background thread once
+                this many interviews are archived; None leaves training to
+                ``train_dictionary`` (e.g. the ``train`` command).
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.level = level
+        self.auto_train_at = auto_train_at
+        self._dictionary_dir = os.path.join(directory, "dictionaries")
+        os.makedirs(self._dictionary_dir, exist_ok=True)
+        self._index_path = os.path.join(directory, "index.bin")
+        self._vocabulary_path = os.path.join(directory, "tech_vocabulary.json")
+        self._current_path = os.path.join(self._dictionary_dir, "current")
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._vocabulary = self._read_vocabulary()
+        self._dictionaries: Dict[int, zstd.ZstdCompressionDict] = {}
+        self._dict_id = 0
+        self._current_mtime = None
+        self._compressor = self._make_compressor(0)
+        self._load_current_dictionary()
+        self._training: Optional[threading.Thread] = None
+        self._cache_size = None
+        self._cache: Optional[np.ndarray] = None
+
+    # --- Dictionaries ---
+
+    def _dictionary_path(self, dict_id: int) -> str:
+        return os.path.join(self._dictionary_dir, f"{dict_id}.dict")
+
+    def _load_current_dictionary(self) -> None:
+        """Switch to the current dictionary if it changed, e.g. trained by the ``train`` command.
+
+        Costs a ``stat`` when nothing changed; callers hold the lock or own the archive.
+        """
+        try:
+            mtime = os.stat(self._current_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._current_mtime:
+            return
+        with open(self._current_path, "r", encoding="utf-8") as file:
+            dict_id = int(file.read().strip() or 0)
+        if dict_id != self._dict_id:
+            self._compressor = self._make_compressor(dict_id)
+            self._dict_id = dict_id
+        self._current_mtime = mtime
+
+    def _dictionary(self, dict_id: int) -> Optional[zstd.ZstdCompressionDict]:
+        if not dict_id:
+            return None
+        dictionary = self._dictionaries.get(dict_id)
+        if dictionary is None:
+            with open(self._dictionary_path(dict_id), "rb") as file:
+                dictionary = zstd.ZstdCompressionDict(file.read())
+            self._dictionaries[dict_id] = dictionary
+        return dictionary
+
+    def _make_compressor(self, dict_id: int) -> zstd.ZstdCompressor:
+        dictionary = self._dictionary(dict_id)
+        if dictionary is None:
+            return zstd.ZstdCompressor(level=self.level)
+        return zstd.ZstdCompressor(level=self.level, dict_data=dictionary)
+
+    def _decompressor(self, dict_id: int) -> zstd.ZstdDecompressor:
+        # Decompressors are not thread-safe, so each reading thread keeps its own
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            dictionary = self._dictionary(dict_id)
+            decompressor = (zstd.ZstdDecompressor() if dictionary is None
+                            else zstd.ZstdDecompressor(dict_data=dictionary))
+            decompressors[dict_id] = decompressor
+        return decompressor
+
+    @property
+    def dict_id(self) -> int:
+        """Id of the dictionary new records are compressed with, 0 if none."""
+        return self._dict_id
+
+    def train_dictionary(self, samples: Optional[Sequence[bytes]] = None,
+                         size: int = DICTIONARY_BYTES) -> Optional[int]:
+        """Train a dictionary and compress new records with it.
+
+        Args:
+            samples (list): JSON documents to train on; defaults to the most recently
+                archived ``TRAIN_SAMPLES`` interviews.
+            size (int): Dictionary size in bytes.
+
+        Returns:
+            int: The new dictionary's id, or None if there were too few samples.
+        """
+        if samples is None:
+            index = self.load_index()
+            rows = np.arange(max(0, len(index) - TRAIN_SAMPLES), len(index))
+            samples = list(self.iter_raw(rows))
+        if not samples:
+            return None
+        try:
+            dictionary = zstd.train_dictionary(size, list(samples), level=self.level)
+        except zstd.ZstdError as e:
+            logger.warning(f"Dictionary not trained from {len(samples)} samples: {e}")
+            return None
+
+        dict_id = dictionary.dict_id()
+        with open(self._dictionary_path(dict_id), "wb") as file:
+            file.write(dictionary.as_bytes())
+        with self._lock:
+            self._dictionaries[dict_id] = dictionary
+            tmp_path = self._current_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.write(str(dict_id))
+            os.replace(tmp_path, self._current_path)
+            self._load_current_dictionary()
+        logger.info("Archive dictionary trained", extra={"dict_id": dict_id, "samples": len(samples)})
+        return dict_id
+
+    def _train_in_background(self) -> None:
+        """Train the first dictionary without holding up the append that triggered it."""
+        def train():
+            try:
+                self.train_dictionary()
+            except Exception as e:
+                logger.error(f"Error training the archive dictionary: {e}")
+
+        if self._training is not None and self._training.is_alive():
+            return
+        self._training = threading.Thread(target=train, name="archive-train", daemon=True)
+        self._training.start()
+
+    # --- Tech vocabulary ---
+
+    def _read_vocabulary(self) -> List[str]:
+        if not os.path.exists(self._vocabulary_path):
+            return []
+        with open(self._vocabulary_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    @property
+    def tech_vocabulary(self) -> List[str]:
+        return list(self._vocabulary)
+
+    def _tech_mask(self, tech_stack: Sequence[str]) -> int:
+        mask = 0
+        changed = False
+        for tech in tech_stack:
+            if tech not in self._vocabulary:
+                if len(self._vocabulary) >= MAX_TECH_VOCABULARY:
+                    logger.warning(f"Archive tech vocabulary full, not indexing '{tech}'")
+                    continue
+                self._vocabulary.append(tech)
+                changed = True
+            mask |= 1 << self._vocabulary.index(tech)
+        if changed:
+            tmp_path = self._vocabulary_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self._vocabulary, file)
+            os.replace(tmp_path, self._vocabulary_path)
+        return mask
+
+    # --- Segments ---
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:06d}.zst")
+
+    def segments(self) -> List[int]:
+        """Numbers of the segment files, in append order."""
+        return sorted(int(match.group(1)) for match in map(_SEGMENT_NAME.match, os.listdir(self.directory))
+                      if match)
+
+    def _current_segment(self) -> int:
+        segments = self.segments()
+        if not segments:
+            return 1
+        if os.path.getsize(self._segment_path(segments[-1])) >= self.segment_bytes:
+            return segments[-1] + 1
+        return segments[-1]
+
+    # --- Writing ---
+
+    def append(self, interview_id: str, candidate_data: Dict[str, Any], messages: Sequence[Dict[str, Any]],
+               scores: Sequence[str], completed_at: float = None) -> int:
+        """Archive one completed interview.
+
+        Args:
+            interview_id (str): Unique id of the interview.
+            candidate_data (dict): The candidate form, including email and tech stack.
+            messages (list): Message records (``to_dict``) of the conversation.
+            scores (list): Score text per question, in question order.
+            completed_at (float): Unix time, defaults to now.
+
+        Returns:
+            int: Row number of the interview in the index.
+        """
+        completed_at = completed_at or time.time()
+        document = json.dumps({
+            "interview_id": interview_id,
+            "completed_at": completed_at,
+            "candidate": candidate_data,
+            "messages": list(messages),
+            "scores": [str(score) for score in scores],
+        }, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+        with self._lock:
+            self._load_current_dictionary()
+            frame = self._compressor.compress(document)
+            segment = self._current_segment()
+            path = self._segment_path(segment)
+            offset = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(path, "ab") as file:
+                file.write(_LENGTH.pack(len(frame)) + frame)
+
+            row = np.zeros(1, dtype=INDEX_DTYPE)
+            row[0] = (interview_key(interview_id), email_key(candidate_data.get("email", "")), completed_at,
+                      self._tech_mask(candidate_data.get("tech_stack", [])),
+                      offset, segment, len(frame), len(document), self._dict_id)
+            with open(self._index_path, "ab") as file:
+                file.write(row.tobytes())
+            count = os.path.getsize(self._index_path) // INDEX_DTYPE.itemsize
+
+        # Retried every ``auto_train_at`` interviews if the samples were not enough
+        if self.auto_train_at and not self._dict_id and count % self.auto_train_at == 0:
+            self._train_in_background()
+        return count - 1
+
+    # --- Reading ---
+
+    def load_index(self) -> np.ndarray:
+        """All index rows, reusing the previous load while nothing was appended."""
+        size = os.path.getsize(self._index_path) if os.path.exists(self._index_path) else 0
+        with self._lock:
+            if self._cache is not None and self._cache_size == size:
+                return self._cache
+            # A crash during an append can leave a partial row at the end
+            rows = size // INDEX_DTYPE.itemsize
+            self._cache = (np.fromfile(self._index_path, dtype=INDEX_DTYPE, count=rows) if rows
+                           else np.empty(0, dtype=INDEX_DTYPE))
+            self._cache_size = size
+            self._vocabulary = self._read_vocabulary()
+            return self._cache
+
+    def __len__(self) -> int:
+        return len(self.load_index())
+
+    def find(self, email: str = None, since: float = None, until: float = None,
+             tech: str = None, interview_id: str = None) -> np.ndarray:
+        """Row numbers of the interviews matching every given filter, oldest first."""
+        index = self.load_index()
+        mask = np.ones(len(index), dtype=bool)
+        if email is not None:
+            mask &= index["email"] == np.uint64(email_key(email))
+        if interview_id is not None:
+            mask &= index["interview"] == np.uint64(interview_key(interview_id))
+        if since is not None:
+            mask &= index["completed_at"] >= since
+        if until is not None:
+            mask &= index["completed_at"] < until
+        if tech is not None:
+            if tech not in self._vocabulary:
+                return np.empty(0, dtype=np.int64)
+            mask &= (index["tech_mask"] & np.uint64(1 << self._vocabulary.index(tech))) != 0
+        return np.flatnonzero(mask)
+
+    def _decode(self, frame: bytes, raw: bool = False):
+        dict_id = zstd.get_frame_parameters(frame).dict_id
+        document = self._decompressor(dict_id).decompress(frame)
+        return document if raw else json.loads(document)
+
+    def get(self, row: int) -> Dict[str, Any]:
+        """The archived interview at ``row``: interview_id, completed_at, candidate, messages and scores."""
+        entry = self.load_index()[row]
+        with open(self._segment_path(int(entry["segment"])), "rb") as file:
+            file.seek(int(entry["offset"]) + _LENGTH.size)
+            return self._decode(file.read(int(entry["length"])))
+
+    def _iter_frames(self, rows: Iterable[int]) -> Iterator[bytes]:
+        # Reads in segment and offset order, holding one segment open at a time
+        index = self.load_index()
+        rows = np.asarray(list(rows) if not isinstance(rows, np.ndarray) else rows, dtype=np.int64)
+        entries = index[rows]
+        order = np.lexsort((entries["offset"], entries["segment"]))
+        file, open_segment = None, None
+        try:
+            for entry in entries[order]:
+                segment = int(entry["segment"])
+                if segment != open_segment:
+                    if file is not None:
+                        file.close()
+                    file, open_segment = open(self._segment_path(segment), "rb"), segment
+                file.seek(int(entry["offset"]) + _LENGTH.size)
+                yield file.read(int(entry["length"]))
+        finally:
+            if file is not None:
+                file.close()
+
+    def iter_raw(self, rows: Iterable[int]) -> Iterator[bytes]:
+        """JSON documents of ``rows``, in archive order."""
+        for frame in self._iter_frames(rows):
+            yield self._decode(frame, raw=True)
+
+    def scan(self, rows: Optional[Iterable[int]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream archived interviews in archive order; all of them unless ``rows`` (e.g. from ``find``) is given."""
+        if rows is None:
+            rows = np.arange(len(self.load_index()))
+        for frame in self._iter_frames(rows):
+            yield self._decode(frame)
+
+    def _iter_segment(self, segment: int) -> Iterator[tuple]:
+        """(offset, frame) of every complete record in a segment, without the index."""
+        with open(self._segment_path(segment), "rb") as file:
+            offset = 0
+            while True:
+                prefix = file.read(_LENGTH.size)
+                if len(prefix) < _LENGTH.size:
+                    return
+                (length,) = _LENGTH.unpack(prefix)
+                frame = file.read(length)
+                if len(frame) < length:
+                    logger.warning(f"Truncated record at the end of segment {segment}")
+                    return
+                yield offset, frame
+                offset += _LENGTH.size + length
+
+    def rebuild_index(self) -> int:
+        """Rewrite the index from the segments, e.g. after a crash between the two writes."""
+        rows = []
+        with self._lock:
+            for segment in self.segments():
+                for offset, frame in self._iter_segment(segment):
+                    document = self._decode(frame, raw=True)
+                    record = json.loads(document)
+                    candidate = record.get("candidate") or {}
+                    rows.append((interview_key(record["interview_id"]), email_key(candidate.get("email", "")),
+                                 record["completed_at"], self._tech_mask(candidate.get("tech_stack", [])),
+                                 offset, segment, len(frame), len(document),
+                                 zstd.get_frame_parameters(frame).dict_id))
+            index = np.array(rows, dtype=INDEX_DTYPE)
+            tmp_path = self._index_path + ".tmp"
+            index.tofile(tmp_path)
+            os.replace(tmp_path, self._index_path)
+            self._cache = None
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        index = self.load_index()
+        compressed = int(index["length"].sum()) + len(index) * _LENGTH.size
+        raw = int(index["raw_length"].sum())
+        return {
+            "interviews": int(len(index)),
+            "segments": len(self.segments()),
+            "raw_bytes": raw,
+            "compressed_bytes": compressed,
+            "index_bytes": int(len(index) * INDEX_DTYPE.itemsize),
+            "compression_ratio": round(raw / compressed, 2) if compressed else None,
+            "dict_id": self._dict_id,
+            "with_dictionary": int(np.count_nonzero(index["dict_id"])),
+        }
+
+
+def default_archive_path() -> str:
+    return os.path.join(os.getenv("TALENTSCOUT_DATA_DIR", "data"), "archive")
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.utils.logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Compressed interview archive")
+    parser.add_argument("command", choices=["train", "stats", "rebuild-index", "export"])
+    parser.add_argument("--archive", default=default_archive_path())
+    parser.add_argument("--email", help="Export only this candidate's interviews")
+    parser.add_argument("--tech", help="Export only interviews listing this technology")
+    parser.add_argument("--since-days", type=float, help="Export only interviews of the last N days")
+    args = parser.parse_args()
+
+    configure_logging()
+    archive = InterviewArchive(args.archive, auto_train_at=None)
+    if args.command == "train":
+        print(json.dumps({"dict_id": archive.train_dictionary()}))
+    elif args.command == "rebuild-index":
+        print(json.dumps({"interviews": archive.rebuild_index()}))
+    elif args.command == "export":
+        since = time.time() - args.since_days * 86400 if args.since_days else None
+        for record in archive.scan(archive.find(email=args.email, tech=args.tech, since=since)):
+            print(json.dumps(record, ensure_ascii=False))
+    else:
+        print(json.dumps(archive.stats()))
@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+import warnings
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.Optimize.score_parser import CRITERIA, ParsedScore
+
+logger = logging.getLogger(__name__)
+
+
+EXPERIENCE_LEVELS = ["Junior", "Mid", "Senior"]
+
+# One append-only file per column, one row per scored answer
+COLUMNS = {
+    "interview": np.uint64,      # hash of the interview id
+    "completed_at": np.float64,  # unix time the interview was recorded
+    "question": np.int16,        # 1-based question number
+    "experience": np.int8,       # index into EXPERIENCE_LEVELS, -1 if unknown
+    "tech_mask": np.uint64,      # bit i set if the candidate listed tech vocabulary[i]
+    "overall": np.float32,
+    **{name: np.float32 for name in CRITERIA},
+}
+
+MAX_TECH_VOCABULARY = 64
+
+
+def interview_key(interview_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(interview_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class ScoreStore:
+    """
+    Columnar store of per-answer scores for cohort analytics.
+
+    Each column is an append-only binary file of a fixed NumPy dtype, so loading is a
+    ``np.fromfile`` per column and every query is a vectorized operation over whole
+    columns. Tech stacks are stored as a 64-bit mask over a small vocabulary file.
+    No candidate PII is stored: interviews are identified by a hash of their id.
+    """
+
+    def __init__(self, directory: str):
+        """Initialize the ScoreStore.
+
+        Args:
+            directory (str): Directory holding the column files.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._vocabulary_path = os.path.join(directory, "tech_vocabulary.json")
+        self._vocabulary = self._read_vocabulary()
+        self._cache_version = None
+        self._cache: Optional[Dict[str, np.ndarray]] = None
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _read_vocabulary(self) -> List[str]:
+        if not os.path.exists(self._vocabulary_path):
+            return []
+        with open(self._vocabulary_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    @property
+    def tech_vocabulary(self) -> List[str]:
+        return list(self._vocabulary)
+
+    def _tech_mask(self, tech_stack: Sequence[str]) -> int:
+        mask = 0
+        changed = False
+        for tech in tech_stack:
+            if tech not in self._vocabulary:
+                if len(self._vocabulary) >= MAX_TECH_VOCABULARY:
+                    logger.warning(f"Tech vocabulary full, not tracking '{tech}'")
+                    continue
+                self._vocabulary.append(tech)
+                changed = True
+            mask |= 1 << self._vocabulary.index(tech)
+        if changed:
+            tmp_path = self._vocabulary_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self._vocabulary, file)
+            os.replace(tmp_path, self._vocabulary_path)
+        return mask
+
+    def append_interview(self, interview_id: str, experience_level: str, tech_stack: Sequence[str],
+                         scores: Sequence[ParsedScore], completed_at: float = None) -> int:
+        """Append one finished interview, one row per parsed answer score.
+
+        Args:
+            interview_id (str): Unique id of the interview.
+            experience_level (str): Junior, Mid or Senior.
+            tech_stack (list): Technologies the candidate listed.
+            scores (list): Parsed score per question, in question order.
+            completed_at (float): Unix time, defaults to now.
+
+        Returns:
+            int: Number of rows written.
+        """
+        rows = [(number, score) for number, score in enumerate(scores, 1) if score.overall is not None]
+        if not rows:
+            return 0
+
+        with self._lock:
+            n = len(rows)
+            experience = EXPERIENCE_LEVELS.index(experience_level) if experience_level in EXPERIENCE_LEVELS else -1
+            values = {
+                "interview": np.full(n, interview_key(interview_id), dtype=COLUMNS["interview"]),
+                "completed_at": np.full(n, completed_at or time.time(), dtype=COLUMNS["completed_at"]),
+                "question": np.array([number for number, _ in rows], dtype=COLUMNS["question"]),
+                "experience": np.full(n, experience, dtype=COLUMNS["experience"]),
+                "tech_mask": np.full(n, self._tech_mask(tech_stack), dtype=COLUMNS["tech_mask"]),
+                "overall": np.array([score.overall for _, score in rows], dtype=COLUMNS["overall"]),
+            }
+            for name in CRITERIA:
+                values[name] = np.array([score.criteria.get(name, np.nan) for _, score in rows],
+                                        dtype=COLUMNS[name])
+
+            for name, column in values.items():
+                with open(self._column_path(name), "ab") as file:
+                    file.write(column.tobytes())
+        return n
+
+    def version(self) -> tuple:
+        """Changes whenever rows are appended; used as a cache key for queries."""
+        return tuple(
+            os.path.getsize(self._column_path(name)) if os.path.exists(self._column_path(name)) else 0
+            for name in COLUMNS
+        )
+
+    def load(self) -> Dict[str, np.ndarray]:
+        """Load all columns, reusing the previous load while nothing was appended."""
+        version = self.version()
+        with self._lock:
+            if self._cache is not None and self._cache_version == version:
+                return self._cache
+            columns = {}
+            for name, dtype in COLUMNS.items():
+                path = self._column_path(name)
+                columns[name] = np.fromfile(path, dtype=dtype) if os.path.exists(path) else np.empty(0, dtype)
+            # A crash between column writes can leave columns of different length
+            rows = min(len(column) for column in columns.values())
+            self._cache = {name: column[:rows] for name, column in columns.items()}
+            self._cache_version = version
+            self._vocabulary = self._read_vocabulary()
+            return self._cache
+
+
+def interview_means(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Collapse per-answer rows into one row per interview (mean of its answers)."""
+    if len(columns["interview"]) == 0:
+        result = {name: columns[name][:0] for name in ["overall", "experience", "tech_mask", "completed_at", *CRITERIA]}
+        result["questions"] = np.empty(0, dtype=np.int64)
+        return result
+
+    _, first_row, index = np.unique(columns["interview"], return_index=True, return_inverse=True)
+    counts = np.bincount(index)
+    result = {}
+    for name in ["overall", *CRITERIA]:
+        values = columns[name].astype(np.float64)
+        valid = ~np.isnan(values)
+        totals = np.bincount(index, weights=np.where(valid, values, 0.0))
+        valid_counts = np.bincount(index, weights=valid.astype(np.float64))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result[name] = totals / valid_counts
+    for name in ["experience", "tech_mask", "completed_at"]:
+        result[name] = columns[name][first_row]
+    result["questions"] = counts
+    return result
+
+
+def cohort_filter(per_interview: Dict[str, np.ndarray], tech_vocabulary: List[str],
+                  experience_level: str = None, tech: str = None, since: float = None) -> np.ndarray:
+    """Boolean mask of interviews matching the given cohort filters."""
+    mask = np.ones(len(per_interview["overall"]), dtype=bool)
+    if experience_level in EXPERIENCE_LEVELS:
+        mask &= per_interview["experience"] == EXPERIENCE_LEVELS.index(experience_level)
+    if tech is not None:
+        if tech not in tech_vocabulary:
+            return np.zeros_like(mask)
+        bit = np.uint64(1 << tech_vocabulary.index(tech))
+        mask &= (per_interview["tech_mask"] & bit) != 0
+    if since is not None:
+        mask &= per_interview["completed_at"] >= since
+    return mask
+
+
+def cohort_summary(per_interview: Dict[str, np.ndarray], mask: np.ndarray,
+                   percentiles: Sequence[float] = (10, 25, 50, 75, 90)) -> Dict[str, Any]:
+    """Percentiles of the overall score and per-criterion distributions for one cohort."""
+    overall = per_interview["overall"][mask]
+    overall = overall[~np.isnan(overall)]
+    summary = {"candidates": int(len(overall))}
+    if len(overall) == 0:
+        return summary
+
+    summary["mean"] = float(overall.mean())
+    summary["percentiles"] = dict(zip(percentiles, np.percentile(overall, percentiles).tolist()))
+    bins = np.linspace(0, 10, 11)
+    summary["criteria"] = {}
+    for name in CRITERIA:
+        values = per_interview[name][mask]
+        values = values[~np.isnan(values)]
+        histogram, _ = np.histogram(values, bins=bins)
+        summary["criteria"][name] = {
+            "mean": float(values.mean()) if len(values) else None,
+            "median": float(np.median(values)) if len(values) else None,
+            "histogram": histogram.tolist(),
+        }
+    return summary
+
+
+def tech_stack_comparison(per_interview: Dict[str, np.ndarray], tech_vocabulary: List[str]) -> List[Dict[str, Any]]:
+    """Candidates, mean and median overall score per technology, all technologies at once."""
+    if not tech_vocabulary or len(per_interview["overall"]) == 0:
+        return []
+    bits = np.left_shift(np.uint64(1), np.arange(len(tech_vocabulary), dtype=np.uint64))
+    # (technologies x interviews) membership matrix
+    membership = (per_interview["tech_mask"][None, :] & bits[:, None]) != 0
+    overall = per_interview["overall"]
+    membership &= ~np.isnan(overall)[None, :]
+    counts = membership.sum(axis=1)
+    totals = np.where(membership, overall[None, :], 0.0).sum(axis=1)
+    with warnings.catch_warnings():
+        # Technologies without candidates have an all-NaN row
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        medians = np.nanmedian(np.where(membership, overall[None, :], np.nan), axis=1)
+
+    rows = []
+    for i, tech in enumerate(tech_vocabulary):
+        if counts[i]:
+            rows.append({"tech": tech, "candidates": int(counts[i]),
+                         "mean": float(totals[i] / counts[i]), "median": float(medians[i])})
+    return sorted(rows, key=lambda row: row["mean"], reverse=True)
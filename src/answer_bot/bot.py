@@ -1,9 +1,9 @@
-from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from src.llm.circuit_breaker import get_circuit_breaker
+from src.llm.invoke import invoke_llm
+from src.llm.factory import build_chat_model
 import logging
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -12,16 +12,20 @@ class AnswerBot:
     This is Answer Bot generate the answer according to the questions.
     """
     
-    def __init__(self,api_key,prompt):
+    def __init__(self,api_key,prompt,coalesce=None):
         """Initialize the AnswerBot
 
         Args:
             api_key (str): ChatGroq api key
             prompt (str): System Prompt
+            coalesce (bool): Share identical in-flight requests, defaults to the stage setting
         """
         self.api_key = api_key
         self.prompt = prompt
-        self.llm = ChatGroq(api_key=api_key,model="gemma2-9b-it")
+        self.model = "gemma2-9b-it"
+        self.llm = build_chat_model(api_key=api_key, model=self.model)
+        self.breaker = get_circuit_breaker(model=self.model, stage="answer", api_key=self.api_key)
+        self.coalesce = coalesce
         self.output_parser = StrOutputParser()
         self.chat_prompt_template = ChatPromptTemplate(
             
@@ -37,16 +41,16 @@ class AnswerBot:
             Question (str): Question generated by chatbot
 
         Raises:
+            CircuitOpenError: If the answer stage is degraded and no probe is due.
             e: If any error in this code raise e
 
         Returns:
             str: Answer according to questions
         """
         try:
-            logging.info("Answer bot chain  done ")
-            chain = self.chat_prompt_template | self.llm | self.output_parser
-            answer = chain.invoke({"Question":Question})
-            logger.info(f"Successfully answer generated {answer} ")
+            answer = invoke_llm(self.chat_prompt_template, self.llm, self.output_parser,
+                                {"Question":Question}, model=self.model, stage="answer",
+                                breaker=self.breaker, coalesce=self.coalesce)
             return answer
         except Exception as e:
             raise e
\ No newline at end of file
@@ -1,12 +1,12 @@
 
-from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from src.llm.circuit_breaker import get_circuit_breaker
+from src.llm.invoke import invoke_llm
+from src.llm.factory import build_chat_model
 import logging
 
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -15,14 +15,19 @@ class Chatbot:
     A class to generate questions for users based on their technical stack, experience level, and role type.
     """
     
-    def __init__(self,api_key):
+    def __init__(self,api_key,coalesce=None):
         """ Initialize the Chatbot.
 
         Args:
             api_key (str): API key for ChatGroq
+            coalesce (bool): Share identical in-flight requests, defaults to the stage setting.
+                Pass False when every candidate must get a freshly generated question.
         """
         self.api_key = api_key
-        self.llm = ChatGroq(api_key=api_key, model="gemma2-9b-it")
+        self.model = "gemma2-9b-it"
+        self.llm = build_chat_model(api_key=api_key, model=self.model)
+        self.breaker = get_circuit_breaker(model=self.model, stage="question", api_key=self.api_key)
+        self.coalesce = coalesce
         self.output_parser = StrOutputParser()
         
 
@@ -35,6 +40,7 @@ class Chatbot:
             system_template (str): prompt for llm system to generate the questions.
 
         Raises:
+            CircuitOpenError: If the question stage is degraded and no probe is due.
             e: If any error in this code raise e
 
         Returns:
@@ -47,13 +53,11 @@ class Chatbot:
                         ("user","Answer:{Answer}")
                     ])
             
-            chain = prompt | self.llm | self.output_parser
             
-            logging.info("First Chat bot chain creation done ")
+            question = invoke_llm(prompt, self.llm, self.output_parser, {"Answer":Answer},
+                                  model=self.model, stage="question",
+                                  breaker=self.breaker, coalesce=self.coalesce)
             
-            question = chain.invoke({"Answer":Answer})
-            
-            logger.info(f"Successfully generated questions {question} ")
             
             return question
         except Exception as e:
@@ -0,0 +1,140 @@
+import re
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from src.llm.circuit_breaker import get_circuit_breaker
+from src.llm.invoke import invoke_llm
+from src.llm.factory import build_chat_model
+from src.prompts.registry import escape_prompt_template
+
+logger = logging.getLogger(__name__)
+
+
+# Sentences the separate analysis prompt produces, so fused and separate turns read the same
+CONFIDENCE_SENTENCES = {
+    "confident": "You seem very confident.",
+    "confused": "You seem a bit confused.",
+}
+
+TURN_FIELDS = ("confidence", "reference_answer", "next_question")
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+@dataclass
+class FusedTurn:
+    """Parsed fused response; a field is None when it was missing or invalid."""
+    analysis: Optional[str] = None
+    reference_answer: Optional[str] = None
+    next_question: Optional[str] = None
+    missing: List[str] = field(default_factory=list)
+
+
+def parse_turn(text: str, expect_next_question: bool = True) -> FusedTurn:
+    """Parse the fused JSON response field by field.
+
+    A malformed response or field does not fail the turn: the field is reported in
+    ``missing`` so the caller can fall back to the separate bot for just that part.
+
+    Args:
+        text (str): Raw model output, optionally wrapped in a code fence.
+        expect_next_question (bool): Whether a next question was requested.
+
+    Returns:
+        FusedTurn: Valid fields, plus the names of the missing ones.
+    """
+    data = {}
+    match = _JSON_OBJECT.search(text or "")
+    if match:
+        try:
+            parsed = json.loads(match.group(0))
+            if isinstance(parsed, dict):
+                data = parsed
+        except json.JSONDecodeError:
+            pass
+
+    turn = FusedTurn()
+    confidence = data.get("confidence")
+    if isinstance(confidence, str) and confidence.strip().lower() in CONFIDENCE_SENTENCES:
+        turn.analysis = CONFIDENCE_SENTENCES[confidence.strip().lower()]
+
+    reference_answer = data.get("reference_answer")
+    if isinstance(reference_answer, str) and reference_answer.strip():
+        turn.reference_answer = reference_answer.strip()
+
+    next_question = data.get("next_question")
+    if expect_next_question and isinstance(next_question, str) and next_question.strip():
+        turn.next_question = next_question.strip()
+
+    wanted = {"confidence": turn.analysis, "reference_answer": turn.reference_answer}
+    if expect_next_question:
+        wanted["next_question"] = turn.next_question
+    turn.missing = [name for name, value in wanted.items() if value is None]
+    return turn
+
+
+class FusedTurnBot:
+    """
+    Handles a whole interview turn in one call: the candidate's confidence, the
+    reference answer for the current question and the next question.
+
+    Replaces three round-trips, each with its own system prompt, by one request
+    with a combined prompt and a JSON response. Parts missing from the response
+    are filled by the separate bots.
+    """
+
+    def __init__(self, api_key, coalesce=None):
+        """Initialize the FusedTurnBot.
+
+        Args:
+            api_key (str): ChatGroq api key
+            coalesce (bool): Share identical in-flight requests, defaults to the stage setting
+        """
+        self.api_key = api_key
+        self.model = "gemma2-9b-it"
+        # JSON mode keeps the output parseable; the schema itself is in the prompt
+        self.llm = build_chat_model(api_key=api_key, model=self.model,
+                                    model_kwargs={"response_format": {"type": "json_object"}})
+        self.breaker = get_circuit_breaker(model=self.model, stage="turn", api_key=self.api_key)
+        self.coalesce = coalesce
+        self.output_parser = StrOutputParser()
+
+    def take_turn(self, system_template: str, question: str, answer: str,
+                  next_question_instruction: Optional[str] = None) -> FusedTurn:
+        """Run one fused interview turn.
+
+        Args:
+            system_template (str): The rendered ``prompt_turn`` prompt for this candidate.
+            question (str): The question the candidate just answered.
+            answer (str): The candidate's answer.
+            next_question_instruction (str): What to ask next, or None on the last question.
+
+        Raises:
+            CircuitOpenError: If the turn stage is degraded and no probe is due.
+            e: If any error in this code raise e
+
+        Returns:
+            FusedTurn: Parsed fields and the ones that still need the separate bots.
+        """
+        try:
+            prompt = ChatPromptTemplate.from_messages(
+                [
+                    ("system", escape_prompt_template(system_template, [])),
+                    ("user", "Current question:\n{question}\n\nCandidate answer:\n{answer}\n\n"
+                             "Instruction: {instruction}")
+                ])
+            instruction = next_question_instruction or "This was the last question; set next_question to null."
+            output = invoke_llm(prompt, self.llm, self.output_parser,
+                                {"question": question, "answer": answer, "instruction": instruction},
+                                model=self.model, stage="turn",
+                                breaker=self.breaker, coalesce=self.coalesce)
+            turn = parse_turn(output, expect_next_question=next_question_instruction is not None)
+            if turn.missing:
+                logger.warning(f"Fused turn response missing {', '.join(turn.missing)}; using separate bots")
+            return turn
+        except Exception as e:
+            raise e
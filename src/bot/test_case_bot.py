@@ -0,0 +1,91 @@
+import threading
+import logging
+from typing import Any, Dict, Optional
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from src.llm.circuit_breaker import get_circuit_breaker
+from src.llm.invoke import invoke_llm
+from src.llm.factory import build_chat_model
+from src.prompts.registry import escape_prompt_template
+from src.Optimize.code_grader import TestSuite, looks_like_coding_task, parse_test_suite
+
+logger = logging.getLogger(__name__)
+
+
+class TestCaseBot:
+    """
+    Writes hidden test cases for a coding question, once, when the question is asked.
+
+    The suite is used by the ``ExecutionGrader`` to score the candidate's code by
+    running it, instead of the LLM judge reading it.
+    """
+
+    # Not a pytest test class, despite the name
+    __test__ = False
+
+    def __init__(self, api_key, prompt, coalesce=None):
+        """Initialize the TestCaseBot.
+
+        Args:
+            api_key (str): ChatGroq api key
+            prompt (PromptSet): Prompts; ``prompt_tests`` is used
+            coalesce (bool): Share identical in-flight requests, defaults to the stage setting
+        """
+        self.api_key = api_key
+        self.model = "gemma2-9b-it"
+        # JSON mode keeps the output parseable; the schema itself is in the prompt
+        self.llm = build_chat_model(api_key=api_key, model=self.model,
+                                    model_kwargs={"response_format": {"type": "json_object"}})
+        self.breaker = get_circuit_breaker(model=self.model, stage="tests", api_key=self.api_key)
+        self.coalesce = coalesce
+        self.output_parser = StrOutputParser()
+        self.chat_prompt_template = ChatPromptTemplate.from_messages(
+            [
+                ("system", escape_prompt_template(prompt.render("prompt_tests"), [])),
+                ("user", "Question:\n{question}")
+            ])
+
+    def generate(self, question: str) -> Optional[TestSuite]:
+        """Test cases for ``question``, or None if it is not a testable coding task.
+
+        Raises:
+            CircuitOpenError: If the tests stage is degraded and no probe is due.
+            e: If any error in this code raise e
+        """
+        try:
+            output = invoke_llm(self.chat_prompt_template, self.llm, self.output_parser,
+                                {"question": question}, model=self.model, stage="tests",
+                                breaker=self.breaker, coalesce=self.coalesce)
+            suite = parse_test_suite(output)
+            logger.info(f"Generated {len(suite.tests)} hidden tests" if suite else "Question is not testable")
+            return suite
+        except Exception as e:
+            raise e
+
+
+def attach_test_suite(record: Dict[str, Any], bot: TestCaseBot, question: str) -> None:
+    """Generate the suite for ``question`` and store it on the question's message record."""
+    try:
+        suite = bot.generate(question)
+    except Exception as e:
+        # The answer is scored by the LLM judge instead
+        logger.warning(f"Could not generate hidden tests: {e}")
+        return
+    if suite is not None:
+        record["tests"] = suite.to_dict()
+
+
+def start_test_generation(record: Dict[str, Any], bot: Optional[TestCaseBot],
+                          question: str) -> Optional[threading.Thread]:
+    """Run ``attach_test_suite`` on a daemon thread for coding questions, while the candidate answers."""
+    if bot is None or not looks_like_coding_task(question):
+        return None
+    thread = threading.Thread(
+        target=attach_test_suite,
+        args=(record, bot, question),
+        name="test-generation",
+        daemon=True,
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,144 @@
+"""
+Simulation harness for adaptive interview length.
+
+Simulates candidates with a latent skill, scores their answers the way the
+scoring prompt does (five criteria on Very Bad/Bad/Good/Excellent levels) and
+compares a fixed-length interview with ``AdaptiveInterviewPolicy`` on LLM calls
+per interview and ranking quality.
+
+Calls are counted for both turn modes. Step by step, every question costs its
+generation, reference answer, analysis and scoring. With the fused turn, one call
+gives the analysis, the reference answer and the next question, plus one scoring
+call; when the adaptive policy may stop after an answer, the next question is left
+out of that turn and generated separately if the interview goes on.
+
+Usage:
+    python -m src.experiment.adaptive_simulation --candidates 20000
+"""
+import argparse
+import random
+import statistics
+from typing import Callable, Dict, List, Tuple
+
+from src.Optimize.adaptive_length import AdaptiveInterviewPolicy, CONTINUE
+from src.Optimize.score_parser import CRITERIA, LEVEL_VALUES
+
+# Question generation, reference answer, sentiment analysis and scoring
+LLM_CALLS_PER_QUESTION = 4
+# Fused turn and scoring, per answer
+FUSED_CALLS_PER_ANSWER = 2
+
+
+def simulate_answer_score(skill: float, rng: random.Random,
+                          question_sd: float = 1.2, criterion_sd: float = 1.0) -> float:
+    """Score of one answer: skill plus question difficulty noise, quantised per criterion."""
+    question_effect = rng.gauss(0, question_sd)
+    values = []
+    for _ in CRITERIA:
+        raw = skill + question_effect + rng.gauss(0, criterion_sd)
+        if raw < 2.0:
+            level = "very bad"
+        elif raw < 4.75:
+            level = "bad"
+        elif raw < 7.75:
+            level = "good"
+        else:
+            level = "excellent"
+        values.append(LEVEL_VALUES[level])
+    return sum(values) / len(values)
+
+
+def run_interview(skill: float, rng: random.Random, should_continue: Callable[[List[float]], bool],
+                  may_stop: Callable[[List[float]], bool] = lambda scores: False) -> Tuple[List[float], int]:
+    """Scores of one interview, and the questions generated outside a fused turn after the first."""
+    scores = []
+    separate_questions = 0
+    while True:
+        # Decided before the answer is scored, when the fused turn is requested
+        next_question_in_turn = not may_stop(scores)
+        scores.append(simulate_answer_score(skill, rng))
+        if not should_continue(scores):
+            return scores, separate_questions
+        if not next_question_in_turn:
+            separate_questions += 1
+
+
+def _ranks(values: List[float]) -> List[float]:
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2.0
+        i = j + 1
+    return ranks
+
+
+def spearman(a: List[float], b: List[float]) -> float:
+    ra, rb = _ranks(a), _ranks(b)
+    mean_a, mean_b = statistics.fmean(ra), statistics.fmean(rb)
+    cov = sum((x - mean_a) * (y - mean_b) for x, y in zip(ra, rb))
+    var_a = sum((x - mean_a) ** 2 for x in ra)
+    var_b = sum((y - mean_b) ** 2 for y in rb)
+    return cov / (var_a * var_b) ** 0.5
+
+
+def top_k_precision(estimates: List[float], skills: List[float], fraction: float = 0.2) -> float:
+    k = max(1, int(len(skills) * fraction))
+    top_true = set(sorted(range(len(skills)), key=skills.__getitem__, reverse=True)[:k])
+    top_est = sorted(range(len(estimates)), key=estimates.__getitem__, reverse=True)[:k]
+    return len(top_true.intersection(top_est)) / k
+
+
+def evaluate(skills: List[float], seed: int, should_continue: Callable[[List[float]], bool],
+             may_stop: Callable[[List[float]], bool] = lambda scores: False) -> Dict[str, float]:
+    rng = random.Random(seed)
+    interviews = [run_interview(skill, rng, should_continue, may_stop) for skill in skills]
+    estimates = [statistics.fmean(scores) for scores, _ in interviews]
+    questions = [len(scores) for scores, _ in interviews]
+    # The first question, then per answer the fused turn, scoring and any separate next question
+    fused_calls = [1 + FUSED_CALLS_PER_ANSWER * len(scores) + separate for scores, separate in interviews]
+    return {
+        "avg_questions": statistics.fmean(questions),
+        "avg_llm_calls": statistics.fmean(questions) * LLM_CALLS_PER_QUESTION,
+        "avg_fused_calls": statistics.fmean(fused_calls),
+        "spearman": spearman(estimates, skills),
+        "top20_precision": top_k_precision(estimates, skills),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate fixed vs adaptive interview length")
+    parser.add_argument("--candidates", type=int, default=20000)
+    parser.add_argument("--fixed-questions", type=int, default=3)
+    parser.add_argument("--min-questions", type=int, default=2)
+    parser.add_argument("--max-questions", type=int, default=4)
+    parser.add_argument("--skill-mean", type=float, default=5.5)
+    parser.add_argument("--skill-sd", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    skills = [min(10.0, max(0.0, rng.gauss(args.skill_mean, args.skill_sd))) for _ in range(args.candidates)]
+    policy = AdaptiveInterviewPolicy(min_questions=args.min_questions, max_questions=args.max_questions)
+
+    results = {
+        f"fixed-{args.fixed_questions}": evaluate(
+            skills, args.seed + 1, lambda scores: len(scores) < args.fixed_questions),
+        "adaptive": evaluate(
+            skills, args.seed + 1, lambda scores: policy.decide(scores) == CONTINUE, policy.may_stop),
+        f"fixed-{args.max_questions}": evaluate(
+            skills, args.seed + 1, lambda scores: len(scores) < args.max_questions),
+    }
+
+    print(f"{'mode':<10} {'questions':>10} {'llm_calls':>10} {'fused':>7} {'spearman':>9} {'top20':>7}")
+    for mode, metrics in results.items():
+        print(f"{mode:<10} {metrics['avg_questions']:>10.2f} {metrics['avg_llm_calls']:>10.2f} "
+              f"{metrics['avg_fused_calls']:>7.2f} {metrics['spearman']:>9.3f} {metrics['top20_precision']:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
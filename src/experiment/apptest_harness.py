@@ -0,0 +1,318 @@
+"""
+Rerun-time profiler and multi-session load test for ``main.py``.
+
+Drives full candidate journeys (form submit, start, every answer, score page)
+through Streamlit's ``AppTest`` against the offline stub LLM backend, and reports:
+
+* wall time per rerun step,
+* script runs per step by section (the full app and each fragment) from the app's
+  ``RerunTimer``; ``AppTest`` runs the whole script for every interaction, so a
+  fragment's own time is what that interaction costs on a live server,
+* peak traced memory per journey and session-state object counts/bytes, with the
+  memory of the message records against the plain dicts they replace,
+* the CPU time per rerun, which bounds what one server process can serve: reruns
+  hold the GIL except while waiting on the LLM, so a single process saturates at
+  roughly ``1000 / cpu_ms`` reruns per second,
+* throughput and latency for N concurrent sessions, to find where they saturate.
+
+``AppTest`` keeps one script runtime per process, so concurrent sessions run in
+separate worker processes rather than threads.
+
+Usage:
+    python -m src.experiment.apptest_harness --journeys 5 --concurrency 1,2,4,8 --stub-latency-ms 50
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+# Run from the repository root; main.py loads its prompts relative to it
+APP_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "main.py"))
+
+CANDIDATE = {
+    "full_name": "Load Test",
+    "email": "load.test@example.com",
+    "phone": "+1 555 0100",
+    "location": "Remote",
+    "experience_years": "3-5 years",
+    "desired_positions": ["Software Engineer"],
+    "tech_stack": ["Python"],
+    "key_technologies": ["Machine Learning"],
+}
+
+ANSWER = ("A process has its own address space; threads share their process's memory. "
+          "I would use threads for I/O-bound work and processes for CPU-bound work.")
+
+
+@dataclass
+class JourneyResult:
+    steps: List[Tuple[str, float]] = field(default_factory=list)
+    # Section durations in ms recorded during each step, e.g. {"answer_1": {"app": [...], "interview": [...]}}
+    sections: Dict[str, Dict[str, List[float]]] = field(default_factory=dict)
+    cpu: List[float] = field(default_factory=list)
+    peak_memory: int = 0
+    session_objects: int = 0
+    session_bytes: int = 0
+    messages: Dict[str, Any] = field(default_factory=dict)
+    error: str = None
+
+
+def configure_environment(stub_latency_ms: float) -> None:
+    """Select the stub LLM backend and a throwaway data directory before the app is imported."""
+    os.environ["TALENTSCOUT_LLM_BACKEND"] = "stub"
+    os.environ["TALENTSCOUT_STUB_LATENCY_MS"] = str(stub_latency_ms)
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+    os.environ.setdefault("TALENTSCOUT_DATA_DIR", tempfile.mkdtemp(prefix="talentscout-load-"))
+
+
+def deep_object_stats(root: Any) -> Tuple[int, int]:
+    """Count objects reachable from ``root`` through containers and instance attributes."""
+    seen = set()
+    stack = [root]
+    count = size = 0
+    skip = (type, type(sys), type(deep_object_stats), threading.Thread)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, skip):
+            continue
+        seen.add(id(obj))
+        count += 1
+        size += sys.getsizeof(obj, 0)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(vars(obj))
+            for slot in getattr(type(obj), "__slots__", ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return count, size
+
+
+def _session_values(app: Any) -> Dict[str, Any]:
+    state = app.session_state
+    if hasattr(state, "to_dict"):
+        return dict(state.to_dict())
+    return dict(state.filtered_state)
+
+
+@contextmanager
+def capture_reruns(samples: List[Tuple[str, float]]):
+    """Append ``(section, seconds)`` for every rerun section the app's ``RerunTimer`` records meanwhile."""
+    from src.utils.timing import RerunTimer
+
+    record = RerunTimer.record
+
+    def capture(timer, section, seconds):
+        samples.append((section, seconds))
+        record(timer, section, seconds)
+
+    RerunTimer.record = capture
+    try:
+        yield
+    finally:
+        RerunTimer.record = record
+
+
+def run_journey(answers: int = 3, timeout: float = 60.0, track_memory: bool = False) -> JourneyResult:
+    """Run one scripted candidate journey and time every rerun."""
+    from streamlit.testing.v1 import AppTest
+
+    result = JourneyResult()
+    samples: List[Tuple[str, float]] = []
+    if track_memory:
+        tracemalloc.reset_peak()
+
+    def step(name, action):
+        first = len(samples)
+        start, cpu_start = time.perf_counter(), time.process_time()
+        with capture_reruns(samples):
+            action()
+        result.steps.append((name, (time.perf_counter() - start) * 1000))
+        result.cpu.append((time.process_time() - cpu_start) * 1000)
+        sections = result.sections.setdefault(name, defaultdict(list))
+        for section, seconds in samples[first:]:
+            sections[section].append(seconds * 1000)
+        if app.exception:
+            raise RuntimeError(f"{name}: {app.exception[0].value}")
+
+    try:
+        app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        step("initial_load", app.run)
+
+        sidebar = app.sidebar
+        for widget, key in zip(sidebar.text_input, ["full_name", "email", "phone", "location"]):
+            widget.input(CANDIDATE[key])
+        sidebar.selectbox[0].select(CANDIDATE["experience_years"])
+        for widget, key in zip(sidebar.multiselect, ["desired_positions", "tech_stack", "key_technologies"]):
+            for value in CANDIDATE[key]:
+                widget.select(value)
+        step("form_submit", sidebar.button[0].click().run)
+        step("start_interview", app.button[0].click().run)
+
+        number = 0
+        while app.chat_input and number < answers * 2:
+            number += 1
+            step(f"answer_{number}", app.chat_input[0].set_value(f"{ANSWER} ({number})").run)
+
+        step("score_page", app.button[0].click().run)
+
+        from src.utils.message_records import memory_report
+
+        values = _session_values(app)
+        result.session_objects, result.session_bytes = deep_object_stats(values)
+        result.messages = memory_report(values.get("messages", []))
+    except Exception as e:
+        result.error = str(e)
+
+    if track_memory:
+        result.peak_memory = tracemalloc.get_traced_memory()[1]
+    return result
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def profile_reruns(journeys: int, answers: int) -> None:
+    """Sequential journeys: per-step rerun times, peak memory and session size."""
+    run_journey(answers)  # warm caches and imports
+    results = [run_journey(answers) for _ in range(journeys)]
+
+    # Memory is traced in separate journeys, tracemalloc slows reruns down several times
+    tracemalloc.start()
+    memory = [run_journey(answers, track_memory=True) for _ in range(max(1, journeys // 2))]
+    tracemalloc.stop()
+
+    failed = [r.error for r in results if r.error]
+    if failed:
+        print(f"{len(failed)} journeys failed, first error: {failed[0]}")
+    results = [r for r in results if not r.error]
+    if not results:
+        return
+
+    by_step = defaultdict(list)
+    for result in results:
+        for name, elapsed in result.steps:
+            by_step[name].append(elapsed)
+
+    print(f"\nPer-rerun wall time over {len(results)} journeys (ms)")
+    print(f"{'step':<16} {'mean':>8} {'p50':>8} {'p95':>8}")
+    for name, values in by_step.items():
+        print(f"{name:<16} {statistics.fmean(values):>8.1f} {_percentile(values, 0.5):>8.1f} "
+              f"{_percentile(values, 0.95):>8.1f}")
+
+    print_section_reruns(results)
+
+    cpu_ms = statistics.fmean(ms for r in results for ms in r.cpu)
+    print(f"\nCPU time per rerun: {cpu_ms:.1f} ms, one process saturates near {1000 / cpu_ms:.1f} reruns/s")
+
+    memory = [r for r in memory if not r.error]
+    if memory:
+        print(f"Peak traced memory per journey: {statistics.fmean(r.peak_memory for r in memory) / 1e6:.1f} MB")
+    print(f"Session state: {statistics.fmean(r.session_objects for r in results):.0f} objects, "
+          f"{statistics.fmean(r.session_bytes for r in results) / 1e3:.1f} kB")
+    print_messages_memory(results)
+
+
+def print_section_reruns(results: List[JourneyResult]) -> None:
+    """Script runs per step and section, with their mean time."""
+    sections = sorted({section for r in results for step in r.sections.values() for section in step},
+                      key=lambda section: (section != "app", section))
+    print(f"\nScript runs per step by section, runs x mean ms")
+    print(f"{'step':<16} " + " ".join(f"{section:>16}" for section in sections))
+    for name in results[0].sections:
+        cells = []
+        for section in sections:
+            durations = [r.sections.get(name, {}).get(section, []) for r in results]
+            runs = statistics.fmean(len(values) for values in durations)
+            flat = [ms for values in durations for ms in values]
+            cells.append(f"{runs:>5.1f} x {statistics.fmean(flat):>6.1f}" if flat else f"{'-':>14}")
+        print(f"{name:<16} " + " ".join(f"{cell:>16}" for cell in cells))
+
+
+def print_messages_memory(results: List[JourneyResult], sessions: int = 1) -> None:
+    """Message memory per session, compact records against plain dicts, and for ``sessions`` of them."""
+    reports = [r.messages for r in results if r.messages]
+    if not reports:
+        return
+    dict_bytes = statistics.fmean(report["dict_bytes"] for report in reports)
+    compact_bytes = statistics.fmean(report["compact_bytes"] for report in reports)
+    print(f"Messages per session: {dict_bytes / 1e3:.1f} kB as dicts, {compact_bytes / 1e3:.1f} kB as records "
+          f"({100 * (1 - compact_bytes / dict_bytes):.0f}% saved, "
+          f"{statistics.fmean(report['compressed'] for report in reports):.1f} compressed, "
+          f"{statistics.fmean(report['spilled'] for report in reports):.1f} spilled)")
+    if sessions > 1:
+        print(f"  for {sessions} sessions: {sessions * dict_bytes / 1e6:.2f} MB -> {sessions * compact_bytes / 1e6:.2f} MB")
+
+
+def _run_session(journeys: int, answers: int) -> List[JourneyResult]:
+    """One simulated user running journeys back to back, in a worker process."""
+    return [run_journey(answers) for _ in range(journeys)]
+
+
+def load_test(concurrency_levels: List[int], journeys_per_session: int, answers: int) -> None:
+    """Run N sessions concurrently and report where throughput stops scaling."""
+    print(f"\n{'sessions':>8} {'reruns/s':>9} {'journeys/s':>11} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    previous_throughput = None
+    saturated_at = None
+    for sessions in concurrency_levels:
+        total = sessions * journeys_per_session
+        with ProcessPoolExecutor(max_workers=sessions) as pool:
+            # Import the app in every worker before the clock starts
+            list(pool.map(_run_session, [1] * sessions, [1] * sessions))
+            start = time.perf_counter()
+            batches = list(pool.map(_run_session, [journeys_per_session] * sessions, [answers] * sessions))
+            elapsed = time.perf_counter() - start
+        results = [result for batch in batches for result in batch]
+
+        step_times = [ms for r in results if not r.error for _, ms in r.steps]
+        errors = sum(1 for r in results if r.error)
+        throughput = len(step_times) / elapsed
+        print(f"{sessions:>8} {throughput:>9.1f} {(total - errors) / elapsed:>11.2f} "
+              f"{_percentile(step_times, 0.5) if step_times else 0:>8.1f} "
+              f"{_percentile(step_times, 0.95) if step_times else 0:>8.1f} {errors:>7}")
+
+        if previous_throughput and saturated_at is None and throughput < previous_throughput * 1.1:
+            saturated_at = sessions
+        previous_throughput = throughput
+
+    if saturated_at:
+        print(f"\nThroughput stops scaling at about {saturated_at} concurrent sessions")
+    print_messages_memory(results, sessions=max(concurrency_levels))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile main.py reruns and load test with AppTest")
+    parser.add_argument("--journeys", type=int, default=5, help="Sequential journeys to profile")
+    parser.add_argument("--answers", type=int, default=3, help="Answers per journey")
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="Comma separated session counts")
+    parser.add_argument("--journeys-per-session", type=int, default=2)
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="Simulated LLM latency")
+    args = parser.parse_args()
+
+    configure_environment(args.stub_latency_ms)
+    profile_reruns(args.journeys, args.answers)
+    if args.concurrency:
+        levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+        load_test(levels, args.journeys_per_session, args.answers)
+
+
+if __name__ == "__main__":
+    # AppTest replaces ``__main__`` while it runs the app; import the real module so
+    # worker processes can unpickle ``_run_session``
+    from src.experiment.apptest_harness import main as harness_main
+    harness_main()
@@ -0,0 +1,166 @@
+"""
+Benchmark of the compressed interview archive.
+
+Generates synthetic completed interviews shaped like the app's (candidate form,
+question / analysis / reference answer / candidate answer records and score texts
+in the ``prompt_score`` format), trains a dictionary on the first ``--train``
+interviews and archives the rest, then reports:
+
+* compression ratio of the JSON documents with plain per-record zstd, with the
+  trained dictionary, and compressing the whole corpus as one stream (the upper
+  bound for a format without random access),
+* append throughput (MB/s of JSON, interviews/s),
+* random access latency of ``get`` and index lookup latency of ``find``,
+* streaming scan throughput.
+
+Usage:
+    python -m src.experiment.archive_benchmark --interviews 5000 --train 1000
+"""
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from typing import Any, Dict, List
+
+import numpy as np
+import zstandard as zstd
+
+from src.analytics.interview_archive import InterviewArchive, COMPRESSION_LEVEL
+from src.Optimize.score_parser import CRITERIA
+
+TECH = ["Python", "Django", "Flask", "FastAPI", "React", "Node.js", "Java", "Spring", "Go", "Rust",
+        "PostgreSQL", "MongoDB", "Redis", "Docker", "Kubernetes", "AWS", "TensorFlow", "PyTorch"]
+POSITIONS = ["Backend Developer", "Frontend Developer", "Full Stack Developer", "Data Scientist",
+             "ML Engineer", "DevOps Engineer"]
+TOPICS = ["caching", "concurrency", "indexing", "memory management", "dependency injection", "testing",
+          "error handling", "transactions", "rate limiting", "serialization", "authentication", "pagination"]
+LEVELS = ["Very Bad", "Bad", "Good", "Excellent"]
+WORDS = ("the a of to and in is that for it with as on be by this an are or can which when you use "
+         "data request response function class object method value query table index thread process "
+         "cache memory server client latency throughput scale error state model type list key").split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(sentence(rng, rng.randint(8, 20)) for _ in range(sentences))
+
+
+def score_text(rng: random.Random) -> str:
+    lines = [f"**Overall Performance: {rng.choice(LEVELS[1:])}**", "", "**Detailed Analysis:**"]
+    lines += [f"- {name.title()}: {rng.choice(LEVELS)} - {sentence(rng, rng.randint(6, 14))}" for name in CRITERIA]
+    lines += ["", f"**Summary:** {paragraph(rng, 2)}"]
+    return "\n".join(lines)
+
+
+def synthetic_interview(rng: random.Random, number: int, questions: int = 3) -> Dict[str, Any]:
+    """Keyword arguments of ``InterviewArchive.append`` for one completed interview."""
+    tech_stack = rng.sample(TECH, rng.randint(1, 4))
+    candidate = {
+        "full_name": f"Candidate {number}",
+        "email": f"candidate{number % 4000}@example.com",
+        "phone": f"+1 555 {rng.randint(1000000, 9999999)}",
+        "location": rng.choice(["Berlin", "Bangalore", "Toronto", "Austin", "Remote"]),
+        "experience_years": rng.randint(0, 15),
+        "desired_positions": rng.sample(POSITIONS, rng.randint(1, 2)),
+        "tech_stack": tech_stack,
+        "key_technologies": rng.sample(TECH, 2),
+    }
+    messages: List[Dict[str, Any]] = [{"role": "assistant", "content": (
+        f"Hello {candidate['full_name']}! Welcome to TalentScout. Let's begin your technical interview.\n\n"
+        f"**Question 1:** How do you approach {rng.choice(TOPICS)} in {tech_stack[0]}? {sentence(rng, 12)}"
+    )}]
+    for i in range(questions):
+        messages.append({"role": "correct_answer", "content": paragraph(rng, rng.randint(6, 14))})
+        messages.append({"role": "user", "content": paragraph(rng, rng.randint(1, 8))})
+        if i + 1 < questions:
+            messages.append({"role": "assistant", "content": (
+                f"**Analysis:** {paragraph(rng, 2)}\n\n**Next Question:** Explain {rng.choice(TOPICS)} "
+                f"in {rng.choice(tech_stack)}. {sentence(rng, 12)}"
+            )})
+    messages.append({"role": "assistant", "content": (
+        f"**Final Analysis:** {paragraph(rng, 3)}\n\n**Status:** Interview completed. Thank you!"
+    )})
+    return {
+        "interview_id": f"interview-{number}",
+        "candidate_data": candidate,
+        "messages": messages,
+        "scores": [score_text(rng) for _ in range(questions)],
+        "completed_at": 1.7e9 + number * 60,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure interview archive compression and throughput")
+    parser.add_argument("--interviews", type=int, default=5000, help="Interviews archived and measured")
+    parser.add_argument("--train", type=int, default=1000, help="Interviews the dictionary is trained on")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--level", type=int, default=COMPRESSION_LEVEL)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    training = [synthetic_interview(rng, -1 - n) for n in range(args.train)]
+    workload = [synthetic_interview(rng, n) for n in range(args.interviews)]
+
+    archive = InterviewArchive(tempfile.mkdtemp(prefix="talentscout-archive-"), level=args.level,
+                               auto_train_at=None)
+    # Training samples are the documents exactly as ``append`` writes them
+    trainer = InterviewArchive(tempfile.mkdtemp(prefix="talentscout-archive-train-"), auto_train_at=None)
+    for interview in training:
+        trainer.append(**interview)
+    samples = list(trainer.iter_raw(np.arange(len(trainer))))
+    start = time.perf_counter()
+    archive.train_dictionary(samples)
+    train_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for interview in workload:
+        archive.append(**interview)
+    append_s = time.perf_counter() - start
+
+    stats = archive.stats()
+    documents = list(archive.iter_raw(np.arange(len(archive))))
+    plain = zstd.ZstdCompressor(level=args.level)
+    plain_bytes = sum(len(plain.compress(document)) + 4 for document in documents)
+    stream_bytes = len(plain.compress(b"".join(documents)))
+    raw = stats["raw_bytes"]
+
+    rows = [rng.randrange(len(archive)) for _ in range(args.lookups)]
+    get_ms = []
+    for row in rows:
+        start = time.perf_counter()
+        archive.get(row)
+        get_ms.append((time.perf_counter() - start) * 1000)
+
+    find_ms = []
+    for row in rows[:200]:
+        email = workload[row]["candidate_data"]["email"]
+        start = time.perf_counter()
+        found = archive.find(email=email, since=1.7e9, tech=workload[row]["candidate_data"]["tech_stack"][0])
+        find_ms.append((time.perf_counter() - start) * 1000)
+        assert row in found
+
+    start = time.perf_counter()
+    scanned = sum(1 for _ in archive.scan())
+    scan_s = time.perf_counter() - start
+
+    print(f"{args.interviews} interviews, {raw / args.interviews / 1e3:.1f} kB JSON each, "
+          f"dictionary trained on {args.train} in {train_s:.2f} s")
+    print(f"{'format':<22} {'bytes/interview':>16} {'ratio':>7}")
+    for name, size in (("json", raw), ("zstd per record", plain_bytes),
+                       ("zstd + dictionary", stats["compressed_bytes"]), ("zstd whole corpus", stream_bytes)):
+        print(f"{name:<22} {size / args.interviews:>16.0f} {raw / size:>7.2f}")
+    print(f"index {stats['index_bytes'] / args.interviews:.0f} bytes/interview")
+    print(f"append  {raw / append_s / 1e6:>8.1f} MB/s  {args.interviews / append_s:>9.0f} interviews/s")
+    print(f"scan    {raw / scan_s / 1e6:>8.1f} MB/s  {scanned / scan_s:>9.0f} interviews/s")
+    print(f"get     p50 {statistics.median(get_ms):.3f} ms  p99 {sorted(get_ms)[int(len(get_ms) * 0.99)]:.3f} ms")
+    print(f"find    p50 {statistics.median(find_ms):.3f} ms (email + date + tech)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark of logging overhead per interview.
+
+Replays the log records one interview produces (every LLM call with its
+payload plus the app's progress messages) against:
+
+* ``baseline``: the previous setup, ``logging.basicConfig`` with a synchronous
+  handler and whole model outputs logged at INFO,
+* ``queued``: ``configure_logging`` with the queue handler, payload truncation
+  and per-stage sampling.
+
+Reports the time spent on the request path (the calling thread) per interview,
+the total process CPU time (which includes the listener thread) and the bytes
+written. The sink is a file; ``--sink-latency-ms`` adds a delay per write to
+emulate a blocking stderr pipe, e.g. a container log driver under backpressure.
+
+Usage:
+    python -m src.experiment.logging_benchmark --interviews 2000 --sink-latency-ms 0.2
+"""
+import os
+import time
+import random
+import logging
+import argparse
+import tempfile
+import statistics
+from typing import List, Tuple
+
+from src.utils.logging_setup import configure_logging, stop_logging
+
+QUESTIONS = 3
+
+# Typical output sizes in characters per stage
+PAYLOAD_CHARS = {"question": 300, "answer": 2500, "analysis": 150, "score": 1200}
+
+
+class SlowFile:
+    """File wrapper whose writes block for ``latency`` seconds."""
+
+    def __init__(self, file, latency: float):
+        self.file = file
+        self.latency = latency
+
+    def write(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+
+
+def interview_events(rng: random.Random) -> List[Tuple[str, str]]:
+    """(stage, payload) for every LLM call of one interview, in order."""
+    def text(stage):
+        n = int(PAYLOAD_CHARS[stage] * rng.uniform(0.5, 1.5))
+        return ("lorem ipsum dolor sit amet " * (n // 27 + 1))[:n]
+
+    events = [("question", text("question"))]
+    for _ in range(QUESTIONS):
+        events += [("answer", text("answer")), ("analysis", text("analysis")), ("question", text("question"))]
+    events += [("score", text("score")) for _ in range(QUESTIONS)]
+    return events
+
+
+def run_baseline(events, logger: logging.Logger) -> None:
+    for stage, payload in events:
+        logger.info(f"Processing {stage}")
+        logger.info(f"Successfully generated {stage} {payload} ")
+
+
+def run_queued(events, logger: logging.Logger) -> None:
+    for stage, payload in events:
+        logger.info(f"Processing {stage}")
+        logger.info("LLM call completed", extra={"stage": stage, "model": "gemma2-9b-it",
+                                                 "duration_ms": 0.0, "payload": payload})
+
+
+def measure(mode: str, interviews: int, seed: int, sink_latency: float = 0.0) -> Tuple[List[float], float, int]:
+    """Per-interview request-path times in ms, total CPU ms per interview, and bytes written."""
+    rng = random.Random(seed)
+    workload = [interview_events(rng) for _ in range(interviews)]
+    path = os.path.join(tempfile.mkdtemp(prefix="talentscout-logbench-"), f"{mode}.log")
+    root = logging.getLogger()
+    previous_handlers, previous_level = list(root.handlers), root.level
+    for handler in previous_handlers:
+        root.removeHandler(handler)
+
+    logger = logging.getLogger(f"benchmark.{mode}")
+    times = []
+    cpu_start = time.process_time()
+    with open(path, "w", encoding="utf-8") as file:
+        sink = SlowFile(file, sink_latency)
+        if mode == "baseline":
+            logging.basicConfig(level=logging.INFO, stream=sink, force=True)
+            run = run_baseline
+        else:
+            configure_logging(level="INFO", stream=sink, force=True)
+            run = run_queued
+
+        for events in workload:
+            start = time.perf_counter()
+            run(events, logger)
+            times.append((time.perf_counter() - start) * 1000)
+
+        if mode == "baseline":
+            for handler in list(root.handlers):
+                handler.flush()
+                root.removeHandler(handler)
+        else:
+            stop_logging()
+    cpu = (time.process_time() - cpu_start) * 1000 / interviews
+
+    for handler in previous_handlers:
+        root.addHandler(handler)
+    root.setLevel(previous_level)
+    return times, cpu, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure logging overhead per interview")
+    parser.add_argument("--interviews", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--sink-latency-ms", type=float, default=0.0, help="Delay per log write")
+    args = parser.parse_args()
+
+    print(f"{'mode':<10} {'mean ms':>9} {'p95 ms':>9} {'cpu ms':>8} {'kB/interview':>13}")
+    for mode in ("baseline", "queued"):
+        times, cpu, written = measure(mode, args.interviews, args.seed, args.sink_latency_ms / 1000)
+        p95 = sorted(times)[int(len(times) * 0.95)]
+        print(f"{mode:<10} {statistics.fmean(times):>9.3f} {p95:>9.3f} {cpu:>8.3f} "
+              f"{written / args.interviews / 1e3:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
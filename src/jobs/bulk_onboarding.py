@@ -0,0 +1,367 @@
+"""
+Bulk candidate onboarding for hiring drives.
+
+Reads candidate profiles from CSV or JSONL, validates them like the sidebar form,
+pre-generates every candidate's questions and reference answers with bounded
+concurrency, and writes one interview link per candidate. Opening a link
+(``?invite=<token>``) starts the interview with the profile filled in and the
+questions and reference answers already generated.
+
+Usage:
+    python -m src.jobs.bulk_onboarding candidates.csv --base-url https://interviews.example.com \
+        --concurrency 4 --out links.csv
+"""
+import os
+import csv
+import io
+import json
+import time
+import secrets
+import sqlite3
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlencode
+
+from src.utils.main_utils import (
+    validate_required_fields, interview_profile, first_question_prompt, next_question_prompt
+)
+from src.Optimize.mcq_grader import split_answer_key
+
+logger = logging.getLogger(__name__)
+
+
+CANDIDATE_FIELDS = ("full_name", "email", "phone", "location", "experience_years",
+                    "desired_positions", "tech_stack", "key_technologies")
+LIST_FIELDS = ("desired_positions", "tech_stack", "key_technologies")
+
+READY = "ready"
+PARTIAL = "partial"
+FAILED = "failed"
+INVALID = "invalid"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS invites (
+    token TEXT PRIMARY KEY,
+    candidate TEXT NOT NULL,
+    prompt_version TEXT,
+    questions TEXT NOT NULL,
+    answers TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    consumed_at REAL
+);
+"""
+
+
+def _migrate(db: sqlite3.Connection) -> None:
+    """Add columns missing from invite stores created by earlier versions."""
+    columns = {row[1] for row in db.execute("PRAGMA table_info(invites)")}
+    if "consumed_at" not in columns:
+        try:
+            db.execute("ALTER TABLE invites ADD COLUMN consumed_at REAL")
+        except sqlite3.OperationalError:
+            # Added by another process in the meantime
+            pass
+
+
+def _split_list(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    separator = ";" if ";" in str(value or "") else "|"
+    return [item.strip() for item in str(value or "").split(separator) if item.strip()]
+
+
+def normalize_candidate(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Candidate data in the shape the sidebar form produces.
+
+    List fields may be JSON lists or strings separated by ``;`` or ``|``.
+    """
+    candidate = {name: str(row.get(name) or "").strip() for name in CANDIDATE_FIELDS if name not in LIST_FIELDS}
+    for name in LIST_FIELDS:
+        candidate[name] = _split_list(row.get(name))
+    return candidate
+
+
+def read_candidates(text: str, file_name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Parse a ``.csv`` (header row with the form's field names) or ``.jsonl`` upload.
+
+    Raises:
+        ValueError: If the upload has more than ``limit`` candidates.
+    """
+    if file_name.lower().endswith((".jsonl", ".ndjson")):
+        rows = (json.loads(line) for line in text.splitlines() if line.strip())
+    else:
+        rows = csv.DictReader(io.StringIO(text))
+    candidates = []
+    for row in rows:
+        if limit is not None and len(candidates) >= limit:
+            raise ValueError(f"At most {limit} candidates can be onboarded per upload")
+        candidates.append(normalize_candidate(row))
+    return candidates
+
+
+def load_candidates(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8-sig") as file:
+        return read_candidates(file.read(), path)
+
+
+class InviteStore:
+    """
+    Pre-generated interviews, keyed by the token in the candidate's link.
+
+    Questions and reference answers are stored as JSON lists, indexed by question
+    number minus one; a missing entry is generated live during the interview.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the InviteStore.
+
+        Args:
+            path (str): SQLite file, created if missing.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        _migrate(self._db)
+
+    def save(self, token: str, candidate: Dict[str, Any], prompt_version: Optional[str],
+             questions: List[Optional[str]], answers: List[Optional[str]], status: str,
+             error: Optional[str] = None) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO invites (token, candidate, prompt_version, questions, answers, status, "
+                "error, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (token, json.dumps(candidate), prompt_version, json.dumps(questions), json.dumps(answers),
+                 status, error, time.time())
+            )
+
+    def load(self, token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT candidate, prompt_version, questions, answers, status FROM invites WHERE token = ?", (token,)
+            ).fetchone()
+        if row is None:
+            return None
+        candidate, prompt_version, questions, answers, status = row
+        return {"candidate": json.loads(candidate), "prompt_version": prompt_version,
+                "questions": json.loads(questions), "answers": json.loads(answers), "status": status}
+
+    def consume(self, token: str) -> Optional[Dict[str, Any]]:
+        """Load an invite and mark it used; None if it does not exist or was already opened.
+
+        A link starts one interview: reopening it, or a second candidate using a shared
+        link, gets the form instead.
+        """
+        with self._lock:
+            consumed = self._db.execute(
+                "UPDATE invites SET consumed_at = ? WHERE token = ? AND consumed_at IS NULL", (time.time(), token)
+            ).rowcount
+        return self.load(token) if consumed else None
+
+
+@dataclass
+class InviteResult:
+    """Outcome for one input row."""
+    row: int
+    candidate: Dict[str, Any]
+    status: str
+    token: Optional[str] = None
+    link: Optional[str] = None
+    errors: List[str] = field(default_factory=list)
+
+    def to_row(self) -> Dict[str, Any]:
+        return {"row": self.row, "full_name": self.candidate.get("full_name"), "email": self.candidate.get("email"),
+                "status": self.status, "link": self.link or "", "errors": "; ".join(self.errors)}
+
+
+def invite_link(base_url: str, token: str) -> str:
+    return f"{base_url.rstrip('/')}/?{urlencode({'invite': token})}"
+
+
+class BatchPregenerator:
+    """
+    Generates the questions and reference answers of many interviews ahead of time.
+
+    Candidates are processed by at most ``concurrency`` threads; each one runs the
+    same prompts as a live interview, one question and its reference answer at a
+    time, on a key of the ``KeyPool`` chosen per invite. A question or answer that
+    fails is left out and generated live instead, so one provider error does not
+    void the invite.
+    """
+
+    def __init__(self, store: InviteStore, prompts: Any, questions: int = 3, concurrency: int = 4,
+                 model_factory: Optional[Callable[[str], Dict[str, Any]]] = None):
+        """Initialize the BatchPregenerator.
+
+        Args:
+            store (InviteStore): Where the generated interviews are saved.
+            prompts (PromptSet): Current prompt version; ``prompt_bot`` and ``answer_bot`` are used.
+            questions (int): Questions per interview.
+            concurrency (int): Candidates generated at the same time.
+            model_factory: Returns ``{"model": Chatbot, "answer_bot": AnswerBot}`` for an API key.
+        """
+        self.store = store
+        self.prompts = prompts
+        self.questions = questions
+        self.concurrency = max(1, concurrency)
+        self.model_factory = model_factory or self._build_models
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._models_lock = threading.Lock()
+
+    def _build_models(self, api_key: str) -> Dict[str, Any]:
+        from src.bot.chat_bot import Chatbot
+        from src.answer_bot.bot import AnswerBot
+
+        # Every candidate gets freshly generated questions, even with identical profiles
+        return {"model": Chatbot(api_key=api_key, coalesce=False),
+                "answer_bot": AnswerBot(api_key=api_key, prompt=self.prompts["answer_bot"])}
+
+    def _models_for(self, session_id: str) -> Dict[str, Any]:
+        from src.llm.key_pool import get_key_pool
+
+        pool = get_key_pool()
+        if pool is None:
+            raise RuntimeError("No GROQ API key configured")
+        api_key = pool.choose(session_id)
+        with self._models_lock:
+            if api_key not in self._models:
+                self._models[api_key] = self.model_factory(api_key)
+            return self._models[api_key]
+
+    def generate(self, candidate: Dict[str, Any], token: str) -> InviteResult:
+        """Generate and store one candidate's interview."""
+        models = self._models_for(f"invite-{token}")
+        system_template = self.prompts.render("prompt_bot", **interview_profile(candidate))
+        questions: List[Optional[str]] = []
+        answers: List[Optional[str]] = []
+        errors = []
+        for number in range(1, self.questions + 1):
+            instruction = (first_question_prompt(self.questions) if number == 1
+                           else next_question_prompt(number, self.questions))
+            try:
+                question = models["model"].get_question(system_template=system_template, Answer=instruction)
+            except Exception as e:
+                question = None
+                errors.append(f"question {number}: {e}")
+            answer = None
+            # An MCQ's reference answer is its keyed option
+            mcq = split_answer_key(question)[1] if question else None
+            if mcq is not None:
+                answer = mcq.reference_answer()
+            elif question:
+                try:
+                    answer = models["answer_bot"].answer(Question=question) or None
+                except Exception as e:
+                    errors.append(f"answer {number}: {e}")
+            questions.append(question or None)
+            answers.append(answer)
+
+        generated = sum(1 for item in questions + answers if item)
+        status = READY if generated == 2 * self.questions else PARTIAL if generated else FAILED
+        self.store.save(token, candidate, self.prompts.version, questions, answers, status,
+                        "; ".join(errors) or None)
+        return InviteResult(row=0, candidate=candidate, status=status, token=token, errors=errors)
+
+    def run(self, candidates: Iterable[Dict[str, Any]], base_url: str,
+            progress: Optional[Callable[[int, int], None]] = None) -> List[InviteResult]:
+        """Validate every candidate and pre-generate the valid ones.
+
+        Args:
+            candidates: Normalized candidate rows, see ``normalize_candidate``.
+            base_url (str): URL of the interview app the links point to.
+            progress: Called with ``(done, total)`` after each candidate.
+
+        Returns:
+            list: One ``InviteResult`` per input row, in input order.
+        """
+        results: List[InviteResult] = []
+        pending = []
+        for row, candidate in enumerate(candidates, 1):
+            is_valid, error_message = validate_required_fields(candidate)
+            if is_valid:
+                pending.append((row, candidate))
+            else:
+                results.append(InviteResult(row=row, candidate=candidate, status=INVALID, errors=[error_message]))
+
+        total = len(results) + len(pending)
+        done = len(results)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="pregenerate") as executor:
+            futures = {executor.submit(self.generate, candidate, secrets.token_urlsafe(16)): (row, candidate)
+                       for row, candidate in pending}
+            for future in as_completed(futures):
+                row, candidate = futures[future]
+                try:
+                    result = future.result()
+                    result.row = row
+                except Exception as e:
+                    logger.error(f"Pre-generation for row {row} failed: {e}")
+                    result = InviteResult(row=row, candidate=candidate, status=FAILED, errors=[str(e)])
+                if result.token and result.status != FAILED:
+                    result.link = invite_link(base_url, result.token)
+                results.append(result)
+                done += 1
+                if progress is not None:
+                    progress(done, total)
+
+        results.sort(key=lambda result: result.row)
+        counts = {status: sum(1 for result in results if result.status == status)
+                  for status in (READY, PARTIAL, FAILED, INVALID)}
+        logger.info(f"Pre-generated {total} invites: {counts}")
+        return results
+
+
+def write_links(results: List[InviteResult], path: Optional[str] = None) -> str:
+    """The per-candidate links as CSV text, also written to ``path`` if given."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["row", "full_name", "email", "status", "link", "errors"])
+    writer.writeheader()
+    for result in results:
+        writer.writerow(result.to_row())
+    if path:
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            file.write(buffer.getvalue())
+    return buffer.getvalue()
+
+
+def default_invite_store_path() -> str:
+    return os.path.join(os.getenv("TALENTSCOUT_DATA_DIR", "data"), "invites.sqlite3")
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from src.prompts.registry import PromptRegistry
+    from src.utils.logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Pre-generate interviews for a CSV or JSONL of candidates")
+    parser.add_argument("candidates", help="CSV with a header row, or JSONL, with the candidate form fields")
+    parser.add_argument("--base-url", default="http://localhost:8501", help="URL of the interview app")
+    parser.add_argument("--questions", type=int, default=3, help="Questions per interview")
+    parser.add_argument("--concurrency", type=int, default=4, help="Candidates generated at the same time")
+    parser.add_argument("--out", default="interview_links.csv", help="CSV of per-candidate links")
+    parser.add_argument("--prompts", default="src/prompts/prompt.yaml")
+    args = parser.parse_args()
+
+    load_dotenv()
+    configure_logging()
+    pregenerator = BatchPregenerator(
+        InviteStore(default_invite_store_path()),
+        PromptRegistry(file_path=args.prompts).current(),
+        questions=args.questions,
+        concurrency=args.concurrency
+    )
+    batch_results = pregenerator.run(
+        load_candidates(args.candidates), args.base_url,
+        progress=lambda done, total: print(f"{done}/{total}", end="\r", flush=True)
+    )
+    write_links(batch_results, args.out)
+    print(f"\nWrote {len(batch_results)} rows to {args.out}")
@@ -0,0 +1,371 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import atexit
+import logging
+import subprocess
+import sys
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+MAX_ATTEMPTS = 2
+
+# A running job not finished after this long is taken over by another worker
+STALL_SECONDS = 120
+
+# Snapshots and jobs are deleted this long after their last update
+RETENTION_SECONDS = 24 * 3600
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS score_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    interview_id TEXT NOT NULL,
+    question_index INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    correct_answer TEXT NOT NULL,
+    user_answer TEXT NOT NULL,
+    tests TEXT,
+    status TEXT NOT NULL,
+    result TEXT,
+    prompt_version TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (interview_id, question_index)
+);
+CREATE INDEX IF NOT EXISTS score_jobs_status ON score_jobs (status);
+CREATE TABLE IF NOT EXISTS interview_snapshots (
+    interview_id TEXT PRIMARY KEY,
+    resume_token TEXT,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA busy_timeout=30000")
+    return connection
+
+
+def _migrate(db: sqlite3.Connection) -> None:
+    """Add columns missing from job stores created by earlier versions."""
+    columns = {row[1] for row in db.execute("PRAGMA table_info(score_jobs)")}
+    for column in ("tests", "prompt_version"):
+        if column not in columns:
+            try:
+                db.execute(f"ALTER TABLE score_jobs ADD COLUMN {column} TEXT")
+            except sqlite3.OperationalError:
+                # Added by another process in the meantime
+                pass
+    columns = {row[1] for row in db.execute("PRAGMA table_info(interview_snapshots)")}
+    if "resume_token" not in columns:
+        try:
+            db.execute("ALTER TABLE interview_snapshots ADD COLUMN resume_token TEXT")
+        except sqlite3.OperationalError:
+            pass
+    db.execute("CREATE UNIQUE INDEX IF NOT EXISTS interview_snapshots_token ON interview_snapshots (resume_token)")
+
+
+class ScoreJobStore:
+    """
+    SQLite-backed scoring jobs and interview snapshots.
+
+    One row per (interview, question) holds the inputs and, once scored, the
+    result, so finished scores outlive the Streamlit session. Snapshots hold the
+    interview's session state, so a reloaded page can pick the interview up again;
+    they are found by a secret resume token, not by the interview id. Both are
+    deleted ``retention`` seconds after their last update.
+    """
+
+    def __init__(self, path: str, retention: float = RETENTION_SECONDS):
+        """Initialize the ScoreJobStore.
+
+        Args:
+            path (str): SQLite file, created if missing.
+            retention (float): Seconds snapshots and jobs are kept after their last update.
+        """
+        self.path = path
+        self.retention = retention
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = _connect(path)
+        self._db.executescript(_SCHEMA)
+        _migrate(self._db)
+        self._purged_at = 0.0
+        self.purge_expired()
+
+    def add(self, interview_id: str, question_index: int, question: str,
+            correct_answer: str, user_answer: str, tests: Optional[Dict[str, Any]] = None) -> int:
+        """Store a pending job, replacing an earlier one for the same question."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO score_jobs (interview_id, question_index, question, correct_answer, user_answer, "
+                "tests, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (interview_id, question_index) DO UPDATE SET question = excluded.question, "
+                "correct_answer = excluded.correct_answer, user_answer = excluded.user_answer, "
+                "tests = excluded.tests, status = excluded.status, result = NULL, error = NULL, attempts = 0, "
+                "updated_at = excluded.updated_at",
+                (interview_id, question_index, question, correct_answer, user_answer,
+                 json.dumps(tests) if tests else None, PENDING, now, now)
+            )
+            return self._db.execute(
+                "SELECT id FROM score_jobs WHERE interview_id = ? AND question_index = ?",
+                (interview_id, question_index)
+            ).fetchone()[0]
+
+    def statuses(self, interview_id: str) -> Dict[int, Dict[str, Any]]:
+        """Status and result per 0-based question index of one interview."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT question_index, status, result, error, updated_at FROM score_jobs WHERE interview_id = ?",
+                (interview_id,)
+            ).fetchall()
+        # Jobs untouched for this long have no live worker; the caller scores them itself
+        stalled_before = time.time() - STALL_SECONDS
+        return {index: {"status": status, "result": result, "error": error,
+                        "stalled": status in (PENDING, RUNNING) and updated_at < stalled_before}
+                for index, status, result, error, updated_at in rows}
+
+    def complete(self, interview_id: str, question_index: int, result: str,
+                 prompt_version: Optional[str] = None) -> None:
+        """Store a score produced outside the workers, e.g. by the score page for a failed job."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE score_jobs SET status = ?, result = ?, prompt_version = ?, error = NULL, updated_at = ? "
+                "WHERE interview_id = ? AND question_index = ? AND status != ?",
+                (DONE, result, prompt_version, time.time(), interview_id, question_index, DONE)
+            )
+
+    def save_snapshot(self, interview_id: str, resume_token: str, state: Dict[str, Any]) -> None:
+        """Store the interview's session state under its resume token."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO interview_snapshots (interview_id, resume_token, state, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (interview_id, resume_token, json.dumps(state, default=str), time.time())
+            )
+        # At most once a minute, so saving stays cheap
+        if time.time() - self._purged_at > 60:
+            self.purge_expired()
+
+    def update_snapshot(self, resume_token: str, update: Callable[[Dict[str, Any]], None]) -> bool:
+        """Change the state saved under ``resume_token`` in place; False when unknown or expired.
+
+        Lets a background thread add results to an interview without its session.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT state FROM interview_snapshots WHERE resume_token = ? AND updated_at >= ?",
+                (resume_token, time.time() - self.retention)
+            ).fetchone()
+            if row is None:
+                return False
+            state = json.loads(row[0])
+            update(state)
+            self._db.execute(
+                "UPDATE interview_snapshots SET state = ?, updated_at = ? WHERE resume_token = ?",
+                (json.dumps(state, default=str), time.time(), resume_token)
+            )
+        return True
+
+    def load_snapshot(self, resume_token: str) -> Optional[Dict[str, Any]]:
+        """Session state saved under ``resume_token``, or None when unknown or expired."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT state FROM interview_snapshots WHERE resume_token = ? AND updated_at >= ?",
+                (resume_token, time.time() - self.retention)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def purge_expired(self) -> int:
+        """Delete snapshots and jobs past the retention period; returns the rows deleted."""
+        now = time.time()
+        cutoff = now - self.retention
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM interview_snapshots WHERE updated_at < ?", (cutoff,)).rowcount
+            deleted += self._db.execute("DELETE FROM score_jobs WHERE updated_at < ?", (cutoff,)).rowcount
+            self._purged_at = now
+        if deleted:
+            logger.info(f"Deleted {deleted} expired interview snapshot(s) and scoring job(s)")
+        return deleted
+
+
+# --- Worker process side ---
+
+def claim_next(db: sqlite3.Connection) -> Optional[tuple]:
+    """Atomically take the oldest pending job, or one whose worker went away.
+
+    Returns:
+        tuple: ``(job_id, question, correct_answer, user_answer, tests)``, or None when idle.
+    """
+    now = time.time()
+    return db.execute(
+        "UPDATE score_jobs SET status = ?, attempts = attempts + 1, updated_at = ? "
+        "WHERE id = (SELECT id FROM score_jobs WHERE attempts < ? AND "
+        "(status = ? OR (status = ? AND updated_at < ?)) ORDER BY id LIMIT 1) "
+        "RETURNING id, question, correct_answer, user_answer, tests",
+        (RUNNING, now, MAX_ATTEMPTS, PENDING, RUNNING, now - STALL_SECONDS)
+    ).fetchone()
+
+
+def run_worker(db_path: str, prompt_path: str, pre_score: bool = True, code_grader: bool = True,
+               parent_pid: Optional[int] = None, poll_interval: float = 0.2) -> None:
+    """Score jobs from the store until the parent process exits.
+
+    Args:
+        db_path (str): SQLite file of the ``ScoreJobStore``.
+        prompt_path (str): Prompt YAML file to load ``prompt_score`` from; it is resolved
+            again for every job, so an edited file is used without restarting the worker.
+        pre_score (bool): Settle clear-cut answers with the local pre-scorer.
+        code_grader (bool): Grade coding answers with hidden tests by running them.
+        parent_pid (int): Stop once this process is gone; None runs until killed.
+        poll_interval (float): Seconds between polls while the queue is empty.
+    """
+    from src.llm.key_pool import get_key_pool
+    from src.prompts.registry import PromptRegistry
+    from src.Optimize.scroe_optimizer import ScoreOptimizer
+    from src.Optimize.pre_scorer import LocalPreScorer
+    from src.Optimize.code_grader import ExecutionGrader
+    from src.Optimize.sandbox import get_sandbox_pool
+
+    pool = get_key_pool()
+    if pool is None:
+        raise RuntimeError("No GROQ API key configured for the scoring worker")
+    # Each worker sticks to its own key of the pool
+    api_key = pool.choose(f"score-worker-{os.getpid()}")
+    registry = PromptRegistry(file_path=prompt_path)
+    pre_scorer = LocalPreScorer() if pre_score else None
+    sandbox_pool = get_sandbox_pool() if code_grader else None
+    execution_grader = ExecutionGrader(sandbox_pool) if sandbox_pool is not None else None
+    optimizer = None
+    db = _connect(db_path)
+    db.executescript(_SCHEMA)
+    _migrate(db)
+    logger.info(f"Scoring worker {os.getpid()} started")
+
+    while parent_pid is None or os.getppid() == parent_pid:
+        job = claim_next(db)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        job_id, question, correct_answer, user_answer, tests = job
+        try:
+            # The optimizer is rebuilt only when the registry serves a new prompt version
+            prompts = registry.current()
+            if optimizer is None or optimizer.prompt is not prompts:
+                optimizer = ScoreOptimizer(api_key=api_key, prompt=prompts, pre_scorer=pre_scorer,
+                                           execution_grader=execution_grader)
+            result = optimizer.score_answer(question, correct_answer, user_answer,
+                                            tests=json.loads(tests) if tests else None)
+            db.execute("UPDATE score_jobs SET status = ?, result = ?, prompt_version = ?, error = NULL, "
+                       "updated_at = ? WHERE id = ?",
+                       (DONE, result, prompts.version, time.time(), job_id))
+        except Exception as e:
+            attempts = db.execute("SELECT attempts FROM score_jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            status = FAILED if attempts >= MAX_ATTEMPTS else PENDING
+            logger.error(f"Scoring job {job_id} failed (attempt {attempts}): {e}")
+            db.execute("UPDATE score_jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                       (status, str(e), time.time(), job_id))
+    db.close()
+    if sandbox_pool is not None:
+        sandbox_pool.close()
+
+
+class ScoreJobQueue:
+    """
+    Scores answers in a pool of worker processes as soon as they are submitted.
+
+    Jobs live in a ``ScoreJobStore``, which is also the queue: workers are
+    separate Python processes (``python -m src.jobs.score_jobs``) that claim
+    pending rows, so they share no state with the Streamlit server and pick up
+    jobs left behind by a previous server process. A failed attempt is retried
+    once before the job is marked failed, in which case the score page scores the
+    answer itself.
+    """
+
+    def __init__(self, db_path: str, prompt_path: str, workers: int = 2, pre_score: bool = True,
+                 code_grader: bool = True, retention: float = RETENTION_SECONDS):
+        """Initialize the ScoreJobQueue and start its workers.
+
+        Args:
+            db_path (str): SQLite file for jobs and snapshots.
+            prompt_path (str): Prompt YAML file the workers load ``prompt_score`` from.
+            workers (int): Worker processes; 0 when workers are run separately.
+            pre_score (bool): Let workers settle clear-cut answers with the local pre-scorer.
+            code_grader (bool): Let workers grade coding answers by running their hidden tests.
+            retention (float): Seconds snapshots and jobs are kept after their last update.
+        """
+        self.store = ScoreJobStore(db_path, retention=retention)
+        self.db_path = db_path
+        self.prompt_path = prompt_path
+        self.pre_score = pre_score
+        self.code_grader = code_grader
+        self._workers: list = [None] * workers
+        self._lock = threading.Lock()
+        self.ensure_workers()
+        atexit.register(self.shutdown)
+
+    def ensure_workers(self) -> None:
+        """Start the worker processes that are not running, e.g. after a crash."""
+        with self._lock:
+            for i, process in enumerate(self._workers):
+                if process is not None and process.poll() is None:
+                    continue
+                if process is not None:
+                    logger.warning(f"Scoring worker {process.pid} exited with {process.returncode}; restarting")
+                # Separate interpreters rather than forked children: the server
+                # process runs threads, and Streamlit replaces its __main__ module
+                command = [sys.executable, "-m", "src.jobs.score_jobs", "--db", self.db_path,
+                           "--prompts", self.prompt_path, "--parent-pid", str(os.getpid())]
+                if not self.pre_score:
+                    command.append("--no-pre-score")
+                if not self.code_grader:
+                    command.append("--no-code-grader")
+                self._workers[i] = subprocess.Popen(command, cwd=_PROJECT_ROOT)
+
+    def submit(self, interview_id: str, question_index: int, question: str,
+               correct_answer: str, user_answer: str, tests: Optional[Dict[str, Any]] = None) -> int:
+        """Queue one answer for scoring and return the job id."""
+        self.ensure_workers()
+        return self.store.add(interview_id, question_index, question, correct_answer, user_answer, tests)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for process in self._workers:
+                if process is not None and process.poll() is None:
+                    process.terminate()
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.utils.logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Score queued interview answers")
+    parser.add_argument("--db", default=os.path.join(os.getenv("TALENTSCOUT_DATA_DIR", "data"), "score_jobs.sqlite3"))
+    parser.add_argument("--prompts", default="src/prompts/prompt.yaml")
+    parser.add_argument("--parent-pid", type=int, default=None)
+    parser.add_argument("--no-pre-score", action="store_true")
+    parser.add_argument("--no-code-grader", action="store_true")
+    args = parser.parse_args()
+
+    configure_logging()
+    run_worker(args.db, args.prompts, pre_score=not args.no_pre_score, code_grader=not args.no_code_grader,
+               parent_pid=args.parent_pid)
@@ -0,0 +1,174 @@
+import threading
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the circuit for its stage is open."""
+
+    def __init__(self, model: str, stage: str, retry_in: float, key_id: Optional[str] = None):
+        super().__init__(
+            f"Circuit open for {stage} ({model}{f', {key_id}' if key_id else ''}); "
+            f"retry in {max(retry_in, 0.0):.0f}s"
+        )
+        self.model = model
+        self.stage = stage
+        self.key_id = key_id
+        self.retry_in = retry_in
+
+
+@dataclass(frozen=True)
+class DegradedResult:
+    """
+    Typed placeholder returned instead of a real LLM output when a stage is degraded.
+
+    Callers store it (or its ``to_message_fields``) in the transcript so that later
+    stages, such as scoring, can tell a placeholder apart from a real answer.
+    """
+
+    stage: str
+    reason: str
+    content: str = "Temporarily unavailable"
+    created_at: float = field(default_factory=time.time)
+
+    def __str__(self) -> str:
+        return self.content
+
+    def to_message_fields(self) -> Dict[str, Any]:
+        """Fields merged into a ``st.session_state.messages`` entry."""
+        return {"content": self.content, "degraded": True, "degraded_stage": self.stage,
+                "degraded_reason": self.reason}
+
+
+class CircuitBreaker:
+    """
+    A thread-safe circuit breaker shared by every session calling one model for one stage
+    with one API key, so a rate-limited key does not cut the other keys off.
+
+    Closed: calls go through and consecutive failures are counted.
+    Open: calls fail fast with ``CircuitOpenError`` until ``reset_timeout`` has passed.
+    Half-open: a single probe call is let through; success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, model: str, stage: str, failure_threshold: int = 3,
+                 reset_timeout: float = 30.0, key_id: Optional[str] = None):
+        """Initialize the CircuitBreaker.
+
+        Args:
+            model (str): Model name the breaker guards.
+            stage (str): Pipeline stage, e.g. ``question`` or ``score``.
+            failure_threshold (int): Consecutive failures before the circuit opens.
+            reset_timeout (float): Seconds to stay open before a half-open probe.
+            key_id (str): Name of the API key the breaker guards, see ``key_id``.
+        """
+        self.model = model
+        self.stage = stage
+        self.key_id = key_id
+        self._label = f"{stage} ({model}{f', {key_id}' if key_id else ''})"
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._closed_event = threading.Event()
+        self._closed_event.set()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def _before_call(self) -> None:
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            elapsed = time.monotonic() - self._opened_at
+            if self._state == OPEN and elapsed >= self.reset_timeout:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                logger.info(f"Circuit half-open for {self._label}; probing")
+                return
+            raise CircuitOpenError(self.model, self.stage, self.reset_timeout - elapsed, self.key_id)
+
+    def _on_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit closed for {self._label}")
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+            self._closed_event.set()
+
+    def _on_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(f"Circuit opened for {self._label} "
+                                   f"after {self._failures} failures")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._closed_event.clear()
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` through the breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit is open and no probe is due.
+        """
+        self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._on_failure()
+            raise
+        self._on_success()
+        return result
+
+    def wait_until_closed(self, timeout: float = None) -> bool:
+        """Block until the circuit is closed again. Returns False on timeout."""
+        return self._closed_event.wait(timeout)
+
+
+_breakers: Dict[Tuple[str, str, Optional[str]], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def key_id(api_key: Optional[str]) -> Optional[str]:
+    """The key's name in the key pool, or a short digest of a key outside it; never the key itself."""
+    if not api_key:
+        return None
+    from src.llm.key_pool import get_key_pool
+
+    pool = get_key_pool()
+    if pool is not None and api_key in pool:
+        return pool.name_of(api_key)
+    return "key-" + hashlib.sha256(api_key.encode()).hexdigest()[:8]
+
+
+def get_circuit_breaker(model: str, stage: str, api_key: Optional[str] = None) -> CircuitBreaker:
+    """Return the process-wide breaker for ``(model, stage, api_key)``, creating it on first use."""
+    key = (model, stage, key_id(api_key))
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(model=model, stage=stage, key_id=key[2])
+            _breakers[key] = breaker
+        return breaker
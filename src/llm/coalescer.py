@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Stages listed here are not coalesced, e.g. "question" when every candidate
+# must get their own freshly generated question. Comma separated.
+COALESCE_OPT_OUT_ENV = "LLM_COALESCE_OPT_OUT"
+
+
+def make_request_key(model: str, params: Dict[str, Any], messages: Iterable[Tuple[str, str]]) -> str:
+    """Hash the model, call parameters and fully rendered messages of a request."""
+    payload = json.dumps(
+        {"model": model, "params": params, "messages": list(messages)},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_coalescing_enabled(stage: str) -> bool:
+    opt_out = os.getenv(COALESCE_OPT_OUT_ENV, "")
+    return stage not in {name.strip() for name in opt_out.split(",") if name.strip()}
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "finished_at")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = 0.0
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls into one upstream request.
+
+    The first caller for a key runs the function; callers arriving while it is in
+    flight wait for it and receive the same result (or exception). With
+    ``linger`` > 0 a finished result is also handed to identical calls arriving
+    shortly after, which absorbs double-submitted inputs.
+    """
+
+    def __init__(self, linger: float = 0.0):
+        """Initialize the SingleFlight.
+
+        Args:
+            linger (float): Seconds a finished result keeps being shared.
+        """
+        self.linger = linger
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.shared_calls = 0
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, call in self._calls.items()
+                   if call.done.is_set() and now - call.finished_at > self.linger]
+        for key in expired:
+            del self._calls[key]
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.done.is_set() and \
+                    time.monotonic() - call.finished_at > self.linger:
+                del self._calls[key]
+                call = None
+            leader = call is None
+            if leader:
+                self._purge_expired()
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.shared_calls += 1
+
+        if not leader:
+            logger.debug(f"Coalesced identical request {key[:12]}")
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+            finally:
+                call.finished_at = time.monotonic()
+                call.done.set()
+                with self._lock:
+                    # Failures are never shared with later callers
+                    if self.linger <= 0 or call.error is not None:
+                        self._calls.pop(key, None)
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+_single_flights: Dict[str, SingleFlight] = {}
+_single_flights_lock = threading.Lock()
+
+
+def get_single_flight(stage: str, linger: float = 2.0) -> SingleFlight:
+    """Return the process-wide coalescer for ``stage``, creating it on first use."""
+    with _single_flights_lock:
+        single_flight = _single_flights.get(stage)
+        if single_flight is None:
+            single_flight = SingleFlight(linger=linger)
+            _single_flights[stage] = single_flight
+        return single_flight
@@ -0,0 +1,165 @@
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from src.llm.circuit_breaker import OPEN
+
+logger = logging.getLogger(__name__)
+
+
+def apply_refilled_answer(messages: List[Dict[str, Any]], question_number: int, answer: str) -> bool:
+    """Replace the degraded reference answer of ``question_number``; False if there is none."""
+    for record in messages:
+        if (record['role'] == "correct_answer" and record.get("degraded")
+                and record.get("question_number") == question_number):
+            record["content"] = answer
+            for key in ("degraded", "degraded_stage", "degraded_reason"):
+                record.pop(key, None)
+            return True
+    return False
+
+
+class DeferredWork:
+    """
+    Answers and scores one interview could not get while a circuit was open.
+
+    Each item is one answered question whose reference answer, score or both are
+    missing. A daemon thread works through them once the answer and score circuits
+    let calls through again: it regenerates the reference answer, scores the answer
+    and saves both with ``persist``, so they survive a closed tab. It never touches
+    the Streamlit session; the script thread picks the results up with ``drain``.
+    """
+
+    def __init__(self, answer_bot: Any, score_optimizer: Any,
+                 persist: Optional[Callable[[Dict[int, str], Dict[int, str]], None]] = None,
+                 poll_interval: float = 5.0, deadline: float = 600.0):
+        """Initialize the DeferredWork.
+
+        Args:
+            answer_bot (AnswerBot): Bot used to regenerate reference answers.
+            score_optimizer (ScoreOptimizer): Optimizer used to score the answers.
+            persist (callable): Called from the thread with the refilled answers (by
+                question number) and scores (by 0-based index) of each finished item.
+            poll_interval (float): Seconds to wait between attempts while a circuit is open.
+            deadline (float): Give up on an item this many seconds after it was submitted.
+        """
+        self.answer_bot = answer_bot
+        self.score_optimizer = score_optimizer
+        self.persist = persist
+        self.poll_interval = poll_interval
+        self.deadline = deadline
+        self._lock = threading.Lock()
+        self._queue: List[Dict[str, Any]] = []
+        self._queued = set()
+        self._answers: Dict[int, str] = {}
+        self._scores: Dict[int, str] = {}
+        self._given_up = set()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, index: int, question: str, user_answer: str, correct_answer: Optional[str] = None,
+               tests: Optional[Dict[str, Any]] = None, mcq: Optional[Dict[str, Any]] = None) -> None:
+        """Queue question ``index`` (0-based); ``correct_answer`` None has it regenerated first."""
+        with self._lock:
+            if index in self._queued:
+                return
+            self._queued.add(index)
+            self._given_up.discard(index)
+            self._queue.append({"index": index, "question": question, "user_answer": user_answer,
+                                "correct_answer": correct_answer, "tests": tests, "mcq": mcq,
+                                "give_up_at": time.monotonic() + self.deadline})
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="deferred-work", daemon=True)
+                self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Items queued or being worked on."""
+        with self._lock:
+            return len(self._queued)
+
+    def is_pending(self, index: int) -> bool:
+        with self._lock:
+            return index in self._queued
+
+    def given_up(self, index: int) -> bool:
+        """Whether question ``index`` passed its deadline; submitting it again retries it."""
+        with self._lock:
+            return index in self._given_up
+
+    def drain(self) -> tuple:
+        """Take the results finished since the last call.
+
+        Returns:
+            tuple: ``(answers, scores)``, refilled reference answers by question number
+            and scores by 0-based question index.
+        """
+        with self._lock:
+            answers, self._answers = self._answers, {}
+            scores, self._scores = self._scores, {}
+        return answers, scores
+
+    def _wait_for(self, breaker: Any, give_up_at: float) -> bool:
+        while breaker.state == OPEN:
+            if time.monotonic() >= give_up_at:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def _attempt(self, item: Dict[str, Any], give_up_at: float) -> Optional[tuple]:
+        """Refill and score one item; None to try again later."""
+        question_number = item["index"] + 1
+        if item["correct_answer"] is None:
+            if not self._wait_for(self.answer_bot.breaker, give_up_at):
+                return None
+            try:
+                answer = self.answer_bot.answer(Question=item["question"])
+            except Exception as e:
+                logger.info(f"Refill attempt for question {question_number} failed: {e}")
+                return None
+            if not answer:
+                return None
+            item["correct_answer"] = answer
+        if not self._wait_for(self.score_optimizer.breaker, give_up_at):
+            return None
+        try:
+            score = self.score_optimizer.score_answer(item["question"], item["correct_answer"],
+                                                      item["user_answer"], tests=item["tests"], mcq=item["mcq"])
+        except Exception as e:
+            logger.info(f"Deferred scoring attempt for question {question_number} failed: {e}")
+            return None
+        return item["correct_answer"], score
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._thread = None
+                    return
+                item = self._queue.pop(0)
+            index = item["index"]
+            # Answers regenerated here are new; ones passed in were already in the transcript
+            refilled = item["correct_answer"] is None
+            result = None
+            while result is None and time.monotonic() < item["give_up_at"]:
+                result = self._attempt(item, item["give_up_at"])
+                if result is None:
+                    time.sleep(self.poll_interval)
+            if result is None:
+                logger.warning(f"Gave up on the deferred score for question {index + 1}")
+                with self._lock:
+                    self._queued.discard(index)
+                    self._given_up.add(index)
+                continue
+            answers = {index + 1: result[0]} if refilled else {}
+            scores = {index: result[1]}
+            if self.persist is not None:
+                try:
+                    self.persist(answers, scores)
+                except Exception as e:
+                    logger.error(f"Error saving the deferred score for question {index + 1}: {e}")
+            with self._lock:
+                self._answers.update(answers)
+                self._scores.update(scores)
+                self._queued.discard(index)
+            logger.info(f"Scored deferred question {index + 1}")
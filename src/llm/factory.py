@@ -0,0 +1,35 @@
+import os
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+# "groq" (default) or "stub" for offline load tests and profiling
+LLM_BACKEND_ENV = "TALENTSCOUT_LLM_BACKEND"
+
+
+def build_chat_model(api_key: str, model: str, **kwargs: Any) -> Any:
+    """Build the chat model used by every bot.
+
+    Args:
+        api_key (str): ChatGroq api key
+        model (str): Model name
+        **kwargs: Extra ChatGroq parameters
+
+    Returns:
+        BaseChatModel: ChatGroq, or ``StubChatModel`` when the stub backend is selected.
+    """
+    backend = os.getenv(LLM_BACKEND_ENV, "groq").lower()
+    if backend == "stub":
+        from src.llm.stub import build_stub_chat_model
+        return build_stub_chat_model(model)
+
+    from langchain_groq import ChatGroq
+    from src.llm.key_pool import get_key_pool
+
+    # Pooled keys get their own HTTP client, whose response hook tracks rate-limit headroom
+    pool = get_key_pool()
+    if pool is not None and api_key in pool and "http_client" not in kwargs:
+        kwargs["http_client"] = pool.http_client(api_key)
+    return ChatGroq(api_key=api_key, model=model, **kwargs)
@@ -0,0 +1,67 @@
+import time
+import logging
+from typing import Any
+
+from src.llm.circuit_breaker import CircuitBreaker
+from src.llm.coalescer import get_single_flight, is_coalescing_enabled, make_request_key
+from src.llm.response_cache import get_response_cache, is_cache_enabled
+
+logger = logging.getLogger(__name__)
+
+
+def get_llm_params(llm: Any) -> dict:
+    """Parameters that change the model output, e.g. temperature and max tokens."""
+    return dict(getattr(llm, "_identifying_params", {}) or {})
+
+
+def invoke_llm(prompt: Any, llm: Any, output_parser: Any, inputs: Any, model: str,
+               stage: str, breaker: CircuitBreaker, coalesce: bool = None) -> Any:
+    """Render ``prompt`` with ``inputs`` and run it through the model for one stage.
+
+    The call goes through the stage's circuit breaker, and identical concurrent
+    requests (same model, parameters and rendered messages) share one upstream call
+    unless the stage opted out of coalescing. When ``TALENTSCOUT_LLM_CACHE`` is set,
+    the response cache sits in front of both (see ``ResponseCache``).
+
+    Args:
+        prompt (ChatPromptTemplate): Prompt template for the stage.
+        llm (BaseChatModel): Chat model to call.
+        output_parser (BaseOutputParser): Parser applied to the model output.
+        inputs: Template variables for ``prompt``.
+        model (str): Model name, part of the request key.
+        stage (str): Pipeline stage, e.g. ``question`` or ``score``.
+        breaker (CircuitBreaker): Breaker guarding ``(model, stage)`` for the API key of ``llm``.
+        coalesce (bool): Override the stage's coalescing setting.
+
+    Returns:
+        The parsed model output.
+    """
+    prompt_value = prompt.invoke(inputs)
+
+    def call():
+        return output_parser.invoke(breaker.call(llm.invoke, prompt_value))
+
+    if coalesce is None:
+        coalesce = is_coalescing_enabled(stage)
+    cache = get_response_cache()
+    key = None
+    if coalesce or cache is not None:
+        messages = [(message.type, message.content) for message in prompt_value.to_messages()]
+        key = make_request_key(model, get_llm_params(llm), messages)
+
+    def upstream():
+        return get_single_flight(stage).do(key, call) if coalesce else call()
+
+    started = time.perf_counter()
+    if cache is not None:
+        output = cache.fetch(key, stage, model, upstream, use_cached=is_cache_enabled(stage))
+    else:
+        output = upstream()
+
+    # Payload is truncated and sampled per stage by the logging setup
+    logger.info("LLM call completed", extra={
+        "stage": stage, "model": model,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "payload": output,
+    })
+    return output
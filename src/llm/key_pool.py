@@ -0,0 +1,273 @@
+import os
+import re
+import time
+import threading
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.main_utils import read_yaml
+
+logger = logging.getLogger(__name__)
+
+
+# Comma separated keys, or a YAML file with a list of keys or of {name, key} entries
+GROQ_API_KEYS_ENV = "GROQ_API_KEYS"
+GROQ_KEYS_FILE_ENV = "TALENTSCOUT_GROQ_KEYS_FILE"
+
+# Sessions not seen for this long no longer count towards their key's load
+SESSION_IDLE_SECONDS = 30 * 60
+
+# Idle connections stay open this long, so warm-up pings (src/llm/warmup.py) keep them alive
+KEEPALIVE_SECONDS = 120.0
+
+# Request extension marking calls that are not LLM traffic, e.g. warm-up pings; their
+# responses do not update a key's headroom or health
+UNMETERED = "talentscout_unmetered"
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class NoAvailableKeyError(RuntimeError):
+    """Raised when every key in the pool is exhausted or disabled."""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"All API keys are rate limited; retry in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds from a rate-limit reset header, e.g. ``"2m59.56s"``, ``"7.66s"`` or ``"12"``."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_SECONDS[unit] for number, unit in parts)
+
+
+def _header_int(headers: Any, name: str) -> Optional[int]:
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class KeyState:
+    """Health and rate-limit headroom of one key, from the latest response headers."""
+    name: str
+    key: str
+    limit_requests: Optional[int] = None
+    remaining_requests: Optional[int] = None
+    limit_tokens: Optional[int] = None
+    remaining_tokens: Optional[int] = None
+    exhausted_until: float = 0.0
+    disabled: bool = False
+    consecutive_errors: int = 0
+    requests: int = 0
+    sessions: Dict[str, float] = field(default_factory=dict)
+
+    def available(self, now: float) -> bool:
+        return not self.disabled and now >= self.exhausted_until
+
+    def headroom(self) -> float:
+        """Fraction of the tighter of the request and token limits still left; 1.0 when unknown."""
+        fractions = [
+            remaining / limit
+            for remaining, limit in ((self.remaining_requests, self.limit_requests),
+                                     (self.remaining_tokens, self.limit_tokens))
+            if remaining is not None and limit
+        ]
+        headroom = min(fractions) if fractions else 1.0
+        # Keys that keep failing with server errors are used less
+        return headroom / (1 + self.consecutive_errors)
+
+    def active_sessions(self, now: float) -> int:
+        for session_id, seen in list(self.sessions.items()):
+            if now - seen > SESSION_IDLE_SECONDS:
+                del self.sessions[session_id]
+        return len(self.sessions)
+
+
+class KeyPool:
+    """
+    Spreads sessions over several GROQ API keys.
+
+    Each session sticks to one key, so its requests stay in order on one quota.
+    New sessions, and sessions whose key became unavailable, go to the key with
+    the most rate-limit headroom per active session. Headroom comes from the
+    ``x-ratelimit-*`` headers of every response, read by an httpx event hook on
+    the key's own HTTP client. A 429 takes the key out of rotation until its
+    ``retry-after``/reset time, and a 401/403 disables it.
+    """
+
+    def __init__(self, keys: List[Tuple[str, str]]):
+        """Initialize the KeyPool.
+
+        Args:
+            keys (list): ``(name, key)`` pairs; names are used in logs instead of the keys.
+        """
+        if not keys:
+            raise ValueError("Key pool needs at least one API key")
+        self._lock = threading.Lock()
+        self._states: Dict[str, KeyState] = {}
+        self._by_session: Dict[str, str] = {}
+        self._clients: Dict[str, Any] = {}
+        for name, key in keys:
+            self._states.setdefault(key, KeyState(name=name, key=key))
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._states
+
+    def keys(self) -> List[str]:
+        return list(self._states)
+
+    def name_of(self, key: str) -> str:
+        """The key's name for logs and dashboards."""
+        state = self._states.get(key)
+        return state.name if state is not None else "unknown"
+
+    def choose(self, session_id: str) -> str:
+        """The key for ``session_id``: its current key while available, else the best one.
+
+        Raises:
+            NoAvailableKeyError: If every key is exhausted or disabled.
+        """
+        now = time.time()
+        with self._lock:
+            current = self._states.get(self._by_session.get(session_id))
+            if current is not None and current.available(now):
+                current.sessions[session_id] = now
+                return current.key
+
+            candidates = [state for state in self._states.values() if state.available(now)]
+            if not candidates:
+                pending = [state.exhausted_until - now for state in self._states.values() if not state.disabled]
+                raise NoAvailableKeyError(min(pending) if pending else float("inf"))
+
+            best = max(candidates, key=lambda state: state.headroom() / (1 + state.active_sessions(now)))
+            if current is not None:
+                current.sessions.pop(session_id, None)
+                logger.info(f"Moving session to API key {best.name}; {current.name} is out of rotation")
+            best.sessions[session_id] = now
+            self._by_session[session_id] = best.key
+            return best.key
+
+    def record_response(self, key: str, status_code: int, headers: Any) -> None:
+        """Update a key's headroom and health from one HTTP response."""
+        now = time.time()
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                return
+            state.requests += 1
+            for attribute, header in (("limit_requests", "x-ratelimit-limit-requests"),
+                                      ("remaining_requests", "x-ratelimit-remaining-requests"),
+                                      ("limit_tokens", "x-ratelimit-limit-tokens"),
+                                      ("remaining_tokens", "x-ratelimit-remaining-tokens")):
+                value = _header_int(headers, header)
+                if value is not None:
+                    setattr(state, attribute, value)
+
+            if status_code == 429:
+                wait = (parse_reset(headers.get("retry-after"))
+                        or max(parse_reset(headers.get("x-ratelimit-reset-requests")) or 0,
+                               parse_reset(headers.get("x-ratelimit-reset-tokens")) or 0)
+                        or 60.0)
+                state.exhausted_until = now + wait
+                logger.warning(f"API key {state.name} rate limited; out of rotation for {wait:.0f}s")
+            elif status_code in (401, 403):
+                state.disabled = True
+                logger.error(f"API key {state.name} rejected ({status_code}); disabled")
+            elif status_code >= 500:
+                state.consecutive_errors += 1
+            else:
+                state.consecutive_errors = 0
+                if state.remaining_requests == 0 or state.remaining_tokens == 0:
+                    # Out of quota without a 429 yet; wait for the matching reset
+                    reset = (parse_reset(headers.get("x-ratelimit-reset-requests")) if state.remaining_requests == 0
+                             else parse_reset(headers.get("x-ratelimit-reset-tokens")))
+                    state.exhausted_until = now + (reset or 1.0)
+
+    def http_client(self, key: str) -> Any:
+        """A per-key ``httpx.Client`` whose response hook feeds ``record_response``.
+
+        Requests sent with the ``UNMETERED`` extension set are left out, so a ping's
+        rate-limit headers don't overwrite those of the last LLM call.
+        """
+        with self._lock:
+            if key not in self._clients:
+                import httpx
+
+                def hook(response):
+                    if response.request.extensions.get(UNMETERED):
+                        return
+                    self.record_response(key, response.status_code, response.headers)
+
+                self._clients[key] = httpx.Client(
+                    event_hooks={"response": [hook]},
+                    limits=httpx.Limits(keepalive_expiry=KEEPALIVE_SECONDS)
+                )
+            return self._clients[key]
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Per-key state for dashboards; never includes the keys themselves."""
+        now = time.time()
+        with self._lock:
+            return [{
+                "name": state.name,
+                "available": state.available(now),
+                "disabled": state.disabled,
+                "headroom": round(state.headroom(), 3),
+                "remaining_requests": state.remaining_requests,
+                "remaining_tokens": state.remaining_tokens,
+                "sessions": state.active_sessions(now),
+                "requests": state.requests,
+                "retry_in": round(max(0.0, state.exhausted_until - now), 1),
+            } for state in self._states.values()]
+
+
+def load_keys() -> List[Tuple[str, str]]:
+    """Keys from ``TALENTSCOUT_GROQ_KEYS_FILE``, ``GROQ_API_KEYS`` or ``GROQ_API_KEY``, in that order."""
+    keys_file = os.getenv(GROQ_KEYS_FILE_ENV)
+    if keys_file:
+        entries = read_yaml(keys_file) or []
+        if isinstance(entries, dict):
+            entries = entries.get("keys", [])
+        keys = []
+        for i, entry in enumerate(entries, 1):
+            if isinstance(entry, dict):
+                keys.append((str(entry.get("name") or f"key-{i}"), str(entry["key"])))
+            else:
+                keys.append((f"key-{i}", str(entry)))
+        return keys
+
+    raw = os.getenv(GROQ_API_KEYS_ENV) or os.getenv("GROQ_API_KEY") or ""
+    return [(f"key-{i}", key.strip()) for i, key in enumerate(raw.split(","), 1) if key.strip()]
+
+
+_pool: Optional[KeyPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_key_pool() -> Optional[KeyPool]:
+    """The process-wide key pool, or None when no key is configured."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                keys = load_keys()
+                if keys:
+                    _pool = KeyPool(keys)
+                    logger.info(f"Loaded {len(_pool)} API key(s)")
+    return _pool
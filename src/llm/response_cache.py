@@ -0,0 +1,207 @@
+import os
+import time
+import sqlite3
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# off | cache | fallback | record | replay, see ResponseCache
+LLM_CACHE_ENV = "TALENTSCOUT_LLM_CACHE"
+LLM_CACHE_PATH_ENV = "TALENTSCOUT_LLM_CACHE_PATH"
+LLM_CACHE_MAX_MB_ENV = "TALENTSCOUT_LLM_CACHE_MAX_MB"
+# Stages that are never served from the cache in ``cache`` mode, e.g. "question". Comma separated.
+LLM_CACHE_OPT_OUT_ENV = "TALENTSCOUT_LLM_CACHE_OPT_OUT"
+
+MODES = ("off", "cache", "fallback", "record", "replay")
+
+
+class CacheMissError(LookupError):
+    """Raised in replay mode when a request was not recorded."""
+
+    def __init__(self, key: str, stage: str):
+        super().__init__(f"No recorded response for {stage} request {key[:12]}")
+        self.key = key
+        self.stage = stage
+
+
+class ResponseCache:
+    """
+    Exact-match cache of LLM responses in a local SQLite file.
+
+    Requests are keyed by the hash of model, parameters and rendered messages
+    (``make_request_key``), so only byte-identical prompts hit. Modes:
+
+    * ``cache``: serve hits, call the model on a miss and store the response.
+    * ``fallback``: always call the model; serve a stored response only when the
+      call fails (provider error, open circuit). A last resort for production.
+    * ``record``: call the model and store every response, without eviction; the
+      file is a cassette of the session.
+    * ``replay``: serve only recorded responses, from memory, and never call the
+      model; a miss raises ``CacheMissError``. For offline regression runs and demos.
+
+    ``cache`` and ``fallback`` evict least recently used entries once the stored
+    responses exceed ``max_bytes``.
+    """
+
+    def __init__(self, path: str, mode: str = "cache", max_bytes: int = 64 * 1024 * 1024):
+        """Initialize the ResponseCache.
+
+        Args:
+            path (str): SQLite file, created if missing.
+            mode (str): One of ``cache``, ``fallback``, ``record`` or ``replay``.
+            max_bytes (int): Size bound for ``cache`` and ``fallback`` modes.
+        """
+        if mode not in MODES or mode == "off":
+            raise ValueError(f"Unknown cache mode '{mode}', expected one of {', '.join(MODES[1:])}")
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, stage TEXT, model TEXT, response TEXT, size INTEGER, "
+            "created_at REAL, last_used REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        # Replay serves from memory; the cassette is read once
+        self._memory: Optional[Dict[str, str]] = None
+        if mode == "replay":
+            self._memory = dict(self._db.execute("SELECT key, response FROM responses"))
+            logger.info(f"Replaying {len(self._memory)} recorded LLM responses from {path}")
+
+    def get(self, key: str) -> Optional[str]:
+        if self._memory is not None:
+            return self._memory.get(key)
+        with self._lock:
+            row = self._db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0] if row else None
+
+    def put(self, key: str, stage: str, model: str, response: str) -> None:
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, stage, model, response, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, stage, model, response, size, now, now)
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self.mode in ("cache", "fallback") and self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Down to 90% of the bound, so eviction does not run on every insert
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        while self._total_bytes > target:
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            self._db.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key, _ in rows])
+            self._total_bytes -= sum(size for _, size in rows)
+            evicted += len(rows)
+        logger.info(f"Evicted {evicted} cached LLM responses")
+
+    def fetch(self, key: str, stage: str, model: str, call: Callable[[], Any], use_cached: bool = True) -> Any:
+        """Serve the request according to the mode, calling ``call`` when the model is needed.
+
+        Args:
+            key (str): Request key from ``make_request_key``.
+            stage (str): Pipeline stage, stored for inspection.
+            model (str): Model name, stored for inspection.
+            call: Runs the real request.
+            use_cached (bool): False for stages that opted out of serving hits in ``cache`` mode.
+
+        Raises:
+            CacheMissError: In replay mode, if the request was not recorded.
+        """
+        if self.mode == "replay":
+            response = self.get(key)
+            if response is None:
+                self.misses += 1
+                raise CacheMissError(key, stage)
+            self.hits += 1
+            return response
+
+        if self.mode == "cache" and use_cached:
+            response = self.get(key)
+            if response is not None:
+                self.hits += 1
+                return response
+
+        try:
+            output = call()
+        except Exception:
+            if self.mode != "fallback":
+                raise
+            response = self.get(key)
+            if response is None:
+                self.misses += 1
+                raise
+            self.hits += 1
+            logger.warning(f"Serving cached {stage} response after the model call failed")
+            return response
+
+        self.misses += 1
+        # Only plain text outputs (StrOutputParser) are stored
+        if isinstance(output, str) and output:
+            self.put(key, stage, model, output)
+        return output
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"mode": self.mode, "entries": entries, "bytes": self._total_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """The process-wide cache configured by ``TALENTSCOUT_LLM_CACHE``, or None when off."""
+    global _cache, _cache_loaded
+    if _cache_loaded:
+        return _cache
+    with _cache_lock:
+        if not _cache_loaded:
+            mode = os.getenv(LLM_CACHE_ENV, "off").lower()
+            if mode != "off":
+                default_path = os.path.join(os.getenv("TALENTSCOUT_DATA_DIR", "data"), "llm_cache.sqlite3")
+                _cache = ResponseCache(
+                    os.getenv(LLM_CACHE_PATH_ENV, default_path),
+                    mode=mode,
+                    max_bytes=int(float(os.getenv(LLM_CACHE_MAX_MB_ENV, "64")) * 1024 * 1024)
+                )
+            _cache_loaded = True
+    return _cache
+
+
+def is_cache_enabled(stage: str) -> bool:
+    opt_out = os.getenv(LLM_CACHE_OPT_OUT_ENV, "")
+    return stage not in {name.strip() for name in opt_out.split(",") if name.strip()}
@@ -0,0 +1,108 @@
+import os
+import time
+import contextvars
+import threading
+import logging
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeTasks:
+    """
+    Work started ahead of the request that needs it, e.g. a question's reference
+    answer while the candidate is still typing their answer.
+
+    Tasks are keyed (e.g. by the question text) and run on a shared executor.
+    ``take`` waits only for what is left of a task; ``cancel_all`` drops the
+    session's outstanding tasks when their inputs become stale. Queued tasks are
+    cancelled outright, running ones finish but their results are discarded.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor):
+        """Initialize the SpeculativeTasks.
+
+        Args:
+            executor (ThreadPoolExecutor): Shared pool the tasks run on.
+        """
+        self.executor = executor
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+
+    def start(self, key: str, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Start ``function`` for ``key`` unless a task for it is already running."""
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None or task.cancelled():
+                # A copy of the caller's context keeps its log fields on the task's records
+                task = self.executor.submit(contextvars.copy_context().run, function, *args, **kwargs)
+                self._tasks[key] = task
+            return task
+
+    def take(self, key: str, timeout: Optional[float] = None) -> Optional[Any]:
+        """The task's result, waiting for the rest of it; None if there is none or it failed.
+
+        A failed or timed-out task is left to the caller to redo synchronously.
+        """
+        with self._lock:
+            task = self._tasks.pop(key, None)
+        if task is None:
+            self.misses += 1
+            return None
+        start = time.perf_counter()
+        was_done = task.done()
+        try:
+            result = task.result(timeout=timeout)
+        except (CancelledError, TimeoutError) as e:
+            logger.warning(f"Speculative task not used: {type(e).__name__}")
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Speculative task failed: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        logger.info("Speculative result used", extra={
+            "ready": was_done, "waited_ms": round((time.perf_counter() - start) * 1000, 1)
+        })
+        return result
+
+    def cancel_all(self) -> int:
+        """Drop every outstanding task; returns how many were still queued or running."""
+        with self._lock:
+            tasks, self._tasks = self._tasks, {}
+        pending = 0
+        for task in tasks.values():
+            if not task.done():
+                task.cancel()
+                pending += 1
+        self.cancelled += pending
+        return pending
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_speculation_executor(workers: int = 8) -> ThreadPoolExecutor:
+    """Process-wide pool for speculative work; bounds how many calls run ahead of time."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculative")
+    return _executor
+
+
+def _reset_after_fork() -> None:
+    # A forked child inherits the pool but none of its threads, so tasks would never run
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
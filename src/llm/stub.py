@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import itertools
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+STUB_QUESTION = "Explain the difference between a process and a thread, and when you would use each."
+
+# About as long as a real reference answer, which matters for memory measurements
+STUB_ANSWER = (
+    "A process has its own memory space while threads share the memory of their process. "
+    "Use processes for isolation and CPU-bound work, threads for I/O-bound concurrency.\n\n"
+    "**Key points:**\n"
+    "1. **Isolation:** a crash or memory corruption in one process does not affect another, "
+    "while a misbehaving thread can bring down every thread of its process.\n"
+    "2. **Communication:** processes exchange data through pipes, sockets, queues or shared memory "
+    "segments and pay for serialization; threads read and write the same objects and need locks instead.\n"
+    "3. **Cost:** creating a process and switching between processes is more expensive than doing the "
+    "same for threads, because every process has its own page tables and file descriptors.\n"
+    "4. **Python specifics:** the global interpreter lock lets only one thread run Python bytecode at a "
+    "time, so CPU-bound work scales with multiprocessing, while threads or asyncio suit network and disk waits.\n\n"
+    "**Example:** a web scraper downloads pages with a thread pool and parses them in a process pool."
+)
+
+STUB_ANALYSIS = "You seem very confident."
+
+STUB_TURN = {"confidence": "confident", "reference_answer": STUB_ANSWER, "next_question": STUB_QUESTION}
+
+STUB_SCORE = """**Overall Performance: Good**
+
+**Detailed Analysis:**
+- Relevance: Good - Addresses the question.
+- Accuracy: Excellent - Technically correct.
+- Completeness: Good - Covers the main points.
+- Clarity: Good - Easy to follow.
+- Depth: Bad - Little detail beyond the basics.
+
+**Summary:** A solid answer that could go deeper."""
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Offline chat model returning canned, stage-appropriate replies.
+
+    Used for load tests and profiling so that runs measure the app rather than the
+    LLM provider. ``latency`` simulates provider response time with a sleep, which
+    releases the GIL like a real network call.
+    """
+
+    model_name: str = "stub"
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "talentscout-stub"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name}
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        system = str(messages[0].content) if messages else ""
+        if "full interview turn" in system:
+            turn = dict(STUB_TURN)
+            if "last question" in str(messages[-1].content):
+                turn["next_question"] = None
+            else:
+                turn["next_question"] = f"{STUB_QUESTION} (#{next(_question_counter)})"
+            return json.dumps(turn)
+        if "question generator" in system:
+            return f"{STUB_QUESTION} (#{next(_question_counter)})"
+        if "sentiment analysis" in system:
+            return STUB_ANALYSIS
+        if "expert evaluator" in system:
+            return STUB_SCORE
+        if "hidden test cases" in system:
+            return json.dumps({"testable": False})
+        return STUB_ANSWER
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._reply(messages)))])
+
+
+# Makes consecutive questions differ, as with a real model
+_question_counter = itertools.count(1)
+
+
+def build_stub_chat_model(model: str) -> StubChatModel:
+    latency_ms = float(os.getenv("TALENTSCOUT_STUB_LATENCY_MS", "0"))
+    return StubChatModel(model_name=model, latency=latency_ms / 1000)
@@ -0,0 +1,245 @@
+import os
+import re
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Tokens of candidate answer each stage receives; analysis only needs the gist
+DEFAULT_STAGE_BUDGETS = {"analysis": 800, "score": 1500}
+
+# Budgets can be overridden, e.g. TALENTSCOUT_TOKEN_BUDGETS="analysis=600,score=2000"
+TOKEN_BUDGETS_ENV = "TALENTSCOUT_TOKEN_BUDGETS"
+
+# Fenced code blocks longer than this many lines are elided in the middle
+CODE_BLOCK_KEEP_LINES = 24
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_FENCE_PATTERN = re.compile(r"^(\s*)(```|~~~)")
+_NUMBERS = re.compile(r"\d+")
+
+
+@lru_cache(maxsize=1)
+def _tiktoken_encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of ``text`` locally, without calling the provider.
+
+    Uses tiktoken's ``cl100k_base`` when it is installed; otherwise words and
+    punctuation are counted, with long words counted per 4 characters, which is
+    close to BPE tokenizers on English prose, code and logs.
+    """
+    if not text:
+        return 0
+    encoder = _tiktoken_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PATTERN.findall(text))
+
+
+def get_stage_budgets() -> Dict[str, int]:
+    budgets = dict(DEFAULT_STAGE_BUDGETS)
+    for item in os.getenv(TOKEN_BUDGETS_ENV, "").split(","):
+        if "=" not in item:
+            continue
+        stage, value = item.split("=", 1)
+        try:
+            budgets[stage.strip()] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"Ignoring invalid token budget '{item}'")
+    return budgets
+
+
+@dataclass
+class Compaction:
+    """Result of fitting one text into a token budget."""
+    text: str
+    original_tokens: int
+    tokens: int
+    budget: int
+    steps: List[str] = field(default_factory=list)
+
+    @property
+    def trimmed(self) -> bool:
+        return bool(self.steps)
+
+    def describe(self) -> str:
+        return f"{', '.join(self.steps)} ({self.original_tokens:,} → {self.tokens:,} tokens)"
+
+
+def collapse_whitespace(text: str) -> Tuple[str, int]:
+    """Strip trailing spaces, collapse blank-line runs and, outside code blocks, space runs."""
+    lines, in_code, changed = [], False, 0
+    for line in text.splitlines():
+        stripped = line.rstrip()
+        if _FENCE_PATTERN.match(stripped):
+            in_code = not in_code
+        elif not in_code:
+            stripped = re.sub(r"[ \t]{2,}", " ", stripped)
+        changed += stripped != line
+        if not stripped and lines and not lines[-1]:
+            changed += 1
+            continue
+        lines.append(stripped)
+    return "\n".join(lines).strip("\n"), changed
+
+
+def deduplicate_lines(text: str, keep: int = 2) -> Tuple[str, int]:
+    """Collapse runs of repeated lines, treating lines that differ only in numbers as repeats.
+
+    Log output repeats the same line with new timestamps or counters; the first
+    ``keep`` lines of a run are kept and the rest replaced by one marker line.
+    """
+    out, removed = [], 0
+    run_key, run_length = None, 0
+
+    def flush():
+        nonlocal removed
+        if run_length > keep:
+            out.append(f"[... {run_length - keep} more similar lines ...]")
+            removed += run_length - keep
+
+    for line in text.splitlines():
+        key = _NUMBERS.sub("0", line.strip())
+        if key and key == run_key:
+            run_length += 1
+            if run_length <= keep:
+                out.append(line)
+            continue
+        flush()
+        run_key, run_length = key, 1
+        out.append(line)
+    flush()
+    return "\n".join(out), removed
+
+
+def elide_code_blocks(text: str, keep_lines: int = CODE_BLOCK_KEEP_LINES) -> Tuple[str, int]:
+    """Keep the head and tail of fenced code blocks longer than ``keep_lines`` lines."""
+    out, block, removed = [], None, 0
+    for line in text.splitlines():
+        if block is None:
+            out.append(line)
+            if _FENCE_PATTERN.match(line):
+                block = []
+            continue
+        if _FENCE_PATTERN.match(line):
+            lines, elided = _elide_middle(block, keep_lines)
+            out.extend(lines)
+            removed += elided
+            out.append(line)
+            block = None
+        else:
+            block.append(line)
+    if block is not None:
+        # Unterminated fence, e.g. a truncated paste
+        lines, elided = _elide_middle(block, keep_lines)
+        out.extend(lines)
+        removed += elided
+    return "\n".join(out), removed
+
+
+def _elide_middle(lines: List[str], keep_lines: int) -> Tuple[List[str], int]:
+    if len(lines) <= keep_lines:
+        return lines, 0
+    head = (keep_lines * 2) // 3
+    tail = keep_lines - head
+    elided = len(lines) - head - tail
+    return lines[:head] + [f"[... {elided} lines omitted ...]"] + lines[len(lines) - tail:], elided
+
+
+def _shorten_line(text: str, budget: int, count: Callable[[str], int]) -> str:
+    """Cut the middle of one line by characters, estimating the ratio from the token count."""
+    keep = int(len(text) * budget / max(1, count(text)))
+    while True:
+        head = (keep * 2) // 3
+        shortened = f"{text[:head]} [...] {text[len(text) - (keep - head):]}"
+        if keep <= 1 or count(shortened) <= budget:
+            return shortened
+        keep = int(keep * 0.9)
+
+
+def truncate_middle(text: str, budget: int, count: Callable[[str], int] = estimate_tokens) -> Tuple[str, int]:
+    """Drop lines from the middle (keeping 2/3 head, 1/3 tail) until ``text`` fits ``budget``."""
+    lines = text.splitlines()
+    if len(lines) <= 1:
+        return _shorten_line(text, budget, count), 1
+
+    # A single huge line would otherwise be dropped whole
+    line_budget = max(1, budget // 4)
+    lines = [_shorten_line(line, line_budget, count) if count(line) > line_budget else line for line in lines]
+
+    low, high = 0, len(lines)
+    best = None
+    while low <= high:
+        keep = (low + high) // 2
+        candidate, _ = _elide_middle(lines, keep)
+        if count("\n".join(candidate)) <= budget:
+            best, low = candidate, keep + 1
+        else:
+            high = keep - 1
+    if best is None:
+        best, _ = _elide_middle(lines, 1)
+    return "\n".join(best), len(lines) - len(best) + 1
+
+
+def compact_text(text: str, budget: int, count: Callable[[str], int] = estimate_tokens) -> Compaction:
+    """Fit ``text`` into ``budget`` tokens, least destructive step first.
+
+    Steps run only while the text is still over budget: collapse whitespace,
+    deduplicate repeated lines, elide the middle of long code blocks, and finally
+    drop lines from the middle of the whole text.
+    """
+    original_tokens = count(text)
+    result = Compaction(text=text, original_tokens=original_tokens, tokens=original_tokens, budget=budget)
+    if original_tokens <= budget:
+        return result
+
+    steps = [
+        (collapse_whitespace, "collapsed whitespace"),
+        (deduplicate_lines, "removed {} repeated lines"),
+        (elide_code_blocks, "elided {} lines of code"),
+    ]
+    for step, label in steps:
+        compacted, amount = step(result.text)
+        if amount and compacted != result.text:
+            result.text = compacted
+            result.tokens = count(compacted)
+            result.steps.append(label.format(amount))
+        if result.tokens <= budget:
+            return result
+
+    compacted, amount = truncate_middle(result.text, budget, count)
+    result.text = compacted
+    result.tokens = count(compacted)
+    result.steps.append(f"dropped {amount} lines from the middle" if "\n" in compacted
+                        else "shortened the middle of the answer")
+    return result
+
+
+def preflight_answer(answer: str, stages: Optional[List[str]] = None) -> Dict[str, Compaction]:
+    """Compact a candidate answer for every stage it is sent to, by that stage's budget.
+
+    Stages with the same budget share one compaction. Only the stages whose text
+    was changed are returned.
+    """
+    budgets = get_stage_budgets()
+    by_budget: Dict[int, Compaction] = {}
+    results = {}
+    for stage in stages or list(budgets):
+        budget = budgets.get(stage)
+        if budget is None:
+            continue
+        if budget not in by_budget:
+            by_budget[budget] = compact_text(answer, budget)
+        if by_budget[budget].trimmed:
+            results[stage] = by_budget[budget]
+    return results
@@ -0,0 +1,224 @@
+import os
+import sys
+import json
+import time
+import threading
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from src.llm.factory import LLM_BACKEND_ENV
+from src.llm.key_pool import KeyPool, UNMETERED
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds between keep-alive pings, below the HTTP clients' keep-alive expiry; 0 (the
+# default) only warms up once, since every ping counts against the key's request quota
+WARMUP_INTERVAL_ENV = "TALENTSCOUT_WARMUP_INTERVAL"
+# Readiness file for probes (python -m src.llm.warmup --check)
+READY_FILE_ENV = "TALENTSCOUT_READY_FILE"
+
+COLD = "cold"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+# Form submits within this many seconds of the last ping don't prime again
+PRIME_AFTER_SECONDS = 10.0
+
+
+def default_ready_file() -> str:
+    return os.getenv(READY_FILE_ENV, os.path.join(os.getenv("TALENTSCOUT_DATA_DIR", "data"), "ready.json"))
+
+
+def models_url() -> str:
+    """The provider's model list: authenticated, but free and without generation."""
+    return os.getenv("GROQ_BASE_URL", "https://api.groq.com").rstrip("/") + "/openai/v1/models"
+
+
+@dataclass
+class KeyWarmth:
+    """Connection state of one key's HTTP client."""
+    name: str
+    state: str = COLD
+    last_ping: float = 0.0
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+class Warmup:
+    """
+    Opens and keeps alive the pooled connections to the LLM provider.
+
+    Every key of the ``KeyPool`` has its own HTTP client. ``start`` pings each one
+    with a models-list request, which pays for DNS, TLS and the HTTP/connection
+    set-up before any candidate waits on a question, then, if ``interval`` is set,
+    keeps the connections open with a ping every ``interval`` seconds. ``prime`` does
+    the same for one key on demand, e.g. when a candidate submits the form. Pings
+    are sent unmetered, so they don't change the key pool's view of a key's
+    headroom. The process counts as ready once at least one key is warm; readiness
+    is written to ``ready_file`` for deployment probes.
+    """
+
+    def __init__(self, pool: Optional[KeyPool], interval: float = 0.0, ready_file: Optional[str] = None):
+        """Initialize the Warmup.
+
+        Args:
+            pool (KeyPool): Keys whose clients are warmed; None when no key is configured.
+            interval (float): Seconds between keep-alive pings; 0 warms up once.
+            ready_file (str): Readiness file, None to not write one.
+        """
+        self.pool = pool
+        self.interval = interval
+        self.ready_file = ready_file
+        self.offline = os.getenv(LLM_BACKEND_ENV, "groq").lower() == "stub"
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._keys: Dict[str, KeyWarmth] = {}
+        if pool is not None:
+            for state in pool.status():
+                self._keys[state["name"]] = KeyWarmth(name=state["name"])
+
+    @property
+    def ready(self) -> bool:
+        """Whether the process can take traffic without cold connections."""
+        if self.offline:
+            return True
+        with self._lock:
+            return any(warmth.state == READY for warmth in self._keys.values())
+
+    def ping(self, key: str) -> bool:
+        """Send one models-list request on ``key``'s pooled client."""
+        name = self.pool.name_of(key)
+        with self._lock:
+            warmth = self._keys.setdefault(name, KeyWarmth(name=name))
+            if warmth.state == COLD:
+                warmth.state = WARMING
+        start = time.perf_counter()
+        try:
+            response = self.pool.http_client(key).get(
+                models_url(), headers={"Authorization": f"Bearer {key}"}, timeout=10.0,
+                extensions={UNMETERED: True}
+            )
+            response.raise_for_status()
+        except Exception as e:
+            with self._lock:
+                warmth.state, warmth.error, warmth.last_ping = FAILED, str(e), time.time()
+            logger.warning(f"Warm-up ping on API key {name} failed: {e}")
+            return False
+        with self._lock:
+            warmth.state, warmth.error, warmth.last_ping = READY, None, time.time()
+            warmth.latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.debug(f"Warm-up ping on API key {name} took {warmth.latency_ms} ms")
+        return True
+
+    def warm_all(self) -> int:
+        """Ping every key in parallel; returns the number of warm keys."""
+        if self.offline or self.pool is None:
+            self._write_ready_file()
+            return 0
+        threads = [threading.Thread(target=self.ping, args=(key,), daemon=True) for key in self.pool.keys()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self._write_ready_file()
+        with self._lock:
+            return sum(1 for warmth in self._keys.values() if warmth.state == READY)
+
+    def start(self) -> None:
+        """Warm every key now on a daemon thread; with an ``interval`` it keeps pinging them."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="llm-warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        warm = self.warm_all()
+        logger.info(f"Warm-up finished: {warm} warm API key(s), ready={self.ready}")
+        if self.interval <= 0:
+            return
+        while not self._stop.wait(self.interval):
+            self.warm_all()
+
+    def prime(self, key: str) -> None:
+        """Make sure ``key``'s connection is open, without blocking the caller."""
+        if self.offline or self.pool is None or key not in self.pool:
+            return
+        with self._lock:
+            warmth = self._keys.get(self.pool.name_of(key))
+            if warmth is not None and warmth.state == READY and time.time() - warmth.last_ping < PRIME_AFTER_SECONDS:
+                return
+        threading.Thread(target=self.ping, args=(key,), name="llm-prime", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Per-key warmth for dashboards."""
+        now = time.time()
+        with self._lock:
+            return [{
+                "name": warmth.name,
+                "state": warmth.state,
+                "latency_ms": warmth.latency_ms,
+                "last_ping_s": round(now - warmth.last_ping, 1) if warmth.last_ping else None,
+                "error": warmth.error,
+            } for warmth in self._keys.values()]
+
+    def _write_ready_file(self) -> None:
+        if not self.ready_file:
+            return
+        try:
+            directory = os.path.dirname(self.ready_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = f"{self.ready_file}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as file:
+                json.dump({"ready": self.ready, "pid": os.getpid(), "updated_at": time.time(),
+                           "interval": self.interval, "keys": self.status()}, file)
+            os.replace(temporary, self.ready_file)
+        except OSError as e:
+            logger.error(f"Could not write readiness file: {e}")
+
+
+def _process_alive(pid: Any) -> bool:
+    try:
+        os.kill(int(pid), 0)
+    except PermissionError:
+        return True
+    except (OSError, TypeError, ValueError):
+        return False
+    return True
+
+
+def check_ready(ready_file: str) -> bool:
+    """True if the readiness file says ready and the server that wrote it is still running."""
+    try:
+        with open(ready_file, encoding="utf-8") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return False
+    # A stopped server leaves a stale file behind; with keep-alive pings the file is
+    # refreshed every interval, without them the writing process must still exist
+    interval = state.get("interval") or 0
+    if interval > 0:
+        fresh = time.time() - state.get("updated_at", 0) < 3 * interval
+    else:
+        fresh = _process_alive(state.get("pid"))
+    return bool(state.get("ready")) and fresh
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Readiness probe for a TalentScout replica")
+    parser.add_argument("--check", action="store_true", help="Exit 0 if the replica is warm, 1 otherwise")
+    parser.add_argument("--ready-file", default=default_ready_file())
+    args = parser.parse_args()
+
+    ready = check_ready(args.ready_file)
+    print("ready" if ready else "not ready")
+    sys.exit(0 if ready else 1)
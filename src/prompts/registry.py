@@ -0,0 +1,234 @@
+import os
+import re
+import time
+import hashlib
+import threading
+import logging
+from collections.abc import Mapping
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from src.utils.main_utils import read_yaml
+
+logger = logging.getLogger(__name__)
+
+
+# Placeholders each prompt must contain
+REQUIRED_PLACEHOLDERS: Dict[str, Set[str]] = {
+    "prompt_bot": {"experience_level", "experience_years", "desired_positions",
+                   "tech_stack", "key_technologies"},
+    "answer_bot": set(),
+    "prompt_analysis": set(),
+    "prompt_score": {"question", "correct_answer"},
+    "prompt_turn": {"experience_level", "experience_years", "desired_positions",
+                    "tech_stack", "key_technologies"},
+    "prompt_tests": set(),
+}
+
+# Prompts passed to LangChain unescaped, so they must not contain any placeholder
+LITERAL_PROMPTS = {"answer_bot", "prompt_analysis"}
+
+
+class PromptValidationError(ValueError):
+    """Raised when a prompt file is missing prompts or placeholders."""
+
+
+def escape_prompt_template(prompt_template: str, template_variables: List[str]) -> str:
+    """
+    Escape curly braces in a prompt template except for the given template variables,
+    so it can be used as a LangChain template.
+    """
+    placeholders = {}
+    for i, var in enumerate("{" + name + "}" for name in template_variables):
+        placeholder = f"__TEMP_VAR_{i}__"
+        prompt_template = prompt_template.replace(var, placeholder)
+        placeholders[placeholder] = var
+
+    prompt_template = re.sub(r'(?<!\{)\{(?!\{)', '{{', prompt_template)
+    prompt_template = re.sub(r'(?<!\})\}(?!\})', '}}', prompt_template)
+
+    for placeholder, original_var in placeholders.items():
+        prompt_template = prompt_template.replace(placeholder, original_var)
+    return prompt_template
+
+
+class CompiledPrompt:
+    """
+    A prompt parsed once per version: its placeholders, content hash and the
+    literal/field segments used to render it without re-parsing.
+    """
+
+    def __init__(self, name: str, text: str):
+        """Initialize the CompiledPrompt.
+
+        Args:
+            name (str): Key of the prompt in the YAML file.
+            text (str): Raw prompt text.
+        """
+        self.name = name
+        self.text = text
+        self.hash = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        self.segments: List[Tuple[str, Optional[str], str]] = []
+        self.fields: Set[str] = set()
+        try:
+            for literal, field_name, format_spec, _ in Formatter().parse(text):
+                self.segments.append((literal, field_name, format_spec or ""))
+                if field_name is not None:
+                    self.fields.add(field_name)
+        except ValueError:
+            # Not a str.format template (e.g. stray braces); it can still be
+            # used verbatim or escaped for LangChain.
+            self.segments = [(text, None, "")]
+        self._render = lru_cache(maxsize=256)(self._render_uncached)
+        self._escaped: Dict[Tuple[str, ...], str] = {}
+
+    def _render_uncached(self, values: Tuple[Tuple[str, str], ...]) -> str:
+        lookup = dict(values)
+        parts = []
+        for literal, field_name, format_spec in self.segments:
+            parts.append(literal)
+            if field_name is not None:
+                parts.append(format(lookup[field_name], format_spec))
+        return "".join(parts)
+
+    def render(self, **kwargs: Any) -> str:
+        """Fill the placeholders; identical inputs are served from a per-version cache."""
+        missing = self.fields - kwargs.keys()
+        if missing:
+            raise KeyError(f"Missing values for {self.name}: {', '.join(sorted(missing))}")
+        return self._render(tuple(sorted((key, str(kwargs[key])) for key in self.fields)))
+
+    def escaped(self, template_variables: List[str]) -> str:
+        """The prompt escaped for LangChain, keeping ``template_variables`` as variables."""
+        key = tuple(template_variables)
+        if key not in self._escaped:
+            self._escaped[key] = escape_prompt_template(self.text, template_variables)
+        return self._escaped[key]
+
+
+class PromptSet(Mapping):
+    """
+    An immutable, validated version of the prompt file.
+
+    Acts as a read-only ``dict`` of prompt name to raw text, so it can be passed
+    wherever the parsed YAML was used before.
+    """
+
+    def __init__(self, prompts: Dict[str, CompiledPrompt], loaded_at: float):
+        self.prompts = prompts
+        self.loaded_at = loaded_at
+        combined = "".join(f"{name}:{prompt.hash};" for name, prompt in sorted(prompts.items()))
+        self.version = hashlib.sha256(combined.encode("utf-8")).hexdigest()[:16]
+
+    def __getitem__(self, name: str) -> str:
+        return self.prompts[name].text
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.prompts)
+
+    def __len__(self) -> int:
+        return len(self.prompts)
+
+    def compiled(self, name: str) -> CompiledPrompt:
+        return self.prompts[name]
+
+    def hash(self, name: str) -> str:
+        return self.prompts[name].hash
+
+    def render(self, name: str, **kwargs: Any) -> str:
+        return self.prompts[name].render(**kwargs)
+
+
+def compile_prompts(raw: Any, loaded_at: float = None) -> PromptSet:
+    """Validate the parsed YAML and compile every prompt in it.
+
+    Raises:
+        PromptValidationError: If a required prompt or placeholder is missing.
+    """
+    if not isinstance(raw, dict):
+        raise PromptValidationError("Prompt file must contain a mapping of prompt names to text")
+
+    prompts = {}
+    for name, text in raw.items():
+        if not isinstance(text, str):
+            raise PromptValidationError(f"Prompt '{name}' must be a string")
+        prompts[name] = CompiledPrompt(name, text)
+
+    for name, required in REQUIRED_PLACEHOLDERS.items():
+        if name not in prompts:
+            raise PromptValidationError(f"'{name}' prompt not found in prompt file")
+        missing = required - prompts[name].fields
+        if missing:
+            raise PromptValidationError(
+                f"'{name}' prompt is missing placeholders: {', '.join(sorted(missing))}"
+            )
+        if name in LITERAL_PROMPTS and prompts[name].fields:
+            raise PromptValidationError(
+                f"'{name}' prompt must not contain placeholders: {', '.join(sorted(prompts[name].fields))}"
+            )
+
+    return PromptSet(prompts, loaded_at if loaded_at is not None else time.time())
+
+
+class PromptRegistry:
+    """
+    Serves the current version of a prompt file and hot-reloads it when it changes.
+
+    The file's mtime and size are checked at most every ``check_interval`` seconds.
+    A changed file is parsed and validated off to the side and only then swapped
+    in, so readers always see a complete version. An invalid edit is logged and the
+    previous version keeps being served.
+    """
+
+    def __init__(self, file_path: str, check_interval: float = 1.0):
+        """Initialize the PromptRegistry and load the first version.
+
+        Args:
+            file_path (str): Path to the prompt YAML file.
+            check_interval (float): Minimum seconds between file checks.
+
+        Raises:
+            FileNotFoundError: If the prompt file does not exist.
+            PromptValidationError: If the first version is invalid.
+        """
+        self.file_path = file_path
+        self.check_interval = check_interval
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stamp = self._file_stamp()
+        self._current = compile_prompts(read_yaml(file_path))
+        self._checked_at = time.monotonic()
+        logger.info(f"Loaded prompts version {self._current.version}")
+
+    def _file_stamp(self) -> Tuple[int, int]:
+        stat = os.stat(self.file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def current(self) -> PromptSet:
+        """Return the latest valid prompt version, reloading it if the file changed."""
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return self._current
+
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return self._current
+            self._checked_at = time.monotonic()
+            try:
+                stamp = self._file_stamp()
+                if stamp == self._stamp:
+                    return self._current
+                # Remember the stamp even if the reload fails, so a broken edit is
+                # reported once instead of re-parsed on every check
+                self._stamp = stamp
+                prompts = compile_prompts(read_yaml(self.file_path))
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Keeping prompts version {self._current.version}, reload failed: {e}")
+                return self._current
+
+            self.last_error = None
+            if prompts.version != self._current.version:
+                logger.info(f"Reloaded prompts: {self._current.version} -> {prompts.version}")
+                self._current = prompts
+            return self._current
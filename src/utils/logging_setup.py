@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+import contextvars
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+
+DEFAULT_SAMPLE_RATES = {"question": 1.0, "answer": 0.1, "analysis": 0.1, "score": 0.25}
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Structured fields attached to every record logged from the current session/thread
+_log_context: contextvars.ContextVar = contextvars.ContextVar("talentscout_log_context", default={})
+
+_configure_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+def parse_sample_rates(value: Optional[str]) -> Dict[str, float]:
+    """Parse ``"answer=0.1,score=0.5"`` into per-stage sampling rates over the defaults."""
+    rates = dict(DEFAULT_SAMPLE_RATES)
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        stage, rate = item.split("=", 1)
+        try:
+            rates[stage.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            logger.warning(f"Ignoring invalid log sample rate '{item}'")
+    return rates
+
+
+def set_log_context(**fields: Any) -> None:
+    """Attach structured fields (e.g. ``interview_id``) to later records from this context."""
+    _log_context.set({**_log_context.get(), **fields})
+
+
+class ContextFilter(logging.Filter):
+    """Copies the current log context onto each record, without overriding explicit extras."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class StageSampler(logging.Filter):
+    """
+    Keeps a fraction of payload records per LLM stage.
+
+    Only records carrying a ``payload`` field are sampled; warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def sample(self, stage: Optional[str]) -> bool:
+        rate = self.rates.get(stage, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not hasattr(record, "payload"):
+            return True
+        return self.sample(getattr(record, "stage", None))
+
+
+class TruncatingQueueHandler(QueueHandler):
+    """
+    Queue handler that does the minimum on the calling thread.
+
+    Message arguments are merged and long payloads are cut to ``max_payload`` characters
+    before the record is queued; formatting and I/O happen on the listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue, max_payload: int = 200):
+        super().__init__(log_queue)
+        self.max_payload = max_payload
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue stays in-process, so the record is passed on as is instead of being
+        # copied and fully formatted here; only the arguments are merged eagerly since
+        # they may be mutated after the call returns
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        payload = getattr(record, "payload", None)
+        if payload is not None:
+            payload = str(payload)
+            record.payload_chars = len(payload)
+            if len(payload) > self.max_payload:
+                payload = f"{payload[:self.max_payload]}... [+{len(payload) - self.max_payload} chars]"
+            record.payload = payload
+        return record
+
+
+class StructuredFormatter(logging.Formatter):
+    """Plain text with ``key=value`` fields, or one JSON object per line."""
+
+    def __init__(self, as_json: bool = False):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        self.as_json = as_json
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+        if self.as_json:
+            entry = {"time": self.formatTime(record), "level": record.levelname,
+                     "logger": record.name, "message": record.getMessage(), **fields}
+            if record.exc_info:
+                entry["exc_info"] = self.formatException(record.exc_info)
+            return json.dumps(entry, default=str)
+        text = super().format(record)
+        if fields:
+            text += " | " + " ".join(f"{key}={value!r}" for key, value in fields.items())
+        return text
+
+
+def configure_logging(level: str = None, stream: Any = None, force: bool = False) -> QueueListener:
+    """Configure application logging once per process.
+
+    The root logger gets a single queue handler; a background listener formats the
+    records and writes them to ``stream`` (stderr by default) and, if set, to
+    ``TALENTSCOUT_LOG_FILE``. Safe to call on every Streamlit rerun.
+
+    Settings (environment):
+        TALENTSCOUT_LOG_LEVEL: Root level, defaults to INFO.
+        TALENTSCOUT_LOG_FORMAT: ``text`` (default) or ``json``.
+        TALENTSCOUT_LOG_MAX_PAYLOAD: Characters of LLM payload kept per record, default 200.
+        TALENTSCOUT_LOG_SAMPLE: Per-stage payload sampling, e.g. ``answer=0.1,score=0.5``.
+        TALENTSCOUT_LOG_FILE: Optional log file path.
+
+    Returns:
+        QueueListener: The running listener.
+    """
+    global _listener, _queue_handler
+    with _configure_lock:
+        if _listener is not None and not force:
+            return _listener
+        _stop_listener()
+
+        root = logging.getLogger()
+        root.setLevel((level or os.getenv("TALENTSCOUT_LOG_LEVEL", "INFO")).upper())
+
+        formatter = StructuredFormatter(as_json=os.getenv("TALENTSCOUT_LOG_FORMAT", "text").lower() == "json")
+        handlers = [logging.StreamHandler(stream or sys.stderr)]
+        log_file = os.getenv("TALENTSCOUT_LOG_FILE")
+        if log_file:
+            handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = TruncatingQueueHandler(log_queue, int(os.getenv("TALENTSCOUT_LOG_MAX_PAYLOAD", "200")))
+        queue_handler.addFilter(ContextFilter())
+        queue_handler.addFilter(StageSampler(parse_sample_rates(os.getenv("TALENTSCOUT_LOG_SAMPLE"))))
+        root.addHandler(queue_handler)
+        _queue_handler = queue_handler
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+
+def _stop_listener() -> None:
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def stop_logging() -> None:
+    """Detach the queue handler, flush queued records and stop the listener thread."""
+    with _configure_lock:
+        _stop_listener()
+
+
+atexit.register(stop_logging)
@@ -21,11 +21,18 @@ def get_last_user_message(messages):
     return None
 
 
-def get_all_user_message(message):
+def get_user_answer_for_stage(msg, stage=None):
+    """The answer text a stage receives: its token-budget compaction if one was needed."""
+    if stage is None:
+        return msg['content']
+    return (msg.get('compacted') or {}).get(stage, msg['content'])
+
+
+def get_all_user_message(message, stage=None):
     content = []
     for msg in message:
         if msg['role'] == "user":
-            content.append(msg['content'])
+            content.append(get_user_answer_for_stage(msg, stage))
     return content
 
 
@@ -37,6 +44,17 @@ def get_all_ai_message(message):
     return content
 
 
+def get_all_ai_records(message):
+    return [msg for msg in message if msg['role'] == "assistant"]
+
+
+def get_last_assistant_record(messages):
+    for message in reversed(messages):
+        if message['role'] == 'assistant':
+            return message
+    return None
+
+
 def get_all_corect_message(message):
     content = []
     for msg in message:
@@ -44,3 +62,78 @@ def get_all_corect_message(message):
             content.append(msg['content'])
     return content
 
+
+def get_all_corect_records(message):
+    return [msg for msg in message if msg['role'] == "correct_answer"]
+
+
+def split_assistant_content(content):
+    """Split an assistant message into the chat bubbles it is rendered as."""
+    for header, marker in (("**Analysis:**", "**Next Question:**"), ("**Final Analysis:**", "**Status:**")):
+        if header in content and marker in content:
+            parts = content.split(marker)
+            if len(parts) == 2:
+                return [parts[0], f"{marker}{parts[1]}"]
+    return [content]
+
+
+def get_experience_level(years_of_experience):
+    """Maps years of experience to a general experience level."""
+    exp_mapping = {
+        "0-1 years": "Junior",
+        "1-2 years": "Junior", 
+        "2-3 years": "Junior",
+        "3-5 years": "Mid",
+        "5-7 years": "Mid",
+        "7-10 years": "Senior",
+        "10+ years": "Senior"
+    }
+    return exp_mapping.get(years_of_experience, "Mid")
+
+
+def validate_required_fields(candidate_data):
+    """Validate that all required fields are filled"""
+    required_fields = ['full_name', 'email', 'phone', 'location']
+    missing_fields = [field for field in required_fields if not candidate_data.get(field)]
+    
+    if missing_fields:
+        return False, f"Missing required fields: {', '.join(missing_fields)}"
+    
+    if candidate_data.get('experience_years') in (None, "", "Select..."):
+        return False, "Please select years of experience"
+    
+    if not candidate_data.get('desired_positions'):
+        return False, "Please select at least one desired position"
+        
+    if not candidate_data.get('tech_stack'):
+        return False, "Please select your technology stack"
+        
+    if not candidate_data.get('key_technologies'):
+        return False, "Please select your key technologies"
+    
+    return True, ""
+
+
+def interview_profile(candidate_data):
+    """Values the interview prompts are rendered with"""
+    return dict(
+        experience_level=get_experience_level(candidate_data['experience_years']),
+        experience_years=candidate_data['experience_years'],
+        desired_positions=candidate_data['desired_positions'],
+        tech_stack=candidate_data['tech_stack'],
+        key_technologies=candidate_data['key_technologies']
+    )
+
+
+def first_question_prompt(max_questions):
+    """Instruction for generating the first of ``max_questions`` questions"""
+    return f"Generate question 1 of {max_questions} technical interview questions."
+
+
+def next_question_prompt(number, max_questions):
+    """Instruction for generating question ``number`` of ``max_questions``"""
+    return (
+        f"Generate question {number} of "
+        f"{max_questions}. Make it different from previous "
+        f"questions and relevant to the candidate's profile and previous answers."
+    )
@@ -0,0 +1,356 @@
+import os
+import sys
+import time
+import zlib
+import hashlib
+import threading
+import weakref
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.utils.main_utils import split_assistant_content
+
+logger = logging.getLogger(__name__)
+
+
+# Reference answers at least this long are kept zlib-compressed in the session
+COMPRESS_MIN_CHARS_ENV = "TALENTSCOUT_COMPRESS_MIN_CHARS"
+# Reference answers at least this long are moved to disk instead; 0 keeps them in memory
+SPILL_MIN_CHARS_ENV = "TALENTSCOUT_SPILL_MIN_CHARS"
+
+# Roles whose bodies are compressed or spilled: long, and only read again on the score page
+COMPRESSED_ROLES = frozenset({"correct_answer"})
+
+# Spilled bodies not read or written for this long are deleted
+SPILL_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+_MISSING = object()
+
+
+class SpillStore:
+    """
+    Content-addressed, zlib-compressed message bodies on disk.
+
+    Identical bodies share one file. Files are only read when a record's content is
+    accessed, and files untouched for ``max_age`` seconds are pruned on start-up.
+    Bodies referenced by records of this process are never pruned, and while the
+    store is in use their files are touched a few times per ``max_age``, so pruning
+    in another process sharing the directory leaves them alone too.
+    """
+
+    def __init__(self, directory: str, max_age: float = SPILL_MAX_AGE_SECONDS):
+        """Initialize the SpillStore.
+
+        Args:
+            directory (str): Directory for the body files, created if missing.
+            max_age (float): Seconds after which an untouched file is deleted.
+        """
+        self.directory = directory
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+        self._referenced: "weakref.WeakSet[_Spilled]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._touched_at = time.time()
+        self.prune(max_age)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.z")
+
+    def put(self, text: str) -> str:
+        """Store ``text`` and return its digest."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if os.path.exists(path):
+            os.utime(path)
+            return digest
+        # Written under a temporary name, so a reader never sees half a file
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(zlib.compress(data))
+        os.replace(temporary, path)
+        return digest
+
+    def get(self, digest: str) -> str:
+        with open(self._path(digest), "rb") as file:
+            text = zlib.decompress(file.read()).decode("utf-8")
+        self._touch_referenced()
+        return text
+
+    def spill(self, text: str) -> "_Spilled":
+        """Store ``text`` and return a reference to it that keeps it from being pruned."""
+        return self.track(_Spilled(self.put(text), len(text)))
+
+    def track(self, spilled: "_Spilled") -> "_Spilled":
+        """Keep the body of ``spilled`` while the reference is alive, e.g. after unpickling."""
+        with self._lock:
+            self._referenced.add(spilled)
+        self._touch_referenced()
+        return spilled
+
+    def referenced(self) -> set:
+        """Digests of the bodies that live records of this process refer to."""
+        with self._lock:
+            return {spilled.digest for spilled in self._referenced}
+
+    def _touch_referenced(self) -> None:
+        # A few times per max_age, so even a body nobody reads stays younger than the cutoff
+        if time.time() - self._touched_at < self.max_age / 4:
+            return
+        self._touched_at = time.time()
+        for digest in self.referenced():
+            try:
+                os.utime(self._path(digest))
+            except OSError:
+                pass
+
+    def prune(self, max_age: float) -> int:
+        cutoff = time.time() - max_age
+        referenced = {f"{digest}.z" for digest in self.referenced()}
+        removed = 0
+        for name in os.listdir(self.directory):
+            if name in referenced:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        if removed:
+            logger.info(f"Pruned {removed} spilled message bodies")
+        return removed
+
+
+class _Spilled:
+    """Reference to a body in the ``SpillStore``."""
+    __slots__ = ("digest", "chars", "__weakref__")
+
+    def __init__(self, digest: str, chars: int):
+        self.digest = digest
+        self.chars = chars
+
+
+class MessageRecord:
+    """
+    One entry of ``st.session_state.messages`` in a compact form.
+
+    Behaves like the dicts it replaces (``record["role"]``, ``record.get("degraded")``,
+    ``record["content"] = ...``, ``record.pop(...)``), but keeps the role interned in
+    a slot, stores an assistant message's rendered parts as one split offset instead
+    of a second copy of the text, and keeps long reference answers zlib-compressed or
+    on disk until they are read. Rarely used fields live in a small extra dict.
+    """
+
+    __slots__ = ("role", "_body", "_split", "_extra")
+
+    def __init__(self, role: str, content: str = "", **fields: Any):
+        self.role = sys.intern(role)
+        self._body: Any = ""
+        self._split = -1
+        self._extra: Optional[Dict[str, Any]] = None
+        fields.pop("parts", None)  # recomputed from the content
+        self.content = content
+        for key, value in fields.items():
+            self[key] = value
+
+    # --- Content ---
+
+    @property
+    def content(self) -> str:
+        body = self._body
+        if isinstance(body, str):
+            return body
+        if isinstance(body, bytes):
+            return zlib.decompress(body).decode("utf-8")
+        return get_spill_store().get(body.digest)
+
+    @content.setter
+    def content(self, text: str) -> None:
+        text = "" if text is None else str(text)
+        self._body = _pack_body(self.role, text)
+        self._split = -1
+        if self.role == "assistant":
+            parts = split_assistant_content(text)
+            if len(parts) == 2:
+                self._split = len(parts[0])
+
+    @property
+    def parts(self) -> List[str]:
+        """The chat bubbles an assistant message is rendered as."""
+        content = self.content
+        if self._split < 0:
+            return [content]
+        return [content[:self._split], content[self._split:]]
+
+    @property
+    def storage(self) -> str:
+        """How the body is held: ``text``, ``compressed`` or ``spilled``."""
+        if isinstance(self._body, str):
+            return "text"
+        return "compressed" if isinstance(self._body, bytes) else "spilled"
+
+    # --- Dict interface ---
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "role":
+            return self.role
+        if key == "content":
+            return self.content
+        if key == "parts":
+            return self.parts
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "role":
+            self.role = sys.intern(value)
+            self.content = self.content
+        elif key == "content":
+            self.content = value
+        elif key != "parts":
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in ("role", "content", "parts") or (self._extra is not None and key in self._extra)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key: str, default: Any = _MISSING) -> Any:
+        if self._extra is not None and key in self._extra:
+            value = self._extra.pop(key)
+            if not self._extra:
+                self._extra = None
+            return value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def keys(self) -> List[str]:
+        keys = ["role", "content"]
+        if self.role == "assistant":
+            keys.append("parts")
+        return keys + list(self._extra or ())
+
+    def items(self) -> List[tuple]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The plain dict form, e.g. for JSON snapshots."""
+        return {"role": self.role, "content": self.content, **(self._extra or {})}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MessageRecord":
+        return cls(**data)
+
+    def __getstate__(self):
+        return (self.role, self._body, self._split, self._extra)
+
+    def __setstate__(self, state):
+        self.role, self._body, self._split, self._extra = state
+        self.role = sys.intern(self.role)
+        if isinstance(self._body, _Spilled):
+            get_spill_store().track(self._body)
+
+    def __repr__(self) -> str:
+        return f"MessageRecord(role={self.role!r}, storage={self.storage!r}, fields={list(self._extra or ())})"
+
+
+def _pack_body(role: str, text: str) -> Any:
+    if role not in COMPRESSED_ROLES:
+        return text
+    spill_min = int(os.getenv(SPILL_MIN_CHARS_ENV, "0"))
+    if spill_min and len(text) >= spill_min:
+        return get_spill_store().spill(text)
+    if len(text) >= int(os.getenv(COMPRESS_MIN_CHARS_ENV, "512")):
+        data = text.encode("utf-8")
+        compressed = zlib.compress(data)
+        if len(compressed) < len(data):
+            return compressed
+    return text
+
+
+def make_message(role: str, content: str, **fields: Any) -> MessageRecord:
+    """A compact ``MessageRecord`` for ``st.session_state.messages``."""
+    return MessageRecord(role, content, **fields)
+
+
+def to_records(messages: List[Any]) -> List[MessageRecord]:
+    """Convert plain message dicts (e.g. from a snapshot) to records."""
+    return [message if isinstance(message, MessageRecord) else MessageRecord.from_dict(message)
+            for message in messages]
+
+
+_spill_store: Optional[SpillStore] = None
+_spill_lock = threading.Lock()
+
+
+def get_spill_store() -> SpillStore:
+    """The process-wide spill store under ``TALENTSCOUT_DATA_DIR``."""
+    global _spill_store
+    if _spill_store is None:
+        with _spill_lock:
+            if _spill_store is None:
+                _spill_store = SpillStore(os.path.join(os.getenv("TALENTSCOUT_DATA_DIR", "data"), "message_blobs"))
+    return _spill_store
+
+
+def _deep_size(root: Any) -> int:
+    """Bytes of ``root`` and everything reachable through containers and slots."""
+    seen = set()
+    stack = [root]
+    size = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj, 0)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            for slot in getattr(type(obj), "__slots__", ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return size
+
+
+def memory_report(messages: List[Any]) -> Dict[str, Any]:
+    """Memory held by a session's messages, compared with the plain dict form they replace.
+
+    Returns:
+        dict: ``records``, ``compressed`` and ``spilled`` counts, ``dict_bytes`` (the
+        dicts with pre-split ``parts`` the app used to keep), ``compact_bytes`` and
+        ``saved_pct``.
+    """
+    records = to_records(messages)
+    plain = []
+    for record in records:
+        entry = record.to_dict()
+        if record.role == "assistant":
+            entry["parts"] = record.parts
+        plain.append(entry)
+    dict_bytes = _deep_size(plain)
+    compact_bytes = _deep_size(records)
+    return {
+        "records": len(records),
+        "compressed": sum(1 for record in records if record.storage == "compressed"),
+        "spilled": sum(1 for record in records if record.storage == "spilled"),
+        "dict_bytes": dict_bytes,
+        "compact_bytes": compact_bytes,
+        "saved_pct": round(100 * (1 - compact_bytes / dict_bytes), 1) if dict_bytes else 0.0,
+    }
@@ -0,0 +1,337 @@
+import os
+import sys
+import csv
+import time
+import html
+import zlib
+import statistics
+import threading
+import logging
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+Stack = Tuple[str, ...]
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+@dataclass
+class Profile:
+    """
+    Samples of one profiled section.
+
+    Attributes:
+        section (str): What was profiled, e.g. ``rerun`` or ``generate_score``.
+        stacks (Counter): Sample count per stack, outermost frame first.
+        times (Counter): Seconds per stack; a sample stands for the time since the
+            previous one, as samples are delayed while the profiled thread holds the GIL.
+        wall_seconds (float): Duration of the section.
+        overhead_seconds (float): Estimated cost of sampling, see ``Profiler.calibrate``.
+    """
+
+    section: str
+    session_id: str
+    started_at: float
+    interval: float
+    stacks: Counter = field(default_factory=Counter)
+    times: Counter = field(default_factory=Counter)
+    wall_seconds: float = 0.0
+    overhead_seconds: float = 0.0
+    files: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    @property
+    def adjusted_seconds(self) -> float:
+        """Duration with the sampler's own cost taken out."""
+        return max(0.0, self.wall_seconds - self.overhead_seconds)
+
+    def function_table(self, limit: Optional[int] = None) -> List[Dict[str, float]]:
+        """Self and total samples per function, with their share of the adjusted duration in milliseconds."""
+        own, total, own_time, total_time = Counter(), Counter(), Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            own_time[stack[-1]] += self.times[stack]
+            for label in set(stack):
+                total[label] += count
+                total_time[label] += self.times[stack]
+        sampled = sum(self.times.values())
+        scale = self.adjusted_seconds * 1000 / sampled if sampled else 0.0
+        rows = [{
+            "function": label,
+            "self_samples": own[label],
+            "total_samples": count,
+            "self_ms": round(own_time[label] * scale, 2),
+            "total_ms": round(total_time[label] * scale, 2),
+        } for label, count in total.items()]
+        rows.sort(key=lambda row: (row["self_samples"], row["total_samples"]), reverse=True)
+        return rows[:limit] if limit else rows
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "section": self.section,
+            "samples": self.samples,
+            "wall_ms": round(self.wall_seconds * 1000, 2),
+            "overhead_ms": round(self.overhead_seconds * 1000, 2),
+            "adjusted_ms": round(self.adjusted_seconds * 1000, 2),
+        }
+
+
+class _Sampler(threading.Thread):
+    """Background thread that records the target thread's stack every ``interval`` seconds."""
+
+    def __init__(self, profile: Profile, thread_id: int):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.profile = profile
+        self.thread_id = thread_id
+        self.sampling_seconds = 0.0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        previous = time.perf_counter()
+        while not self._stop_event.wait(self.profile.interval):
+            start = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                stack = tuple(reversed(stack))
+                self.profile.stacks[stack] += 1
+                self.profile.times[stack] += start - previous
+            previous = time.perf_counter()
+            self.sampling_seconds += previous - start
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    """
+    Opt-in sampling profiler for reruns and expensive calls.
+
+    ``section`` samples the calling thread's stack from a background thread while
+    the block runs, so the profiled code is not instrumented and runs at nearly
+    full speed; the time spent taking samples is measured and reported as
+    overhead. Each profile is written to ``directory/<session>/`` as a folded
+    stack file, an SVG flame graph and a per-function CSV table. Sections nested
+    in an already profiled block on the same thread are part of the outer profile.
+    """
+
+    def __init__(self, directory: str, interval: float = 0.005, keep: int = 50, recent: int = 20):
+        """Initialize the Profiler.
+
+        Args:
+            directory (str): Profiles are written below this directory.
+            interval (float): Seconds between samples.
+            keep (int): Profiles kept per session; older files are deleted.
+            recent (int): Profiles kept in memory for the timings sidebar.
+        """
+        self.directory = directory
+        self.interval = interval
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._active = threading.local()
+        self._recent: Dict[str, Deque[Profile]] = {}
+        self._recent_size = recent
+        self._sample_cost: Optional[float] = None
+
+    def calibrate(self, rounds: int = 7) -> float:
+        """Measure what one sample costs the profiled thread, in seconds.
+
+        Runs a fixed CPU-bound workload with and without the sampler; the slowdown
+        per sample covers the stack walk and the GIL hand-overs it forces, which the
+        sampler cannot time from its own side. Measured once per process.
+        """
+        if self._sample_cost is not None:
+            return self._sample_cost
+
+        def workload(depth: int = 12) -> int:
+            return depth if depth < 2 else workload(depth - 1) + workload(depth - 2)
+
+        def timed(sampled: bool) -> Tuple[float, int]:
+            profile = Profile(section="calibration", session_id="", started_at=0.0, interval=self.interval)
+            sampler = _Sampler(profile, threading.get_ident()) if sampled else None
+            if sampler:
+                sampler.start()
+            start = time.perf_counter()
+            for _ in range(800):
+                workload()
+            elapsed = time.perf_counter() - start
+            if sampler:
+                sampler.stop()
+            return elapsed, profile.samples
+
+        # Interleaved pairs and their median keep machine noise out of the estimate
+        costs = []
+        for _ in range(rounds):
+            baseline = timed(False)[0]
+            elapsed, samples = timed(True)
+            if samples:
+                costs.append(max(0.0, elapsed - baseline) / samples)
+        self._sample_cost = statistics.median(costs) if costs else 0.0
+        logger.info(f"Profiler sample cost: {self._sample_cost * 1e6:.0f} us")
+        return self._sample_cost
+
+    def calibrate_in_background(self) -> threading.Thread:
+        """Run ``calibrate`` on its own thread, so no profiled request waits for it."""
+        thread = threading.Thread(target=self.calibrate, name="profile-calibration", daemon=True)
+        thread.start()
+        return thread
+
+    @contextmanager
+    def section(self, name: str, session_id: str):
+        """Profile the enclosed block; also saves blocks cut short by ``st.rerun``/``st.stop``."""
+        if getattr(self._active, "profile", None) is not None:
+            yield None
+            return
+        # Until calibration has finished, only the sampler's own time counts as overhead
+        sample_cost = self._sample_cost or 0.0
+        profile = Profile(section=name, session_id=session_id, started_at=time.time(), interval=self.interval)
+        sampler = _Sampler(profile, threading.get_ident())
+        self._active.profile = profile
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            yield profile
+        finally:
+            sampler.stop()
+            profile.wall_seconds = time.perf_counter() - start
+            # Time spent inside the sampler is a lower bound; calibration adds the GIL hand-overs
+            profile.overhead_seconds = max(sampler.sampling_seconds, profile.samples * sample_cost)
+            self._active.profile = None
+            self._finish(profile)
+
+    def _finish(self, profile: Profile) -> None:
+        with self._lock:
+            self._recent.setdefault(profile.session_id, deque(maxlen=self._recent_size)).append(profile)
+        if not profile.samples:
+            return
+        try:
+            profile.files = self.save(profile)
+        except OSError as e:
+            logger.error(f"Could not save profile of {profile.section}: {e}")
+            return
+        logger.info(f"Profiled {profile.section}: {profile.samples} samples",
+                    extra={"wall_ms": round(profile.wall_seconds * 1000, 2),
+                           "overhead_ms": round(profile.overhead_seconds * 1000, 2)})
+
+    def save(self, profile: Profile) -> Dict[str, str]:
+        """Write the folded stacks, flame graph and function table of ``profile``."""
+        directory = os.path.join(self.directory, _safe_name(profile.session_id))
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(profile.started_at))
+        base = os.path.join(directory, f"{stamp}-{int(profile.started_at * 1000) % 1000:03d}-{_safe_name(profile.section)}")
+
+        files = {"folded": base + ".folded", "svg": base + ".svg", "table": base + ".csv"}
+        with open(files["folded"], "w", encoding="utf-8") as f:
+            for stack, count in profile.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+        with open(files["svg"], "w", encoding="utf-8") as f:
+            f.write(render_flame_graph(profile))
+        with open(files["table"], "w", encoding="utf-8", newline="") as f:
+            rows = profile.function_table()
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        self._prune(directory)
+        return files
+
+    def _prune(self, directory: str) -> None:
+        stems = sorted({name.rsplit(".", 1)[0] for name in os.listdir(directory)})
+        for stem in stems[:-self.keep] if len(stems) > self.keep else []:
+            for extension in (".folded", ".svg", ".csv"):
+                try:
+                    os.remove(os.path.join(directory, stem + extension))
+                except FileNotFoundError:
+                    pass
+
+    def recent(self, session_id: str) -> List[Profile]:
+        with self._lock:
+            return list(self._recent.get(session_id, ()))
+
+
+def _safe_name(name: str) -> str:
+    return "".join(char if char.isalnum() or char in "-_" else "_" for char in str(name))[:64] or "session"
+
+
+def render_flame_graph(profile: Profile, width: int = 1200, row_height: int = 16) -> str:
+    """Render ``profile`` as a self-contained SVG flame graph, outermost frames at the bottom."""
+    root: Dict = {"count": 0, "children": {}}
+    # Widths follow the time each stack stands for, not the raw sample count
+    for stack, seconds in profile.times.items():
+        node = root
+        node["count"] += seconds
+        for label in stack:
+            node = node["children"].setdefault(label, {"count": 0, "children": {}})
+            node["count"] += seconds
+
+    rects = []
+    depth_max = [0]
+
+    def layout(node: Dict, x: float, depth: int) -> None:
+        for label, child in sorted(node["children"].items()):
+            child_width = child["count"] / root["count"] * width
+            if child_width >= 0.5:
+                rects.append((label, x, depth, child_width, child["count"]))
+                depth_max[0] = max(depth_max[0], depth)
+                layout(child, x, depth + 1)
+            x += child_width
+
+    if root["count"]:
+        layout(root, 0.0, 0)
+    header = 36
+    height = header + (depth_max[0] + 1) * row_height + 4
+    summary = profile.summary()
+    title = (f"{profile.section}: {summary['samples']} samples, {summary['wall_ms']} ms wall, "
+             f"{summary['overhead_ms']} ms sampler overhead, {summary['adjusted_ms']} ms adjusted")
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="monospace" font-size="11">',
+        f'<text x="4" y="16" font-size="13">{html.escape(title)}</text>',
+    ]
+    for label, x, depth, rect_width, seconds in rects:
+        y = height - (depth + 1) * row_height - 2
+        # Stable warm colour per function, as in classic flame graphs
+        hue = zlib.crc32(label.encode()) % 55
+        share = seconds / root["count"] * 100
+        text = label if rect_width > 7 * len(label) else label[:max(0, int(rect_width / 7) - 2)] + ".."
+        parts.append(
+            f'<g><title>{html.escape(label)} ({share:.1f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{rect_width:.1f}" height="{row_height - 1}" '
+            f'fill="hsl({hue}, 85%, 60%)" rx="2"/>'
+            + (f'<text x="{x + 3:.1f}" y="{y + row_height - 5}">{html.escape(text)}</text>' if rect_width > 21 else "")
+            + '</g>'
+        )
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+_profiler: Optional[Profiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> Profiler:
+    """The process-wide profiler writing below ``TALENTSCOUT_PROFILE_DIR``; calibrates itself in the background."""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = Profiler(
+                    os.getenv("TALENTSCOUT_PROFILE_DIR",
+                              os.path.join(os.getenv("TALENTSCOUT_DATA_DIR", "data"), "profiles")),
+                    interval=float(os.getenv("TALENTSCOUT_PROFILE_INTERVAL_MS", "5")) / 1000
+                )
+                _profiler.calibrate_in_background()
+    return _profiler
@@ -0,0 +1,57 @@
+import time
+import threading
+import logging
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class RerunTimer:
+    """
+    Collects wall-clock durations of Streamlit reruns per section (the full app
+    and each fragment), so rerun cost can be compared before and after a change.
+    """
+
+    def __init__(self, max_samples: int = 500):
+        """Initialize the RerunTimer.
+
+        Args:
+            max_samples (int): Samples kept per section.
+        """
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=max_samples))
+
+    def record(self, section: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[section].append(seconds)
+
+    @contextmanager
+    def measure(self, section: str):
+        """Time the enclosed block. Also records reruns cut short by ``st.rerun``/``st.stop``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.record(section, elapsed)
+            logger.debug(f"Rerun section {section} took {elapsed * 1000:.1f} ms")
+
+    def summary(self) -> List[Dict[str, float]]:
+        """Count, mean, p50 and p95 in milliseconds per section."""
+        with self._lock:
+            snapshot = {section: sorted(samples) for section, samples in self._samples.items()}
+
+        rows = []
+        for section, samples in sorted(snapshot.items()):
+            if not samples:
+                continue
+            rows.append({
+                "section": section,
+                "count": len(samples),
+                "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+                "p50_ms": round(samples[len(samples) // 2] * 1000, 2),
+                "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 2),
+            })
+        return rows
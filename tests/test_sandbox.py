@@ -0,0 +1,124 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from src.Optimize.sandbox import CHILD_PATH, SandboxPool, sandbox_supported
+from src.Optimize.code_grader import ExecutionGrader, TestSuite as Suite
+
+pytestmark = pytest.mark.skipif(not sandbox_supported(), reason="sandbox needs Linux x86-64 with seccomp and Landlock")
+
+REPO_FILE = os.path.abspath(__file__)
+# _posixsubprocess.fork_exec with the Python 3.11 signature, as subprocess.Popen calls it
+FORK_EXEC = """
+import os, _posixsubprocess
+def spawn(command):
+    errpipe_read, errpipe_write = os.pipe()
+    _posixsubprocess.fork_exec([b"/bin/sh", b"-c", command.encode()], [b"/bin/sh"], True, (errpipe_write,),
+                               None, None, -1, -1, -1, -1, -1, -1, errpipe_read, errpipe_write,
+                               False, False, -1, None, None, None, -1, None, False)
+"""
+SUITE = Suite("add", [{"args": [1, 2], "expected": 3}, {"args": [-4, 4], "expected": 0},
+                      {"args": [2, 2], "expected": 4}])
+
+
+@pytest.fixture(scope="module")
+def grader():
+    pool = SandboxPool(size=1)
+    yield ExecutionGrader(pool)
+    pool.close()
+
+
+def grade(grader, code):
+    return grader.grade(SUITE, f"```python\n{code}\n```")
+
+
+def test_correct_solution_passes(grader):
+    result = grade(grader, "from collections import namedtuple\n"
+                           "Pair = namedtuple('Pair', 'a b')\n"
+                           "def add(a, b):\n    return sum(Pair(a, b))")
+    assert (result.passed, result.total, result.error) == (3, 3, None)
+
+
+def test_grader_in_sandbox_cannot_be_patched(grader):
+    result = grade(grader, "import __main__\n"
+                           "__main__._normalize = lambda value: None\n"
+                           "__main__.run_tests = lambda *args: {'compiled': True, 'error': None, 'results': []}\n"
+                           "def add(a, b):\n    return 0")
+    # Only the expected value 0 of the second test matches
+    assert result.passed == 1
+
+
+def test_host_files_are_not_readable_or_shown(grader):
+    for path in (REPO_FILE, "../" * 10 + REPO_FILE.lstrip("/"), "/etc/passwd", "/proc/self/environ"):
+        result = grade(grader, f"def add(a, b):\n    raise Exception(open({path!r}).read())")
+        assert result.passed == 0
+        assert result.error == "PermissionError"
+        assert "raised PermissionError" in result.score_text
+        assert "import pytest" not in result.score_text and "root:" not in result.score_text
+
+
+def test_exception_messages_are_not_shown(grader):
+    result = grade(grader, "def add(a, b):\n    raise ValueError('secret detail')")
+    assert "raised ValueError" in result.score_text
+    assert "secret detail" not in result.score_text
+
+
+def test_network_is_blocked(grader):
+    result = grade(grader, "def add(a, b):\n    import socket\n    socket.create_connection(('example.com', 80))\n"
+                           "    return a + b")
+    assert result.passed == 0 and result.error == "PermissionError"
+
+
+def test_processes_cannot_be_started(grader):
+    for code in ("import subprocess\ndef add(a, b):\n    return a + b",
+                 "import os\ndef add(a, b):\n    os.system('true')\n    return a + b",
+                 "import os\ndef add(a, b):\n    os.fork()\n    return a + b"):
+        result = grade(grader, code)
+        assert result.passed == 0 and result.error == "PermissionError"
+
+
+def test_posixsubprocess_cannot_start_processes(grader, tmp_path):
+    marker = tmp_path / "escaped"
+    result = grade(grader, FORK_EXEC + f"def add(a, b):\n    spawn('touch {marker}')\n    return a + b")
+    assert result.passed == 0 and result.error == "PermissionError"
+    assert not marker.exists()
+
+
+def test_kernel_confinement_holds_without_the_audit_hook(tmp_path):
+    # What candidate code could do if it got past the audit hook, e.g. with ctypes
+    marker = tmp_path / "escaped"
+    attempts = {
+        "fork_exec": f"spawn('touch {marker}')",
+        "fork": "os.fork()",
+        "write": f"open({str(marker)!r}, 'w')",
+        "read": f"open({REPO_FILE!r}).read()",
+        "socket": "__import__('socket').socket()",
+        "signal": "os.kill(os.getppid(), 0)",
+    }
+    script = "\n".join([
+        "import sys, os",
+        f"sys.path.insert(0, {os.path.dirname(CHILD_PATH)!r})",
+        "import sandbox_child",
+        "sandbox_child._confine(sandbox_child._readable_roots()[0])",
+        FORK_EXEC,
+        *[f"try:\n    {code}\n    print({name!r}, 'allowed')\nexcept OSError:\n    print({name!r}, 'denied')"
+          for name, code in attempts.items()],
+    ])
+    output = subprocess.run([sys.executable, "-I", "-c", script], cwd=tmp_path, capture_output=True,
+                            text=True, timeout=30).stdout
+    assert output.split() == [word for name in attempts for word in (name, "denied")]
+    assert not marker.exists()
+
+
+def test_files_cannot_be_written(grader, tmp_path):
+    target = tmp_path / "written.txt"
+    for code in (f"def add(a, b):\n    open({str(target)!r}, 'w').write('x')\n    return a + b",
+                 "def add(a, b):\n    open('inside.txt', 'w').write('x')\n    return a + b",
+                 # Rebinding builtins must not switch the audit hook's checks off
+                 f"import builtins\nbuiltins.len = lambda value: 0\n"
+                 f"def add(a, b):\n    open({str(target)!r}, 'w')\n    return a + b"):
+        result = grade(grader, code)
+        assert result.passed == 0 and result.error == "PermissionError"
+    assert not target.exists()